@@ -10,8 +10,15 @@ export default function App() {
     function onCreated(e) {
       nav(`/host/${e.gameId}`)
     }
+    function onTournament(e) {
+      nav(`/tournament-host/${e.tournamentId}`)
+    }
     socket.on('game_created', onCreated)
-    return () => socket.off('game_created', onCreated)
+    socket.on('tournament_created', onTournament)
+    return () => {
+      socket.off('game_created', onCreated)
+      socket.off('tournament_created', onTournament)
+    }
   }, [nav])
 
   const create = () => {
@@ -19,6 +26,11 @@ export default function App() {
     socket.emit('host_create_game', {})
   }
 
+  const createTournament = () => {
+    setCreating(true)
+    socket.emit('host_create_tournament', {})
+  }
+
   return (
     <div className="min-h-screen flex items-center justify-center bg-overlay text-white p-6">
       <div className="max-w-2xl w-full space-y-8">
@@ -56,6 +68,13 @@ export default function App() {
                >
                  {creating ? '🔄 Creating…' : '🎰 Create Game (Host)'}
                </button>
+              <button
+                onClick={createTournament}
+                disabled={creating}
+                className="flashy-button hover-lift text-xl px-8 py-4 ml-4"
+              >
+                🏆 Host a Tournament
+              </button>
             </div>
           </div>
         </div>
@@ -0,0 +1,57 @@
+import { Link } from 'react-router-dom'
+
+// Tournament summary from the server's `tournament` and `tournament_over` events.
+export default function TournamentBoard({ board }) {
+  if (!board) return null
+  const places = board.places || []
+  return (
+    <div className="space-y-6">
+      <div className="flashy-card glass-enhanced p-6 fade-in-up text-readable">
+        <div className="text-lg">
+          Stage: <span className="font-bold shimmer-text">{board.stage}</span>
+          {' · '}👥 {board.stage === 'registering' ? `${board.registered} registered` : `${board.alive} of ${board.registered} left`}
+          {' · '}🪑 {board.tables.length} tables of {board.tableSize}
+        </div>
+        {board.winner && <div className="mt-2 text-2xl neon-text">🏆 {board.winner}</div>}
+      </div>
+
+      {places.length > 0 ? (
+        <div className="flashy-card glass-enhanced p-6 fade-in-up">
+          <div className="text-lg shimmer-text mb-4 text-readable">🏁 Final standings</div>
+          <ol className="space-y-2">
+            {places.slice(0, 20).map((p) => (
+              <li key={p.name} className="flex justify-between p-2 bg-black/20 rounded-lg text-readable">
+                <span className="font-bold neon-text">#{p.place} {p.name}</span>
+              </li>
+            ))}
+          </ol>
+        </div>
+      ) : board.leaders.length > 0 && (
+        <div className="flashy-card glass-enhanced p-6 fade-in-up">
+          <div className="text-lg shimmer-text mb-4 text-readable">📈 Chip leaders</div>
+          <ol className="space-y-2">
+            {board.leaders.map((p, i) => (
+              <li key={p.name} className="flex justify-between p-2 bg-black/20 rounded-lg text-readable">
+                <span className="font-bold neon-text">#{i + 1} {p.name}</span>
+                <span>💰 {p.chips}</span>
+              </li>
+            ))}
+          </ol>
+        </div>
+      )}
+
+      {board.tables.length > 0 && (
+        <div className="flashy-card glass-enhanced p-6 fade-in-up">
+          <div className="text-lg shimmer-text mb-4 text-readable">🪑 Tables</div>
+          <div className="flex flex-wrap gap-3">
+            {board.tables.map((t) => (
+              <Link key={t.gameId} to={`/watch/${t.gameId}`} className="p-2 bg-black/20 rounded-lg hover-lift text-readable">
+                👀 {t.gameId} · {t.players}
+              </Link>
+            ))}
+          </div>
+        </div>
+      )}
+    </div>
+  )
+}
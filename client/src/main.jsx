@@ -5,6 +5,9 @@ import './styles.css'
 import App from './App'
 import HostView from './pages/HostView'
 import PlayerView from './pages/PlayerView'
+import WatchView from './pages/WatchView'
+import TournamentView from './pages/TournamentView'
+import TournamentHostView from './pages/TournamentHostView'
 import Login from './pages/Login'
 import Register from './pages/Register'
 
@@ -12,6 +15,9 @@ const router = createBrowserRouter([
   { path: '/', element: <App/> },
   { path: '/host/:gameId?', element: <HostView/> },
   { path: '/play/:gameId', element: <PlayerView/> },
+  { path: '/watch/:gameId', element: <WatchView/> },
+  { path: '/tournament/:tournamentId', element: <TournamentView/> },
+  { path: '/tournament-host/:tournamentId', element: <TournamentHostView/> },
   { path: '/login', element: <Login/> },
   { path: '/register', element: <Register/> },
 ])
@@ -1,7 +1,8 @@
 import { useEffect, useMemo, useState } from 'react'
 import { useNavigate, useParams, Link } from 'react-router-dom'
 import QRCode from 'react-qr-code'
-import { socket } from '../socket'
+import { socket, joinGame } from '../socket'
+import { applyStateDelta } from '../state'
 import CommentTicker from '../components/CommentTicker'
 import HandRankings from '../components/HandRankings'
 import Card from '../components/Card'
@@ -13,6 +14,7 @@ export default function HostView(){
   const [comments, setComments] = useState([])
   const [showRanks, setShowRanks] = useState(false)
   const [showQRFullscreen, setShowQRFullscreen] = useState(false)
+  const [equity, setEquity] = useState(null)
   const nav = useNavigate()
 
   const gameId = routeGameId
@@ -20,28 +22,52 @@ export default function HostView(){
 
   useEffect(()=>{
     if (!gameId) return nav('/')
-    socket.emit('join_game', { gameId, name: `Host-${Math.random().toString(36).slice(2,6)}` })
-    socket.emit('request_state', { gameId })
+    const name = `Host-${Math.random().toString(36).slice(2,6)}`
+    const join = ()=> {
+      joinGame(gameId, name)
+      socket.emit('request_state', { gameId })
+    }
+    join()
+    socket.io.on('reconnect', join)
+    return ()=> socket.io.off('reconnect', join)
   },[gameId])
 
   useEffect(()=>{
     const onState = (s)=> setGame(s)
+    const onDelta = (d)=> setGame(prev=> {
+      const next = applyStateDelta(prev, d)
+      if (!next) {
+        socket.emit('request_state', { gameId: d.gameId })
+        return prev
+      }
+      return next
+    })
     const onRoundSet = ()=> {/* could blink */}
     const onComment = (c)=> setComments(prev=> [c, ...prev].slice(0,50))
+    const onEquity = (e)=> setEquity(e)
+    const onClosed = ()=> nav('/')
 
     socket.on('state', onState)
+    socket.on('state_delta', onDelta)
     socket.on('round_settled', onRoundSet)
     socket.on('new_comment', onComment)
+    socket.on('equity', onEquity)
+    socket.on('game_closed', onClosed)
     return ()=>{
       socket.off('state', onState)
+      socket.off('state_delta', onDelta)
       socket.off('round_settled', onRoundSet)
       socket.off('new_comment', onComment)
+      socket.off('equity', onEquity)
+      socket.off('game_closed', onClosed)
     }
   },[])
 
   const start = ()=> socket.emit('host_start', { gameId })
   const dealNext = ()=> socket.emit('host_deal_next', { gameId })
   const reset = ()=> socket.emit('host_reset_round', { gameId })
+  const addBot = ()=> socket.emit('host_add_bot', { gameId })
+  const removeBot = (seat)=> socket.emit('host_remove_bot', { gameId, seat })
 
   if (!game) return (
     <div className="min-h-screen bg-overlay flex items-center justify-center">
@@ -57,6 +83,11 @@ export default function HostView(){
   ?.filter(p => p.inHand && !p.name.startsWith('Host-'))
   .every(p => p.acted) ?? false;
 
+  // Odds are only shown for the street they were computed for
+  const odds = equity?.stage === game.stage
+    ? Object.fromEntries(equity.players.map(e => [e.name, e]))
+    : {}
+
   return (
     <div className="min-h-screen bg-overlay text-white p-6 space-y-6">
       <div className="flex items-center justify-between slide-in">
@@ -74,6 +105,7 @@ export default function HostView(){
               <div>
                 <div className="text-lg shimmer-text mb-2 text-readable">🎰 Scan to join:</div>
                 <div className="font-mono text-yellow-300 bg-black/20 p-2 rounded-lg">{joinUrl}</div>
+                <div className="mt-2 text-sm text-readable">👀 Audience: <span className="font-mono text-yellow-300">{`${window.location.origin}/watch/${gameId}`}</span></div>
                 <div className="mt-3 text-5xl text-readable">👥 Players: <span className="font-bold neon-text">{game.players?.filter(p => !p.name.startsWith('Host-')).length || 0}/{game.max}</span></div>
               </div>
             </div>
@@ -110,6 +142,7 @@ export default function HostView(){
               🔄 Play another round 🔄
             </button>
             <button onClick={()=> setShowRanks(true)} className="flashy-button hover-lift">📊 Hand rankings</button>
+            <button onClick={addBot} disabled={(game.count ?? 0) >= game.max} className="flashy-button hover-lift">🤖 Add bot</button>
           </div>
 
           {/* Chat section moved above players */}
@@ -123,10 +156,12 @@ export default function HostView(){
             <ul className="space-y-3">
               {(game.players||[]).filter(p => !p.name.startsWith('Host-')).map((p,i)=> (
                 <li key={i} className="flex justify-between items-center p-3 bg-black/20 rounded-lg hover-lift text-readable">
-                  <span className="font-bold neon-text">{p.name}</span>
+                  <span className="font-bold neon-text">{p.bot && '🤖 '}{p.name}</span>
                   <span className="text-slate-200">
                     {p.inHand? '🟢 in' : '🔴 folded'} · Stack 💰 {p.chips ?? 0} · Pot {p.totalBet ?? p.pot ?? 0} · {p.acted? '✅ acted':'⏳ waiting'}
                     {p.needsToCall && <span className="text-orange-400 font-bold"> ⚠️ MUST CALL</span>}
+                    {p.inHand && odds[p.name] && <span className="text-emerald-300 font-bold"> · 🎲 {(odds[p.name].equity * 100).toFixed(1)}%{equity.source === 'preflop_table' && ' vs random'}</span>}
+                    {p.bot && <button onClick={()=> removeBot(p.seat)} className="ml-2 text-red-300 hover:text-red-100">✖</button>}
                   </span>
                 </li>
               ))}
@@ -1,6 +1,7 @@
 import { useEffect, useState } from 'react'
-import { useParams, Link, useLocation } from 'react-router-dom'
-import { socket } from '../socket'
+import { useParams, Link, useLocation, useNavigate } from 'react-router-dom'
+import { socket, joinGame } from '../socket'
+import { applyStateDelta } from '../state'
 import Card from '../components/Card'
 import HandRankings from '../components/HandRankings'
 import { api, setAuth } from '../api'
@@ -9,12 +10,14 @@ import GifDisplay from '../components/GifDisplay'
 export default function PlayerView() {
   const { gameId } = useParams()
   const location = useLocation()
+  const nav = useNavigate()
   const [game, setGame] = useState(null)
   
-  // Use logged-in username if available, otherwise generate random name
+  // Use the tournament entry's name, the logged-in username, or a random name
   const loggedInUsername = localStorage.getItem('username')
-  const [name, setName] = useState(() => loggedInUsername || `P-${Math.random().toString(36).slice(2, 6)}`)
+  const [name, setName] = useState(() => location.state?.name || loggedInUsername || `P-${Math.random().toString(36).slice(2, 6)}`)
   const [hole, setHole] = useState([])
+  const [myHand, setMyHand] = useState(null)
   const [hidden, setHidden] = useState(false)
   const [flipped, setFlipped] = useState(false)
   const [acted, setActed] = useState(false)
@@ -23,6 +26,7 @@ export default function PlayerView() {
   const [comment, setComment] = useState('')
   const [sending, setSending] = useState(false)
   const [showQuitConfirm, setShowQuitConfirm] = useState(false)
+  const [standing, setStanding] = useState(null)
 
   // Ensure API has auth header if user previously logged in
   useEffect(() => {
@@ -38,20 +42,40 @@ export default function PlayerView() {
     }
   }, [name])
 
-  // Join the game and ask for state
+  // Join the game and ask for state; rejoin with our seat token after a reconnect
   useEffect(() => {
-    socket.emit('join_game', { gameId, name })
-    socket.emit('request_state', { gameId })
+    const join = () => {
+      joinGame(gameId, name)
+      socket.emit('request_state', { gameId })
+    }
+    join()
+    socket.io.on('reconnect', join)
+    return () => socket.io.off('reconnect', join)
   }, [gameId, name])
 
+  // Keep the local "acted" flag in sync with the server's view of this player
+  useEffect(() => {
+    if (!game) return
+    const me = game.players?.find((p) => p.name === name)
+    setActed(Boolean(me?.acted))
+  }, [game, name])
+
   // Socket listeners
   useEffect(() => {
-    const onState = (s) => {
-      setGame(s)
-      const me = s.players?.find((p) => p.name === name)
-      setActed(Boolean(me?.acted))
+    const onState = (s) => setGame(s)
+    const onDelta = (d) => setGame((prev) => {
+      const next = applyStateDelta(prev, d)
+      if (!next) {
+        socket.emit('request_state', { gameId })
+        return prev
+      }
+      return next
+    })
+    const onCards = (c) => {
+      setHole(c.cards)
+      setMyHand(null)
     }
-    const onCards = (c) => setHole(c.cards)
+    const onHand = (h) => setMyHand(h)
          const onShowdown = (w) => {
        console.log('DEBUG: Showdown received:', w)
        console.log('DEBUG: My name:', name)
@@ -74,15 +98,39 @@ export default function PlayerView() {
        }
      }
 
+    // Tournament play: the director moves us between tables and keeps us posted
+    const onMoved = (m) => {
+      setGame(null)
+      setHole([])
+      setMyHand(null)
+      setResult(null)
+      nav(`/play/${m.gameId}`, { state: { name } })
+    }
+    const onRank = (r) => setStanding(r)
+    const onBusted = (b) => setStanding({ ...b, busted: true })
+    const onTournamentOver = (t) => nav(`/tournament/${t.tournamentId}`)
+
     socket.on('state', onState)
+    socket.on('state_delta', onDelta)
     socket.on('your_cards', onCards)
+    socket.on('your_hand', onHand)
     socket.on('showdown', onShowdown)
+    socket.on('table_moved', onMoved)
+    socket.on('tournament_rank', onRank)
+    socket.on('tournament_busted', onBusted)
+    socket.on('tournament_over', onTournamentOver)
     return () => {
       socket.off('state', onState)
+      socket.off('state_delta', onDelta)
       socket.off('your_cards', onCards)
+      socket.off('your_hand', onHand)
       socket.off('showdown', onShowdown)
+      socket.off('table_moved', onMoved)
+      socket.off('tournament_rank', onRank)
+      socket.off('tournament_busted', onBusted)
+      socket.off('tournament_over', onTournamentOver)
     }
-  }, [name, game])
+  }, [name, gameId])
 
   const act = (action) => {
     socket.emit('player_action', { gameId, action })
@@ -189,6 +237,16 @@ export default function PlayerView() {
             <span className="text-2xl">💰</span>
             <span className="text-lg">Current bet: <span className="font-bold text-green-400">{game.currentBet || 0}</span> chips · Pot: <span className="font-bold text-yellow-400">{game.pot || 0}</span></span>
           </div>
+          {standing && (
+            <div className="flex items-center gap-2 text-readable">
+              <span className="text-2xl">🏆</span>
+              <span className="text-lg">
+                {standing.busted
+                  ? <>Out of the tournament in place <span className="font-bold neon-text">#{standing.place}</span></>
+                  : <>Tournament rank <span className="font-bold neon-text">#{standing.rank}</span> of {standing.alive}</>}
+              </span>
+            </div>
+          )}
                      <div className="flex items-center gap-2 text-readable">
              <span className="text-2xl">💪</span>
              <span className="text-lg">Chip stacks: <span className="font-bold text-yellow-400">
@@ -211,6 +269,13 @@ export default function PlayerView() {
              <div className="flashy-card glass-enhanced p-6 flex items-center gap-4 floating-element">
          <Card code={hole[0]} hidden={hidden} flipped={flipped} onToggle={() => setHidden(!hidden)} size="xlarge" />
          <Card code={hole[1]} hidden={hidden} flipped={flipped} onToggle={() => setHidden(!hidden)} size="xlarge" />
+         {myHand && !hidden && currentPlayer?.inHand && (
+           <div className="text-readable">
+             <div className="text-sm opacity-75">Your best hand</div>
+             <div className="font-bold text-xl neon-text">{myHand.hand_name}</div>
+             <div className="text-sm">{myHand.best5.join(' ')}</div>
+           </div>
+         )}
          <button onClick={() => setShowRanks(true)} className="ml-auto flashy-button hover-lift">
            📊 Hand rankings
          </button>
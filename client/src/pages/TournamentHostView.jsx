@@ -0,0 +1,71 @@
+import { useEffect, useMemo, useState } from 'react'
+import { useParams, Link } from 'react-router-dom'
+import QRCode from 'react-qr-code'
+import { socket } from '../socket'
+import TournamentBoard from '../components/TournamentBoard'
+
+// Host screen of a tournament: the sign-up QR, filler bots, start and finish.
+// The server deals every table on its own once it starts.
+export default function TournamentHostView(){
+  const { tournamentId } = useParams()
+  const [board, setBoard] = useState(null)
+  const [bots, setBots] = useState(10)
+  const [error, setError] = useState(null)
+  const joinUrl = useMemo(()=> `${window.location.origin}/tournament/${tournamentId}`, [tournamentId])
+
+  useEffect(()=>{
+    const onBoard = (b)=> setBoard(b)
+    const onError = (e)=> setError(e.error)
+    socket.on('tournament', onBoard)
+    socket.on('tournament_over', onBoard)
+    socket.on('error', onError)
+    return ()=>{
+      socket.off('tournament', onBoard)
+      socket.off('tournament_over', onBoard)
+      socket.off('error', onError)
+    }
+  },[])
+
+  const addBots = ()=> socket.emit('host_add_tournament_bots', { tournamentId, count: Number(bots) || 0 })
+  const start = ()=> socket.emit('host_start_tournament', { tournamentId })
+  const finish = ()=> window.confirm('End the tournament and rank everyone left by chips?') &&
+    socket.emit('host_finish_tournament', { tournamentId })
+
+  return (
+    <div className="min-h-screen bg-overlay text-white p-6 space-y-6">
+      <div className="flex items-center justify-between slide-in">
+        <h1 className="text-3xl font-bold neon-text text-readable-dark">🏆 Host — Tournament {tournamentId}</h1>
+        <Link to="/" className="flashy-button hover-lift">🏠 Home</Link>
+      </div>
+
+      <div className="grid md:grid-cols-2 gap-8">
+        <div className="space-y-6">
+          <div className="flashy-card glass-enhanced p-6 fade-in-up flex items-center gap-6">
+            <QRCode value={joinUrl} size={200} />
+            <div>
+              <div className="text-lg shimmer-text mb-2 text-readable">🎟️ Scan to register:</div>
+              <div className="font-mono text-yellow-300 bg-black/20 p-2 rounded-lg">{joinUrl}</div>
+            </div>
+          </div>
+
+          <div className="flex gap-4 flex-wrap items-center">
+            {board?.stage === 'registering' && (
+              <>
+                <input type="number" min="1" value={bots} onChange={(e)=> setBots(e.target.value)}
+                  className="w-24 p-2 rounded-lg text-black" />
+                <button onClick={addBots} className="flashy-button hover-lift">🤖 Add bots</button>
+                <button onClick={start} className="flashy-button hover-lift">🎰 Start tournament</button>
+              </>
+            )}
+            {board?.stage === 'running' && (
+              <button onClick={finish} className="flashy-button hover-lift">🏁 End tournament</button>
+            )}
+          </div>
+          {error && <div className="text-red-300 text-readable">{error}</div>}
+        </div>
+
+        <TournamentBoard board={board} />
+      </div>
+    </div>
+  )
+}
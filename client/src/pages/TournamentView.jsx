@@ -0,0 +1,75 @@
+import { useEffect, useState } from 'react'
+import { useNavigate, useParams, Link } from 'react-router-dom'
+import { socket, joinTournament } from '../socket'
+import TournamentBoard from '../components/TournamentBoard'
+
+// Lobby of a tournament: register, follow the board, and get sent to your
+// table when the host starts it.
+export default function TournamentView(){
+  const { tournamentId } = useParams()
+  const [board, setBoard] = useState(null)
+  const [registered, setRegistered] = useState(false)
+  const [name, setName] = useState(() => localStorage.getItem('username') || '')
+  const [error, setError] = useState(null)
+  const nav = useNavigate()
+
+  useEffect(()=>{
+    const follow = ()=> joinTournament(tournamentId)
+    follow()
+    socket.io.on('reconnect', follow)
+    return ()=> socket.io.off('reconnect', follow)
+  },[tournamentId])
+
+  useEffect(()=>{
+    const onBoard = (b)=> setBoard(b)
+    const onRegistered = ()=> { setRegistered(true); setError(null) }
+    const onSeated = (s)=> nav(`/play/${s.gameId}`, { state: { name, tournamentId } })
+    const onError = (e)=> setError(e.error)
+    socket.on('tournament', onBoard)
+    socket.on('tournament_over', onBoard)
+    socket.on('tournament_registered', onRegistered)
+    socket.on('tournament_seated', onSeated)
+    socket.on('error', onError)
+    return ()=>{
+      socket.off('tournament', onBoard)
+      socket.off('tournament_over', onBoard)
+      socket.off('tournament_registered', onRegistered)
+      socket.off('tournament_seated', onSeated)
+      socket.off('error', onError)
+    }
+  },[name, tournamentId])
+
+  const register = ()=> name.trim() && joinTournament(tournamentId, name.trim())
+
+  return (
+    <div className="min-h-screen bg-overlay text-white p-6 space-y-6">
+      <div className="flex items-center justify-between slide-in">
+        <h1 className="text-3xl font-bold neon-text text-readable-dark">🏆 Tournament {tournamentId}</h1>
+        <Link to="/" className="flashy-button hover-lift">🏠 Home</Link>
+      </div>
+
+      {board?.stage === 'registering' && (
+        <div className="flashy-card glass-enhanced p-6 fade-in-up text-readable">
+          {registered ? (
+            <div className="text-xl">✅ You are in as <span className="font-bold neon-text">{name}</span>. Waiting for the host to start…</div>
+          ) : (
+            <div className="flex gap-4 items-center flex-wrap">
+              <input
+                value={name}
+                onChange={(e)=> setName(e.target.value)}
+                disabled={Boolean(localStorage.getItem('username'))}
+                maxLength={20}
+                placeholder="Your name"
+                className="p-2 rounded-lg text-black"
+              />
+              <button onClick={register} className="flashy-button hover-lift">🎟️ Register</button>
+            </div>
+          )}
+          {error && <div className="mt-3 text-red-300">{error}</div>}
+        </div>
+      )}
+
+      <TournamentBoard board={board} />
+    </div>
+  )
+}
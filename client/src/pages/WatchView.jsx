@@ -0,0 +1,94 @@
+import { useEffect, useState } from 'react'
+import { useNavigate, useParams, Link } from 'react-router-dom'
+import { socket } from '../socket'
+import CommentTicker from '../components/CommentTicker'
+import Card from '../components/Card'
+
+// Audience view: no seat and no hole cards. The server sends a full snapshot
+// at most once a second, so there are no deltas to patch here.
+export default function WatchView(){
+  const { gameId } = useParams()
+  const [game, setGame] = useState(null)
+  const [result, setResult] = useState(null)
+  const [comments, setComments] = useState([])
+  const nav = useNavigate()
+
+  useEffect(()=>{
+    const watch = ()=> socket.emit('watch_game', { gameId })
+    watch()
+    socket.io.on('reconnect', watch)
+    return ()=> socket.io.off('reconnect', watch)
+  },[gameId])
+
+  useEffect(()=>{
+    const onState = (s)=> {
+      setGame(s)
+      if (s.stage !== 'showdown') setResult(null)
+    }
+    const onShowdown = (r)=> setResult(r)
+    const onComment = (c)=> setComments(prev=> [c, ...prev].slice(0,50))
+    const onClosed = ()=> nav('/')
+    socket.on('state', onState)
+    socket.on('showdown', onShowdown)
+    socket.on('new_comment', onComment)
+    socket.on('game_closed', onClosed)
+    return ()=>{
+      socket.off('state', onState)
+      socket.off('showdown', onShowdown)
+      socket.off('new_comment', onComment)
+      socket.off('game_closed', onClosed)
+    }
+  },[])
+
+  if (!game) return (
+    <div className="min-h-screen bg-overlay flex items-center justify-center">
+      <div className="text-center">
+        <div className="spinner mx-auto mb-4"></div>
+        <div className="text-2xl font-bold neon-text text-readable-dark">👀 Finding the table... 👀</div>
+      </div>
+    </div>
+  )
+
+  const players = (game.players || []).filter(p => !p.name.startsWith('Host-'))
+
+  return (
+    <div className="min-h-screen bg-overlay text-white p-6 space-y-6">
+      <div className="flex items-center justify-between slide-in">
+        <h1 className="text-3xl font-bold neon-text text-readable-dark">👀 Watching Game {game.gameId}</h1>
+        <Link to="/" className="flashy-button hover-lift">🏠 Home</Link>
+      </div>
+
+      <div className="flashy-card glass-enhanced p-6 fade-in-up text-center">
+        <div className="text-readable mb-4">Stage: <span className="font-bold shimmer-text">{game.stage}</span> · Pot 💰 {game.pot}</div>
+        <div className="flex items-center gap-4 justify-center flex-wrap">
+          {(game.board || []).map((card, index) => (
+            <Card key={index} code={card} hidden={false} flipped={false} onToggle={() => {}} size="large" />
+          ))}
+          {(!game.board || game.board.length === 0) && <div className="text-gray-400 text-xl">No cards revealed yet</div>}
+        </div>
+        {result?.winners?.length > 0 && (
+          <div className="mt-4 text-2xl neon-text">🏆 {result.winners.join(', ')} — {result.hand_name}</div>
+        )}
+      </div>
+
+      <div className="flashy-card glass-enhanced p-6 fade-in-up">
+        <div className="text-xl shimmer-text mb-4 text-readable">💬 Chat</div>
+        <CommentTicker comments={comments} />
+      </div>
+
+      <div className="flashy-card glass-enhanced p-6 fade-in-up">
+        <div className="text-lg shimmer-text mb-4 text-readable">👥 Players</div>
+        <ul className="space-y-3">
+          {players.map((p)=> (
+            <li key={p.seat} className="flex justify-between items-center p-3 bg-black/20 rounded-lg text-readable">
+              <span className="font-bold neon-text">{p.name}</span>
+              <span className="text-slate-200">
+                {p.inHand ? '🟢 in' : '🔴 folded'} · Stack 💰 {p.chips ?? 0} · Pot {p.totalBet ?? 0}
+              </span>
+            </li>
+          ))}
+        </ul>
+      </div>
+    </div>
+  )
+}
@@ -1,6 +1,47 @@
 import { io } from 'socket.io-client'
 import { API_BASE } from './api'
+import { WIRE, decodeDelta, decodeShowdown, decodeState } from './wire'
 
+// Ask for the compact binary encoding of table state; the server keeps sending
+// JSON to clients that do not.
 export const socket = io(API_BASE, {
   autoConnect: true,
+  auth: { wire: WIRE },
 })
+
+// Hand binary events to the same listeners as their JSON twins, so views only
+// ever subscribe to 'state', 'state_delta' and 'showdown'.
+for (const [event, decode] of [['state', decodeState], ['state_delta', decodeDelta], ['showdown', decodeShowdown]]) {
+  socket.on(`${event}_bin`, (buffer) => {
+    const data = decode(buffer)
+    for (const listener of socket.listeners(event)) listener(data)
+  })
+}
+
+// The server hands every seated client a token; sending it back on join_game
+// after a dropped connection reclaims the same seat instead of a new one.
+const seatKey = (gameId) => `seat-token:${gameId}`
+
+socket.on('joined', ({ gameId, token }) => {
+  if (token) sessionStorage.setItem(seatKey(gameId), token)
+})
+
+// Tournament seats keep one token from registration to the end; the server
+// moves it from table to table.
+const tournamentKey = (tournamentId) => `tournament-token:${tournamentId}`
+
+const saveTournamentSeat = ({ tournamentId, gameId, token }) => {
+  sessionStorage.setItem(tournamentKey(tournamentId), token)
+  if (gameId) sessionStorage.setItem(seatKey(gameId), token)
+}
+socket.on('tournament_registered', saveTournamentSeat)
+socket.on('tournament_seated', saveTournamentSeat)
+socket.on('table_moved', saveTournamentSeat)
+
+export function joinTournament(tournamentId, name) {
+  socket.emit('join_tournament', { tournamentId, name, token: sessionStorage.getItem(tournamentKey(tournamentId)) })
+}
+
+export function joinGame(gameId, name) {
+  socket.emit('join_game', { gameId, name, token: sessionStorage.getItem(seatKey(gameId)) })
+}
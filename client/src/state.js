@@ -0,0 +1,14 @@
+// Apply a versioned `state_delta` on top of the last full or patched state.
+// Returns null when the delta does not continue from `game.version`; the
+// caller should then ask for a fresh snapshot with `request_state`.
+export function applyStateDelta(game, delta) {
+  if (!game || game.version !== delta.base) return null
+  const bySeat = new Map((game.players || []).map((p) => [p.seat, p]))
+  for (const seat of delta.removed || []) bySeat.delete(seat)
+  for (const [seat, fields] of Object.entries(delta.players || {})) {
+    const s = Number(seat)
+    bySeat.set(s, { ...(bySeat.get(s) || {}), ...fields })
+  }
+  const order = delta.order || (game.players || []).map((p) => p.seat).filter((s) => bySeat.has(s))
+  return { ...game, ...delta.game, version: delta.version, players: order.map((s) => bySeat.get(s)) }
+}
@@ -0,0 +1,98 @@
+// Decoder for the compact state protocol (server/wire.py). The socket asks for
+// it at connect; `state_bin`, `state_delta_bin` and `showdown_bin` arrive as
+// MessagePack with field names replaced by their index in these tables, which
+// must match the server's exactly.
+const GAME_KEYS = ['gameId', 'stage', 'board', 'pot', 'someoneRaised', 'currentBet', 'raiseMade',
+  'count', 'max', 'version', 'base', 'msg']
+const PLAYER_KEYS = ['name', 'inHand', 'raises', 'acted', 'chips', 'roundBet', 'totalBet', 'pot',
+  'callAmount', 'needsToCall', 'seat', 'connected', 'bot']
+const SHOWDOWN_KEYS = ['winners', 'payouts', 'pot', 'board', 'hand_name', 'show', 'hand']
+const SHOW_KEYS = ['name', 'cards', 'best5', 'score', 'hand_name']
+const CARD_KEYS = new Set(['board', 'cards', 'best5'])
+const RANKS = '23456789TJQKA'
+const SUITS = 'SHDC'
+
+export const WIRE = 'msgpack'
+
+const cardText = (c) => RANKS[c >> 2] + SUITS[c & 3]
+
+// Minimal MessagePack reader: the server only sends maps, arrays, strings,
+// ints, floats, booleans and nil.
+function unpack(buffer) {
+  const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer)
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength)
+  const text = new TextDecoder()
+  let pos = 0
+  const str = (n) => { const s = text.decode(bytes.subarray(pos, pos + n)); pos += n; return s }
+  const arr = (n) => { const out = []; for (let i = 0; i < n; i++) out.push(read()); return out }
+  const map = (n) => { const out = {}; for (let i = 0; i < n; i++) { const k = read(); out[k] = read() } return out }
+  const bin = (n) => { const b = bytes.slice(pos, pos + n); pos += n; return b }
+  function read() {
+    const t = bytes[pos++]
+    if (t < 0x80) return t
+    if (t < 0x90) return map(t & 0x0f)
+    if (t < 0xa0) return arr(t & 0x0f)
+    if (t < 0xc0) return str(t & 0x1f)
+    if (t >= 0xe0) return t - 0x100
+    let v
+    switch (t) {
+      case 0xc0: return null
+      case 0xc2: return false
+      case 0xc3: return true
+      case 0xc4: v = bytes[pos]; pos += 1; return bin(v)
+      case 0xc5: v = view.getUint16(pos); pos += 2; return bin(v)
+      case 0xc6: v = view.getUint32(pos); pos += 4; return bin(v)
+      case 0xca: v = view.getFloat32(pos); pos += 4; return v
+      case 0xcb: v = view.getFloat64(pos); pos += 8; return v
+      case 0xcc: v = view.getUint8(pos); pos += 1; return v
+      case 0xcd: v = view.getUint16(pos); pos += 2; return v
+      case 0xce: v = view.getUint32(pos); pos += 4; return v
+      case 0xcf: v = Number(view.getBigUint64(pos)); pos += 8; return v
+      case 0xd0: v = view.getInt8(pos); pos += 1; return v
+      case 0xd1: v = view.getInt16(pos); pos += 2; return v
+      case 0xd2: v = view.getInt32(pos); pos += 4; return v
+      case 0xd3: v = Number(view.getBigInt64(pos)); pos += 8; return v
+      case 0xd9: v = bytes[pos]; pos += 1; return str(v)
+      case 0xda: v = view.getUint16(pos); pos += 2; return str(v)
+      case 0xdb: v = view.getUint32(pos); pos += 4; return str(v)
+      case 0xdc: v = view.getUint16(pos); pos += 2; return arr(v)
+      case 0xdd: v = view.getUint32(pos); pos += 4; return arr(v)
+      case 0xde: v = view.getUint16(pos); pos += 2; return map(v)
+      case 0xdf: v = view.getUint32(pos); pos += 4; return map(v)
+      default: throw new Error(`unsupported msgpack type 0x${t.toString(16)}`)
+    }
+  }
+  return read()
+}
+
+// {index: value} (or a list in table order) back to named fields; unknown keys pass through.
+function named(fields, keys) {
+  const out = {}
+  for (const [k, v] of Object.entries(fields)) {
+    const name = /^\d+$/.test(k) && Number(k) < keys.length ? keys[Number(k)] : k
+    out[name] = CARD_KEYS.has(name) && Array.isArray(v) ? v.map(cardText) : v
+  }
+  return out
+}
+
+export function decodeState(buffer) {
+  const [game, players] = unpack(buffer)
+  return { ...named(game, GAME_KEYS), players: players.map((p) => named(p, PLAYER_KEYS)) }
+}
+
+export function decodeDelta(buffer) {
+  const [game, players, removed, order] = unpack(buffer)
+  const { gameId, base, version, msg, ...changed } = named(game, GAME_KEYS)
+  const delta = { gameId, base, version, game: changed, players: {} }
+  if (msg !== undefined) delta.msg = msg
+  for (const [seat, fields] of Object.entries(players)) delta.players[seat] = named(fields, PLAYER_KEYS)
+  if (removed) delta.removed = removed
+  if (order) delta.order = order
+  return delta
+}
+
+export function decodeShowdown(buffer) {
+  const result = named(unpack(buffer), SHOWDOWN_KEYS)
+  if (result.show) result.show = result.show.map((s) => ({ ...named(s, SHOW_KEYS), score: String(s[3]) }))
+  return result
+}
@@ -2,4 +2,5 @@
 
 bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
 worker_class = "eventlet"
-workers = 1
+# More than one worker needs a shared GAME_STORE and SOCKETIO_MESSAGE_QUEUE.
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
@@ -1 +1,7 @@
-﻿from server.app import app
+﻿import os
+import sys
+
+# server/ modules import each other as top-level modules (gunicorn runs from server/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server"))
+
+from server.app import app
@@ -1,23 +1,61 @@
 import os
 import uuid
+import functools
+import itertools
 import json
+import time
+import logging
+import atexit
 import sqlite3
 from datetime import timedelta
-from dataclasses import dataclass, field
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Set, Tuple, Optional
 
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, abort, request, jsonify
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.wsgi import wrap_file
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import (
     JWTManager, create_access_token, jwt_required, get_jwt_identity
 )
 
+from bots import BotQueue, fallback_action
+from comments import CommentFeed
+from dbpool import ConnectionPool
+from equity import EquityPool
+from metrics import Counter, Gauge, Histogram, Metrics, PayloadSizeJSON
+from models import Game, Player
+from outbox import STATE, Outbox
+from passwords import LoginLimiter, PasswordHasher
+from preflop import PreflopTable
+from snapshots import SnapshotStore
+from static import StaticManifest, choose
+from store import MemoryStore, open_store
+from tournament import Tournament
+import wire
+from evaluator import cards_to_str
+from handlog import HandLog
+import engine
+
 # --- Setup ---
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
+log = logging.getLogger("holdem")
+METRICS = Metrics()
+
 CLIENT_DIST = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "client", "dist"))
+# Built once: serving a file is a dict lookup, with .br/.gz siblings preferred.
+STATIC = StaticManifest(CLIENT_DIST, max_age=int(os.environ.get("STATIC_MAX_AGE", "3600")))
 
 app = Flask(__name__)
+# Proxies in front of the app whose X-Forwarded-For entries are trusted (1 on
+# Railway). With 0 the header is ignored and clients are known by the socket
+# address, since anyone can send the header.
+TRUSTED_PROXIES = int(os.environ.get("TRUSTED_PROXIES", "0"))
+if TRUSTED_PROXIES > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
 app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret")
 app.config["JWT_SECRET_KEY"] = os.environ.get("JWT_SECRET_KEY", "dev-jwt")
 app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(days=3)
@@ -26,16 +64,40 @@ CORS(app, supports_credentials=True, origins=cors_origins)
 sio = SocketIO(
     app,
     cors_allowed_origins=cors_origins if cors_origins == "*" else [o.strip() for o in cors_origins.split(",")],
+    json=PayloadSizeJSON,
+    # Needed when more than one worker or container serves the same tables,
+    # e.g. redis://localhost:6379/0 (requires the matching client package).
+    message_queue=os.environ.get("SOCKETIO_MESSAGE_QUEUE") or None,
 )
 jwt = JWTManager(app)
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "app.db")
 
 # --- DB helpers ---
+DB_POOL = ConnectionPool(DB_PATH, size=int(os.environ.get("DB_POOL_SIZE", "8")))
+
 def db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Borrow a pooled connection: ``with db() as conn: ...`` commits on exit."""
+    return DB_POOL.connection()
+
+# Constant query strings so each pooled connection reuses its prepared statements.
+SQL_INSERT_USER = "INSERT INTO users (username, password_hash) VALUES (?, ?)"
+SQL_SELECT_USER = "SELECT password_hash FROM users WHERE username=?"
+
+# Password hashes and hand log writes run in eventlet's native thread pool so
+# they never stall the tables; past PASSWORD_HASH_QUEUE hashes in flight, auth answers 503.
+def _offload(fn, *args):
+    if sio.async_mode == "eventlet":
+        from eventlet import tpool
+        return tpool.execute(fn, *args)
+    return fn(*args)
+
+PASSWORDS = PasswordHasher(int(os.environ.get("PASSWORD_HASH_QUEUE", "32")), execute=_offload)
+# Failed logins per username and per client address: a burst, then one per refill interval.
+LOGIN_LIMITER = LoginLimiter(
+    burst=int(os.environ.get("LOGIN_FAILURE_BURST", "5")),
+    per_second=1 / float(os.environ.get("LOGIN_FAILURE_REFILL_SECONDS", "12")),
+)
 
 with db() as conn:
     conn.execute(
@@ -58,164 +120,193 @@ with db() as conn:
         )
         """
     )
-    conn.commit()
-
-# --- Card & hand evaluation ---
-RANKS = "23456789TJQKA"
-SUITS = "SHDC"  # Spades, Hearts, Diamonds, Clubs
-STARTING_CHIPS = 100
-SMALL_BET = 4
-BIG_BET = 8
-
-@dataclass
-class Player:
-    sid: str
-    name: str
-    in_hand: bool = True
-    cards: List[str] = field(default_factory=list)
-    raises: int = 0  # number of betting actions this hand
-    action_submitted: bool = False
-    chips: int = STARTING_CHIPS
-    round_bet: int = 0
-    pot: int = 0  # total chips committed this hand
-
-@dataclass
-class Game:
-    game_id: str
-    host_sid: Optional[str] = None
-    players: Dict[str, Player] = field(default_factory=dict)  # sid -> Player
-    deck: List[str] = field(default_factory=list)
-    board: List[str] = field(default_factory=list)
-    stage: str = "lobby"  # lobby, preflop, flop, turn, river, showdown
-    pot: int = 0
-    round_actions: Dict[str, str] = field(default_factory=dict)  # sid -> action
-    someone_raised: bool = False
-    current_bet: int = 0  # highest bet in current round
-    raise_made: bool = False  # whether someone has already raised in this round
-    max_players: int = 15
-
-    def reset_deck(self):
-        self.deck = [r + s for r in RANKS for s in SUITS]
-        import random
-        random.shuffle(self.deck)
-
-    def deal_to_all(self):
-        for p in list(self.players.values()):
-            if p.in_hand:
-                p.cards = [self.deck.pop(), self.deck.pop()]
-
-    def active_sids(self) -> List[str]:
-        return [p.sid for p in self.players.values() if p.in_hand]
-
-    def everyone_acted(self) -> bool:
-        for sid in self.active_sids():
-            if not self.players[sid].action_submitted and not self.players[sid].name.startswith("Host-"):
-                return False
-        return True
-
-# All live games by id
-GAMES: Dict[str, Game] = {}
-
-# --- Hand evaluator helpers ---
-from itertools import combinations
-
-RANK_TO_VAL = {r: i for i, r in enumerate(RANKS, start=2)}
-
-HAND_ORDER = {
-    "high": 0,
-    "pair": 1,
-    "two_pair": 2,
-    "three": 3,
-    "straight": 4,
-    "flush": 5,
-    "full_house": 6,
-    "four": 7,
-    "straight_flush": 8,
-}
-
-def card_to_tuple(c: str) -> Tuple[int, str]:
-    return (RANK_TO_VAL[c[0]], c[1])
-
-def is_straight(vals: List[int]) -> Optional[int]:
-    # vals sorted descending
-    uniq = sorted(set(vals), reverse=True)
-    # Wheel straight A-2-3-4-5
-    if {14,5,4,3,2}.issubset(set(vals)):
-        return 5
-    for i in range(len(uniq) - 4):
-        window = uniq[i:i+5]
-        if window[0] - window[4] == 4:
-            return window[0]
-    return None
-
-def classify_5(cards5: List[str]):
-    vals = sorted([card_to_tuple(c)[0] for c in cards5], reverse=True)
-    suits = [c[1] for c in cards5]
-    ranks = [c[0] for c in cards5]
-    is_flush = len(set(suits)) == 1
-    top_straight = is_straight(vals)
-
-    # counts
-    from collections import Counter
-    ctr = Counter(vals)
-    counts = sorted(ctr.items(), key=lambda x: (-x[1], -x[0]))  # by count desc, then rank desc
-
-    if is_flush and top_straight:
-        return (HAND_ORDER["straight_flush"], top_straight, vals)
-    if counts[0][1] == 4:
-        # four of a kind
-        quad = counts[0][0]
-        kicker = max([v for v in vals if v != quad])
-        return (HAND_ORDER["four"], quad, [kicker])
-    if counts[0][1] == 3 and counts[1][1] == 2:
-        # full house
-        trips = counts[0][0]
-        pair = counts[1][0]
-        return (HAND_ORDER["full_house"], trips, [pair])
-    if is_flush:
-        return (HAND_ORDER["flush"], vals)
-    if top_straight:
-        return (HAND_ORDER["straight"], top_straight)
-    if counts[0][1] == 3:
-        trips = counts[0][0]
-        kickers = [v for v in vals if v != trips][:2]
-        return (HAND_ORDER["three"], trips, kickers)
-    if counts[0][1] == 2 and counts[1][1] == 2:
-        high_pair = max(counts[0][0], counts[1][0])
-        low_pair = min(counts[0][0], counts[1][0])
-        kicker = max([v for v in vals if v != high_pair and v != low_pair])
-        return (HAND_ORDER["two_pair"], high_pair, low_pair, kicker)
-    if counts[0][1] == 2:
-        pair = counts[0][0]
-        kickers = [v for v in vals if v != pair][:3]
-        return (HAND_ORDER["pair"], pair, kickers)
-    return (HAND_ORDER["high"], vals)
-
-HAND_NAME = {
-    HAND_ORDER["high"]: "High Card",
-    HAND_ORDER["pair"]: "One Pair",
-    HAND_ORDER["two_pair"]: "Two Pair",
-    HAND_ORDER["three"]: "Three of a Kind",
-    HAND_ORDER["straight"]: "Straight",
-    HAND_ORDER["flush"]: "Flush",
-    HAND_ORDER["full_house"]: "Full House",
-    HAND_ORDER["four"]: "Four of a Kind",
-    HAND_ORDER["straight_flush"]: "Straight Flush",
-}
-
-def best_hand(hole: List[str], board: List[str]):
-    best = None
-    best5 = None
-    print(f"DEBUG: Evaluating hand for hole cards {hole} and board {board}")
-    for combo in combinations(hole + board, 5):
-        score = classify_5(list(combo))
-        if (best is None) or (score > best):
-            best = score
-            best5 = list(combo)
-            print(f"DEBUG: New best hand: {combo} with score {score}")
-    hand_name = HAND_NAME[best[0]]
-    print(f"DEBUG: Final best hand: {best5} with name {hand_name}")
-    return best, best5, hand_name
+    # get_comments filters on game_id and orders by id
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_comments_game_id ON comments (game_id, id)")
+
+# Recent comments per game are served from memory and inserted in batches
+# (see comments.py). COMMENT_CACHE_SIZE=0 goes straight to SQLite.
+COMMENT_PAGE_MAX = 100
+COMMENTS = CommentFeed(
+    DB_POOL,
+    per_game=int(os.environ.get("COMMENT_CACHE_SIZE", "200")),
+    flush_interval=float(os.environ.get("COMMENT_FLUSH_SECONDS", "0.25")),
+    start_task=sio.start_background_task,
+    sleep=sio.sleep,
+)
+atexit.register(COMMENTS.flush)
+
+# --- Equity ---
+# Equity odds sent to the host after every street. The budget is per table and
+# per street (EQUITY_BUDGET_MS, see models); EQUITY_WORKERS processes bound the
+# total CPU spent on it.
+EQUITY_MAX_BUDGET_MS = int(os.environ.get("EQUITY_MAX_BUDGET_MS", "2000"))
+EQUITY_WORKERS = int(os.environ.get("EQUITY_WORKERS", "1"))
+EQUITY_POLL_SECONDS = 0.02
+EQUITY_POOL = EquityPool(EQUITY_WORKERS, max_pending=EQUITY_WORKERS * 8)
+atexit.register(EQUITY_POOL.shutdown)  # or the process never exits under eventlet
+# Preflop odds come from the table built by preflop.py when it is present.
+PREFLOP_TABLE = PreflopTable.load()
+# Bot seats (see bots.py) decide in BOT_WORKERS processes of their own, so a
+# room full of bot tables never queues behind equity or runs on the event
+# loop. A decision must be made BOT_BUDGET_MS after it is asked for, queueing
+# included; one that has not arrived after BOT_TIMEOUT_MS checks or folds.
+BOT_WORKERS = int(os.environ.get("BOT_WORKERS", "1"))
+BOT_BUDGET_MS = int(os.environ.get("BOT_BUDGET_MS", "30"))
+BOT_TIMEOUT_MS = int(os.environ.get("BOT_TIMEOUT_MS", "250"))
+BOT_POOL = EquityPool(BOT_WORKERS, max_pending=BOT_WORKERS * 64)
+atexit.register(BOT_POOL.shutdown)
+BOT_DECISION_SECONDS = METRICS.add(Histogram(
+    "holdem_bot_decision_seconds", "Time from asking a bot for an action to having it.", ["outcome"]))
+BETTING_STAGES = ("preflop", "flop", "turn", "river")
+
+# All live games by id (in-process by default, see store.py)
+GAMES = open_store(os.environ.get("GAME_STORE", "memory"))
+# sid -> (game_id, seat) for sockets of this process that created or joined a
+# game (seat 0 for a host that has not joined), so a disconnect finds its game
+# without scanning GAMES.
+SESSIONS: Dict[str, Tuple[str, int]] = {}
+# Housekeeping (see sweep_games): tables idle for GAME_IDLE_SECONDS, or left
+# without players for GAME_EMPTY_SECONDS, are removed; past MAX_GAMES the least
+# recently used lobbies go first.
+GAME_IDLE_SECONDS = float(os.environ.get("GAME_IDLE_SECONDS", "1800"))
+GAME_EMPTY_SECONDS = float(os.environ.get("GAME_EMPTY_SECONDS", "120"))
+MAX_GAMES = int(os.environ.get("MAX_GAMES", "1000"))
+GAME_SWEEP_SECONDS = 15
+# last_active is only rewritten when it is this stale, so read-only events do
+# not make a shared store write the game back every time.
+ACTIVITY_RESOLUTION_SECONDS = 5
+GAMES_EVICTED = METRICS.add(Counter(
+    "holdem_games_evicted_total", "Games removed by the sweeper.", ["reason"]))
+_housekeeping = False
+# Completed hands are appended to rotating JSON-lines segments in HAND_LOG_DIR
+# (see handlog.py); an empty HAND_LOG_DIR turns the log off.
+HAND_LOG_DIR = os.environ.get("HAND_LOG_DIR", os.path.join(os.path.dirname(__file__), "hands"))
+HAND_LOG = HandLog(
+    HAND_LOG_DIR,
+    max_bytes=int(os.environ.get("HAND_LOG_MAX_MB", "64")) << 20,
+    start_task=sio.start_background_task,
+    sleep=sio.sleep,
+    execute=_offload,
+) if HAND_LOG_DIR else None
+if HAND_LOG is not None:
+    atexit.register(HAND_LOG.close)
+# In-memory games are snapshotted every SNAPSHOT_SECONDS to SNAPSHOT_PATH and
+# restored at startup (see snapshots.py); an empty SNAPSHOT_PATH turns this off.
+# Shared stores are already persistent and skip it.
+SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH", os.path.join(os.path.dirname(__file__), "snapshots.db"))
+SNAPSHOT_SECONDS = float(os.environ.get("SNAPSHOT_SECONDS", "5"))
+SNAPSHOTS = SnapshotStore(SNAPSHOT_PATH) if SNAPSHOT_PATH and isinstance(GAMES, MemoryStore) else None
+# How long a disconnected player's seat is held for them to reconnect; 0 drops
+# them immediately.
+RECONNECT_GRACE_SECONDS = float(os.environ.get("RECONNECT_GRACE_SECONDS", "30"))
+# Tournaments (see tournament.py) by id. Every TOURNAMENT_TICK_SECONDS the
+# director moves each table on: the next street TOURNAMENT_STREET_SECONDS after
+# a betting round settles, the next hand TOURNAMENT_HAND_SECONDS after a
+# showdown, and a check or fold for whoever has not acted within
+# TOURNAMENT_ACTION_SECONDS. Tournaments live in this process, so they need the
+# in-memory game store.
+TOURNAMENTS: Dict[str, Tournament] = {}
+TOURNAMENT_TICK_SECONDS = 0.25
+TOURNAMENT_STREET_SECONDS = float(os.environ.get("TOURNAMENT_STREET_SECONDS", "1"))
+TOURNAMENT_HAND_SECONDS = float(os.environ.get("TOURNAMENT_HAND_SECONDS", "5"))
+TOURNAMENT_ACTION_SECONDS = float(os.environ.get("TOURNAMENT_ACTION_SECONDS", "30"))
+MAX_TOURNAMENT_PLAYERS = int(os.environ.get("MAX_TOURNAMENT_PLAYERS", "1000"))
+TOURNAMENT_UPDATED = set()  # ids whose board changed since the last director tick
+_tournament_director = False
+
+METRICS.add(Gauge("holdem_active_games", "Live games.", lambda: len(GAMES)))
+METRICS.add(Gauge("holdem_active_players", "Seated players across all games.", lambda: GAMES.player_count()))
+METRICS.add(Gauge("holdem_sessions", "Sockets seated in a game on this process.", lambda: len(SESSIONS)))
+METRICS.add(Gauge("holdem_comment_queue", "Comments waiting to be written.", lambda: COMMENTS.pending))
+METRICS.add(Gauge("holdem_password_hashes", "Password hashes queued or running.", lambda: PASSWORDS.pending))
+METRICS.add(Gauge("holdem_login_limited_keys", "Usernames and addresses with recent failed logins.",
+                  lambda: LOGIN_LIMITER.tracked))
+METRICS.add(Gauge("holdem_bot_decisions_pending", "Bot decisions being computed.", lambda: BOT_QUEUE.pending))
+METRICS.add(Gauge("holdem_tournament_players", "Players still in a running tournament.",
+                  lambda: sum(t.alive for t in TOURNAMENTS.values() if t.stage == "running")))
+
+def game_event(fn):
+    """Run a socket handler while holding the lock of the game named by its ``gameId``.
+
+    With a shared store this loads the latest copy of the game before the
+    handler runs and persists it afterwards. The game is marked dirty for the
+    next snapshot whether or not the handler changed it.
+    """
+    @functools.wraps(fn)
+    def wrapper(data=None):
+        game_id = (data or {}).get("gameId") if isinstance(data, dict) else None
+        if not isinstance(game_id, str):
+            return fn(data)
+        with GAMES.locked(game_id):
+            try:
+                return fn(data)
+            finally:
+                g = GAMES.get(game_id)
+                if g is not None:
+                    mark_dirty(g)
+                now = time.time()
+                if g is not None and now - g.last_active > ACTIVITY_RESOLUTION_SECONDS:
+                    g.last_active = now
+    return wrapper
+
+def mark_dirty(g: Game):
+    """Note a change to ``g`` for the snapshotter; ``version`` only covers what players see."""
+    g.dirty += 1
+
+def room_emit(event: str, data, to: str):
+    """sio.emit that also records emit counts and payload bytes per room."""
+    PayloadSizeJSON.take()  # drop a size left by an earlier encode
+    sio.emit(event, data, to=to)
+    room = to.split("/", 1)[0]  # "<gameId>/json", "<gameId>/watch/..." count towards the game
+    size = len(data) if isinstance(data, bytes) else PayloadSizeJSON.take()
+    METRICS.emitted(room if room in GAMES else "direct", event, size)
+
+# Sockets that negotiated the compact protocol (see wire.py) at connect. Every
+# socket at a table also sits in exactly one of its two state rooms, so
+# snapshots, deltas and showdowns are encoded once per encoding per broadcast.
+BINARY_SIDS = set()
+STATE_ROOMS = ("/json", "/bin")
+
+def join_table(game_id: str):
+    join_room(game_id)
+    join_room(game_id + ("/bin" if request.sid in BINARY_SIDS else "/json"))
+
+# State broadcasts and in-hand room events are queued per table and sent every
+# BROADCAST_TICK_MS, folding the state changes of a burst into one delta; 0
+# sends each one immediately. A state change is serialized when it is sent,
+# so host handlers flush their table first: the betting that led to a street or
+# showdown always reaches clients before it.
+BROADCAST_TICK_MS = float(os.environ.get("BROADCAST_TICK_MS", "20"))
+
+def send_outbox(game_id: str, items: List[list]):
+    with GAMES.locked(game_id) as g:
+        if g is None:
+            return
+        for item in items:
+            if item[0] == STATE:
+                publish_state(g, "\n".join(item[1]) or None)
+            elif item[0] in wire.PACKERS:
+                emit_state(item[0], item[1], game_id)
+                if item[0] == "showdown":
+                    push_spectators(g, showdown=item[1])
+            else:
+                room_emit(item[0], item[1], to=item[2] or game_id)
+
+OUTBOX = Outbox(send_outbox, BROADCAST_TICK_MS / 1000.0,
+                start_task=sio.start_background_task, sleep=sio.sleep)
+METRICS.add(Gauge("holdem_state_broadcasts_coalesced_total",
+                  "State changes merged into an already queued broadcast.", lambda: OUTBOX.coalesced, kind="counter"))
+
+def emit_state(event: str, data: dict, game_id: str):
+    """Send a state, state_delta or showdown payload to both state rooms of a table."""
+    room_emit(event, data, to=game_id + "/json")
+    room_emit(event + "_bin", wire.PACKERS[event](data), to=game_id + "/bin")
+
+def send_state(event: str, data: dict, sid: str):
+    if sid in BINARY_SIDS:
+        room_emit(event + "_bin", wire.PACKERS[event](data), to=sid)
+    else:
+        room_emit(event, data, to=sid)
 
 # --- REST: auth & comments & rankings ---
 @app.post("/api/register")
@@ -225,11 +316,12 @@ def register():
     password = data.get("password", "")
     if not username or not password:
         return jsonify({"error": "username and password required"}), 400
-    pw_hash = generate_password_hash(password)
+    pw_hash = PASSWORDS.hash(password)
+    if pw_hash is None:
+        return busy()
     try:
         with db() as conn:
-            conn.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)", (username, pw_hash))
-            conn.commit()
+            conn.execute(SQL_INSERT_USER, (username, pw_hash))
     except sqlite3.IntegrityError:
         return jsonify({"error": "username already exists"}), 409
     # Auto-login after registration by returning access token
@@ -241,22 +333,33 @@ def login():
     data = request.get_json(force=True)
     username = data.get("username", "").strip()
     password = data.get("password", "")
+    # remote_addr is the socket peer, or the client address TRUSTED_PROXIES vouched for.
+    keys = ("user:" + username, "addr:" + (request.remote_addr or ""))
+    wait = LOGIN_LIMITER.retry_after(*keys)
+    if wait:
+        return jsonify({"error": "too many failed logins, try again later"}), 429, {"Retry-After": str(int(wait) + 1)}
     with db() as conn:
-        row = conn.execute("SELECT * FROM users WHERE username=?", (username,)).fetchone()
-    if not row or not check_password_hash(row["password_hash"], password):
+        row = conn.execute(SQL_SELECT_USER, (username,)).fetchone()
+    ok = bool(row) and PASSWORDS.check(row["password_hash"], password)
+    if ok is None:
+        return busy()
+    if not ok:
+        LOGIN_LIMITER.failed(*keys)
         return jsonify({"error": "invalid credentials"}), 401
+    LOGIN_LIMITER.succeeded(keys[0])
     token = create_access_token(identity=username)
     return jsonify({"access_token": token, "username": username})
 
+def busy():
+    return jsonify({"error": "server busy, try again shortly"}), 503, {"Retry-After": "1"}
+
 @app.get("/api/comments")
 def get_comments():
+    """Newest-first comments; pass the last ``id`` seen as ``before_id`` for older ones."""
     game_id = request.args.get("game_id", "")
-    with db() as conn:
-        rows = conn.execute(
-            "SELECT username, content, created_at FROM comments WHERE game_id=? ORDER BY id DESC LIMIT 50",
-            (game_id,)
-        ).fetchall()
-    return jsonify([dict(r) for r in rows])
+    before_id = request.args.get("before_id", type=int)
+    limit = max(1, min(request.args.get("limit", 50, type=int), COMMENT_PAGE_MAX))
+    return jsonify(COMMENTS.page(game_id, before_id, limit))
 
 @app.post("/api/comments")
 @jwt_required()
@@ -267,12 +370,15 @@ def post_comment():
     username = get_jwt_identity()
     if not content or not game_id:
         return jsonify({"error": "content and game_id required"}), 400
-    with db() as conn:
-        conn.execute("INSERT INTO comments (game_id, username, content) VALUES (?, ?, ?)", (game_id, username, content))
-        conn.commit()
-    # Broadcast to room ticker
-    sio.emit("new_comment", {"username": username, "content": content}, to=game_id)
-    return jsonify({"ok": True})
+    comment = COMMENTS.post(game_id, username, content)
+    # Broadcast to room ticker; the insert itself is flushed in the background
+    room_emit("new_comment", comment, to=game_id)
+    room_emit("new_comment", comment, to=game_id + "/watch")
+    return jsonify({"ok": True, "id": comment["id"]})
+
+@app.get("/api/metrics")
+def metrics():
+    return METRICS.render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
 
 @app.get("/api/hand-rankings")
 def hand_rankings():
@@ -292,309 +398,497 @@ def hand_rankings():
 # --- Static frontend ---
 @app.get("/")
 def serve_index():
-    return send_from_directory(CLIENT_DIST, "index.html")
+    return serve_asset(STATIC.get("index.html"))
 
 @app.get("/<path:path>")
 def serve_spa(path):
-    full_path = os.path.join(CLIENT_DIST, path)
-    if os.path.isfile(full_path):
-        return send_from_directory(CLIENT_DIST, path)
-    return send_from_directory(CLIENT_DIST, "index.html")
+    return serve_asset(STATIC.get(path) or STATIC.get("index.html"))
+
+def serve_asset(asset):
+    """Answer from the startup manifest: 304 on a matching ETag, else the best encoding."""
+    if asset is None:
+        abort(404)
+    coding, variant = choose(asset, request.accept_encodings)
+    headers = {"ETag": variant.etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+    if request.if_none_match.contains_weak(variant.etag.strip('"')):
+        return Response(status=304, headers=headers)
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    body = variant.data
+    if body is None:
+        body = wrap_file(request.environ, open(variant.path, "rb"))
+    headers["Content-Length"] = str(variant.size)
+    return Response(body, headers=headers, content_type=asset.content_type, direct_passthrough=True)
+
 # --- Socket.IO events ---
 @sio.on("connect")
-def on_connect():
+@METRICS.timed("connect")
+def on_connect(auth=None):
+    if isinstance(auth, dict) and auth.get("wire") == wire.NAME:
+        BINARY_SIDS.add(request.sid)
     emit("connected", {"sid": request.sid})
 
 @sio.on("disconnect")
-def on_disconnect():
+@METRICS.timed("disconnect")
+def on_disconnect(reason=None):
     sid = request.sid
-    # Remove from any game
-    for g in list(GAMES.values()):
-        if sid in g.players:
-            name = g.players[sid].name
-            del g.players[sid]
-            # If host disconnected, clear host_sid
+    BINARY_SIDS.discard(sid)
+    stop_watching(sid)
+    entry = SESSIONS.pop(sid, None)
+    if entry is None:
+        return
+    game_id = entry[0]
+    with GAMES.locked(game_id) as g:
+        if g is None:
+            return
+        p = g.players.get(sid)
+        if p is None:
             if sid == g.host_sid:
                 g.host_sid = None
-            sio.emit("lobby_update", {"count": len(g.players), "max": g.max_players}, to=g.game_id)
-            sio.emit("system", {"msg": f"{name} left."}, to=g.game_id)
-            # Emit updated state to all players including host
-            sio.emit("state", serialize_game(g), to=g.game_id)
-            break
+                mark_dirty(g)
+            return
+        mark_dirty(g)
+        if g.tournament_id is not None:
+            # The seat stays in the tournament; the action clock plays it until they are back.
+            p.connected = False
+            return broadcast_state(g, msg=f"{p.name} disconnected.")
+        if RECONNECT_GRACE_SECONDS <= 0:
+            return drop_player(g, sid)
+        # Hold the seat so the player can rebind a new socket with their token.
+        p.connected = False
+        broadcast_state(g, msg=f"{p.name} disconnected.")
+        sio.start_background_task(expire_seat, game_id, sid, p.token)
+
+def expire_seat(game_id: str, sid: str, token: str):
+    """Give up a held seat once the reconnect grace window has passed."""
+    sio.sleep(RECONNECT_GRACE_SECONDS)
+    with GAMES.locked(game_id) as g:
+        p = g.players.get(sid) if g is not None else None
+        # A rebind moves the player to a new sid, so a match means nobody came back.
+        if p is not None and not p.connected and p.token == token:
+            drop_player(g, sid)
+
+def drop_player(g: Game, sid: str):
+    name = g.players.pop(sid).name
+    mark_dirty(g)
+    # If host disconnected, clear host_sid
+    if sid == g.host_sid:
+        g.host_sid = None
+    broadcast_state(g, msg=f"{name} left.")
+
+def rebind_player(g: Game, p: Player, sid: str):
+    """Move a seated player to a new socket, keeping their seat, cards and chips."""
+    old_sid = p.sid
+    SESSIONS.pop(old_sid, None)
+    # Rebuild the dict to keep seating order, which the state diff relies on.
+    g.players = {(sid if k == old_sid else k): v for k, v in g.players.items()}
+    if old_sid in g.round_actions:
+        g.round_actions[sid] = g.round_actions.pop(old_sid)
+    if g.host_sid == old_sid:
+        g.host_sid = sid
+    p.sid = sid
+    p.connected = True
+    mark_dirty(g)
 
 @sio.on("host_create_game")
+@METRICS.timed("host_create_game")
 def host_create_game(data):
+    start_housekeeping()
+    if len(GAMES) >= MAX_GAMES and not evict_lobbies(len(GAMES) - MAX_GAMES + 1):
+        return emit("error", {"error": "Too many open games, try again later"})
     game_id = uuid.uuid4().hex[:6].upper()
     g = Game(game_id=game_id, host_sid=request.sid)
+    budget = (data or {}).get("equityBudgetMs")
+    if isinstance(budget, int) and not isinstance(budget, bool):
+        g.equity_budget_ms = max(0, min(budget, EQUITY_MAX_BUDGET_MS))
     GAMES[game_id] = g
-    join_room(game_id)
+    SESSIONS[request.sid] = (game_id, 0)
+    join_table(game_id)
     emit("game_created", {"gameId": game_id})
 
 @sio.on("join_game")
+@METRICS.timed("join_game")
+@game_event
 def join_game(data):
     game_id = (data or {}).get("gameId")
     name = (data or {}).get("name", "Player")[:20]
     if game_id not in GAMES:
         return emit("error", {"error": "Game not found"})
     g = GAMES[game_id]
-    if len(g.players) >= g.max_players:
-        return emit("error", {"error": "Game is full"})
-    join_room(game_id)
-    g.players[request.sid] = Player(sid=request.sid, name=name, in_hand=(g.stage == "lobby"))
-    sio.emit("lobby_update", {"count": len(g.players), "max": g.max_players}, to=game_id)
-    sio.emit("system", {"msg": f"{name} joined."}, to=game_id)
+    token = (data or {}).get("token")
+    held = None
+    if isinstance(token, str) and token:
+        held = next((p for p in g.players.values() if p.token == token), None)
+    if held is not None:
+        rebind_player(g, held, request.sid)
+        p = held
+        msg = f"{p.name} reconnected."
+    elif g.tournament_id is not None and request.sid not in g.players:
+        return emit("error", {"error": "Join this table through its tournament"})
+    else:
+        existing = g.players.get(request.sid)
+        if not existing and len(g.players) >= g.max_players:
+            return emit("error", {"error": "Game is full"})
+        seat = existing.seat if existing else g.next_seat
+        if not existing:
+            g.next_seat += 1
+        p = Player(sid=request.sid, name=name, in_hand=(g.stage == "lobby"), seat=seat,
+                   token=existing.token if existing else uuid.uuid4().hex)
+        g.players[request.sid] = p
+        msg = f"{name} joined."
+    SESSIONS[request.sid] = (game_id, p.seat)
+    join_table(game_id)
     # Emit updated state to all players including host
-    sio.emit("state", serialize_game(g), to=game_id)
-    emit("joined", {"gameId": game_id})
+    broadcast_state(g, msg=msg)
+    if g.last_state is None:
+        OUTBOX.flush(game_id)
+    # The newcomer's snapshot may trail the table by the queued delta, which continues from it.
+    send_state("state", g.last_state, request.sid)
+    if held is not None and held.cards:
+        room_emit("your_cards", {"cards": cards_to_str(held.cards)}, to=request.sid)
+    emit("joined", {"gameId": game_id, "seat": p.seat, "token": p.token})
 
 @sio.on("host_start")
+@METRICS.timed("host_start")
+@game_event
 def host_start(data):
-    print("Host started game.")
+    log.debug("Host started game.")
     game_id = (data or {}).get("gameId")
     if game_id not in GAMES:
         return emit("error", {"error": "Game not found"})
     g = GAMES[game_id]
-    if request.sid != g.host_sid:
-        return emit("error", {"error": "Only host can start"})
-    # Setup deck and deal
-    g.reset_deck()
-    g.board = []
-    g.pot = 0
-    g.stage = "preflop"
-    g.someone_raised = False
-    g.current_bet = 0
-    g.raise_made = False
-    for p in g.players.values():
-        p.in_hand = (not p.name.startswith("Host-")) and p.chips > 0
-        p.action_submitted = False
-        p.raises = 0
-        p.round_bet = 0
-        p.pot = 0
-        p.cards = []
-    g.deal_to_all()
-    # send private cards
-    for p in g.players.values():
-        sio.emit("your_cards", {"cards": p.cards}, to=p.sid)
-    sio.emit("state", serialize_game(g), to=game_id)
-
-def commit_chips(g: Game, p: Player, target_round_bet: int):
-    amount = target_round_bet - p.round_bet
-    if amount <= 0:
-        return 0, None
-    if p.chips < amount:
-        return 0, f"Not enough chips. You need {amount}, but only have {p.chips}."
-    p.chips -= amount
-    p.round_bet += amount
-    p.pot += amount
-    g.pot += amount
-    return amount, None
-
-
-def reset_betting_round(g: Game):
-    for p in g.players.values():
-        p.round_bet = 0
-        if p.in_hand:
-            p.action_submitted = False
-    g.someone_raised = False
-    g.current_bet = 0
-    g.raise_made = False
-
-
-def reset_players_who_owe_call(g: Game, bettor: Player):
-    for other_p in g.players.values():
-        if other_p.sid != bettor.sid and other_p.in_hand and other_p.round_bet < g.current_bet:
-            other_p.action_submitted = False
-
+    OUTBOX.flush(game_id)  # earlier changes go out before this hand's events
+    deliver(g, engine.host_start(g, request.sid))
 
 @sio.on("player_action")
+@METRICS.timed("player_action")
+@game_event
 def player_action(data):
     game_id = (data or {}).get("gameId")
     action = (data or {}).get("action")  # check, bet4, bet8, call, fold
     if game_id not in GAMES:
         return emit("error", {"error": "Game not found"})
     g = GAMES[game_id]
-    if request.sid not in g.players:
-        return emit("error", {"error": "Not in this game"})
-    p = g.players[request.sid]
-    if not p.in_hand:
-        return
-    if p.action_submitted:
-        return
-
-    needs_to_call = p.round_bet < g.current_bet
-
-    if action == "fold":
-        p.in_hand = False
-        p.action_submitted = True
-    elif action == "check":
-        if needs_to_call:
-            return emit("error", {"error": "Must call or fold - cannot check"})
-        p.action_submitted = True
-    elif action == "call":
-        if not needs_to_call:
-            return emit("error", {"error": "No need to call - you can check"})
-        _, error = commit_chips(g, p, g.current_bet)
-        if error:
-            return emit("error", {"error": error})
-        p.action_submitted = True
-    elif action == "bet4":
-        if g.current_bet > 0:
-            return emit("error", {"error": "There is already a bet. Call, raise to 8, or fold."})
-        if g.raise_made:
-            return emit("error", {"error": "Someone already raised in this round. You can only call or fold."})
-        _, error = commit_chips(g, p, SMALL_BET)
-        if error:
-            return emit("error", {"error": error})
-        p.raises += 1
-        p.action_submitted = True
-        g.someone_raised = True
-        g.current_bet = SMALL_BET
-        reset_players_who_owe_call(g, p)
-        print(f"Player {p.name} bet {SMALL_BET}. Current bet: {g.current_bet}, stack: {p.chips}")
-    elif action == "bet8":
-        if g.raise_made:
-            return emit("error", {"error": "Someone already raised in this round. You can only call or fold."})
-        if g.current_bet >= BIG_BET:
-            return emit("error", {"error": "Current bet is already 8. Call or fold."})
-        _, error = commit_chips(g, p, BIG_BET)
-        if error:
-            return emit("error", {"error": error})
-        p.raises += 1
-        p.action_submitted = True
-        g.someone_raised = True
-        g.raise_made = True
-        g.current_bet = BIG_BET
-        reset_players_who_owe_call(g, p)
-        print(f"Player {p.name} raised to {BIG_BET}. Current bet: {g.current_bet}, stack: {p.chips}")
-    else:
-        return emit("error", {"error": "Invalid action"})
-
-    sio.emit("state", serialize_game(g), to=game_id)
-    if g.everyone_acted():
-        sio.emit("round_settled", {"ok": True}, to=game_id)
+    deliver(g, engine.player_action(g, request.sid, action))
 
 @sio.on("host_deal_next")
+@METRICS.timed("host_deal_next")
+@game_event
 def host_deal_next(data):
-    print("Host dealt next cards.")
     game_id = (data or {}).get("gameId")
-    print(game_id)
+    log.debug("Host dealt next cards in game %s.", game_id)
+    if game_id not in GAMES:
+        return emit("error", {"error": "Game not found"})
+    g = GAMES[game_id]
+    OUTBOX.flush(game_id)  # the betting so far goes out before the new street or the showdown
+    started = time.perf_counter()
+    events = engine.host_deal_next(g, request.sid)
+    if g.stage == "showdown" and any(e.name == "showdown" for e in events):
+        METRICS.evaluator_seconds.observe(time.perf_counter() - started, "showdown")
+    deliver(g, events)
+
+@sio.on("host_add_bot")
+@METRICS.timed("host_add_bot")
+@game_event
+def host_add_bot(data):
+    game_id = (data or {}).get("gameId")
     if game_id not in GAMES:
         return emit("error", {"error": "Game not found"})
     g = GAMES[game_id]
-    print(g)
     if request.sid != g.host_sid:
-        return emit("error", {"error": "Only host can deal"})
-
-    # Ensure all active players acted
-    if not g.everyone_acted() and g.stage != "lobby":
-        print("Not all players have acted.")
-        return emit("error", {"error": "Wait for all players"})
-
-    # Advance stage & reveal board
-    if g.stage == "preflop":
-        print("Preflop stage dealing flop...")
-        # Standard Texas Hold'em reveals all three flop cards at once.
-        g.board.extend([g.deck.pop(), g.deck.pop(), g.deck.pop()])
-        g.stage = "flop"
-    elif g.stage == "flop":
-        g.board.append(g.deck.pop())  # turn
-        g.stage = "turn"
-    elif g.stage == "turn":
-        g.board.append(g.deck.pop())  # river
-        g.stage = "river"
-    elif g.stage == "river":
-        g.stage = "showdown"
-        winners = compute_winners(g)
-        print(f"DEBUG: Sending showdown results: {winners}")
-        print(f"DEBUG: Winners array type: {type(winners['winners'])}")
-        print(f"DEBUG: Winners array content: {winners['winners']}")
-        print(f"DEBUG: Winners array length: {len(winners['winners'])}")
-        sio.emit("showdown", winners, to=g.game_id)
-        sio.emit("state", serialize_game(g), to=g.game_id)
-        return
+        return emit("error", {"error": "Only host can add bots"})
+    if len(g.players) >= g.max_players:
+        return emit("error", {"error": "Game is full"})
+    seat = g.next_seat
+    g.next_seat += 1
+    # Socket sids never contain a colon, so this cannot clash with a real one.
+    sid = f"bot:{seat}"
+    g.players[sid] = Player(sid=sid, name=f"Bot {seat}", in_hand=(g.stage == "lobby"), seat=seat, bot=True)
+    BOT_QUEUE.warm()
+    broadcast_state(g, msg=f"Bot {seat} joined.")
+
+@sio.on("host_remove_bot")
+@METRICS.timed("host_remove_bot")
+@game_event
+def host_remove_bot(data):
+    game_id = (data or {}).get("gameId")
+    if game_id not in GAMES:
+        return emit("error", {"error": "Game not found"})
+    g = GAMES[game_id]
+    if request.sid != g.host_sid:
+        return emit("error", {"error": "Only host can remove bots"})
+    seat = (data or {}).get("seat")
+    bot = next((p for p in g.players.values() if p.bot and p.seat == seat), None)
+    if bot is None:
+        return emit("error", {"error": "No such bot"})
+    drop_player(g, bot.sid)
+
+@sio.on("host_create_tournament")
+@METRICS.timed("host_create_tournament")
+def host_create_tournament(data):
+    if not isinstance(GAMES, MemoryStore):
+        return emit("error", {"error": "Tournaments need the in-memory game store"})
+    start_housekeeping()
+    size = (data or {}).get("tableSize")
+    size = size if isinstance(size, int) and not isinstance(size, bool) and 2 <= size <= 15 else 9
+    tournament_id = "T" + uuid.uuid4().hex[:5].upper()
+    TOURNAMENTS[tournament_id] = Tournament(
+        tournament_id, request.sid, lambda: uuid.uuid4().hex[:6].upper(), table_size=size,
+        hand_pause=TOURNAMENT_HAND_SECONDS, street_pause=TOURNAMENT_STREET_SECONDS,
+        action_seconds=TOURNAMENT_ACTION_SECONDS)
+    join_room(tournament_room(tournament_id))
+    emit("tournament_created", {"tournamentId": tournament_id})
+    emit("tournament", TOURNAMENTS[tournament_id].board())
+
+@sio.on("join_tournament")
+@METRICS.timed("join_tournament")
+def join_tournament(data):
+    """Follow a tournament, register for it, or with a token get back to your table."""
+    t = TOURNAMENTS.get((data or {}).get("tournamentId"))
+    if t is None:
+        return emit("error", {"error": "Tournament not found"})
+    join_room(tournament_room(t.tournament_id))
+    emit("tournament", t.board())
+    token = (data or {}).get("token")
+    if isinstance(token, str) and token in t.table_of:
+        return emit("tournament_seated", {"tournamentId": t.tournament_id, "gameId": t.table_of[token],
+                                          "token": token})
+    if isinstance(token, str) and token in t.registered:
+        t.registered[token].sid = request.sid
+        return emit("tournament_registered", {"tournamentId": t.tournament_id, "token": token})
+    name = (data or {}).get("name")
+    if not isinstance(name, str) or not name.strip():
+        return  # just watching the lobby
+    if t.alive >= MAX_TOURNAMENT_PLAYERS:
+        return emit("error", {"error": "Tournament is full"})
+    p, error = t.register(request.sid, name.strip()[:20])
+    if error:
+        return emit("error", {"error": error})
+    TOURNAMENT_UPDATED.add(t.tournament_id)
+    emit("tournament_registered", {"tournamentId": t.tournament_id, "token": p.token})
+
+@sio.on("host_add_tournament_bots")
+@METRICS.timed("host_add_tournament_bots")
+def host_add_tournament_bots(data):
+    t = TOURNAMENTS.get((data or {}).get("tournamentId"))
+    if t is None:
+        return emit("error", {"error": "Tournament not found"})
+    if request.sid != t.host_sid:
+        return emit("error", {"error": "Only host can add bots"})
+    count = (data or {}).get("count")
+    count = count if isinstance(count, int) and not isinstance(count, bool) else 1
+    for _ in range(max(0, min(count, MAX_TOURNAMENT_PLAYERS - t.alive))):
+        _, error = t.register(None, None, bot=True)
+        if error:
+            return emit("error", {"error": error})
+    TOURNAMENT_UPDATED.add(t.tournament_id)
+
+@sio.on("host_start_tournament")
+@METRICS.timed("host_start_tournament")
+def host_start_tournament(data):
+    t = TOURNAMENTS.get((data or {}).get("tournamentId"))
+    if t is None:
+        return emit("error", {"error": "Tournament not found"})
+    if request.sid != t.host_sid:
+        return emit("error", {"error": "Only host can start"})
+    if len(GAMES) + -(-t.alive // t.table_size) > MAX_GAMES:
+        return emit("error", {"error": "Too many open games, try again later"})
+    if any(p.bot for p in t.registered.values()):
+        BOT_QUEUE.warm()
+    tables, error = t.start()
+    if error:
+        return emit("error", {"error": error})
+    for g in tables:
+        GAMES[g.game_id] = g
+        for p in g.players.values():
+            if not p.bot:
+                SESSIONS[p.sid] = (g.game_id, p.seat)
+                move_sockets(p, None, g.game_id)
+                room_emit("tournament_seated", {"tournamentId": t.tournament_id, "gameId": g.game_id,
+                                                "token": p.token}, to=p.sid)
+        deliver(g, engine.host_start(g, t.director))
+    TOURNAMENT_UPDATED.add(t.tournament_id)
+    start_tournament_director()
 
-    # Reset per-round flags and street bets for next betting round.
-    reset_betting_round(g)
+@sio.on("host_finish_tournament")
+@METRICS.timed("host_finish_tournament")
+def host_finish_tournament(data):
+    t = TOURNAMENTS.get((data or {}).get("tournamentId"))
+    if t is None:
+        return emit("error", {"error": "Tournament not found"})
+    if request.sid != t.host_sid:
+        return emit("error", {"error": "Only host can finish"})
+    if t.stage != "running":
+        return emit("error", {"error": "Tournament is not running"})
+    t.finish()
+    close_tournament(t)
 
-    sio.emit("state", serialize_game(g), to=g.game_id)
+@sio.on("watch_game")
+@METRICS.timed("watch_game")
+def watch_game(data):
+    """Follow a table as a spectator: no seat, no hole cards, snapshots at most every SPECTATOR_SECONDS."""
+    game_id = (data or {}).get("gameId")
+    g = GAMES.get(game_id) if isinstance(game_id, str) else None
+    if g is None:
+        return emit("error", {"error": "Game not found"})
+    stop_watching(request.sid)
+    rooms = SPECTATOR_ROOMS.setdefault(game_id, {})
+    kind = "bin" if request.sid in BINARY_SIDS else "json"
+    room = next((r for r, sids in rooms.items() if len(sids) < SPECTATOR_ROOM_SIZE and r.split("/")[2] == kind), None)
+    if room is None:
+        room = f"{game_id}/watch/{kind}/{next(_spectator_room_ids)}"
+    rooms.setdefault(room, set()).add(request.sid)
+    WATCHING[request.sid] = (game_id, room)
+    join_room(room)
+    join_room(game_id + "/watch")
+    start_spectator_feed()
+    if g.last_state is not None:
+        send_state("state", g.last_state, request.sid)
+    emit("watching", {"gameId": game_id})
 
 @sio.on("request_state")
+@METRICS.timed("request_state")
+@game_event
 def request_state(data):
     game_id = (data or {}).get("gameId")
     if game_id in GAMES:
-        sio.emit("state", serialize_game(GAMES[game_id]), to=request.sid)
+        g = GAMES[game_id]
+        if g.last_state is None:
+            broadcast_state(g)
+            OUTBOX.flush(game_id)
+        send_state("state", g.last_state, request.sid)
 
 @sio.on("host_reset_round")
+@METRICS.timed("host_reset_round")
+@game_event
 def host_reset_round(data):
     game_id = (data or {}).get("gameId")
     if game_id not in GAMES:
         return emit("error", {"error": "Game not found"})
     g = GAMES[game_id]
-    if request.sid != g.host_sid:
-        return emit("error", {"error": "Only host can reset"})
-    # Reset to lobby or immediately start another hand
-    g.board = []
-    g.pot = 0
-    g.stage = "preflop"
-    g.someone_raised = False
-    g.current_bet = 0
-    g.raise_made = False
-    g.reset_deck()
-    for p in g.players.values():
-        p.in_hand = (not p.name.startswith("Host-")) and p.chips > 0
-        p.action_submitted = False
-        p.raises = 0
-        p.round_bet = 0
-        p.pot = 0
-        p.cards = []
-    g.deal_to_all()
-    for p in g.players.values():
-        sio.emit("your_cards", {"cards": p.cards}, to=p.sid)
-    sio.emit("state", serialize_game(g), to=g.game_id)
+    OUTBOX.flush(game_id)  # earlier changes go out before this hand's events
+    deliver(g, engine.host_reset_round(g, request.sid))
 
 # --- helpers ---
-def compute_winners(g: Game):
-    # Determine active players (those who did not fold before showdown)
-    contenders = [p for p in g.players.values() if p.in_hand]
-    if not contenders:
-        return {"winners": [], "hand": None}
-    # Compute best hands
-    scored = []
-    for p in contenders:
-        score, five, name = best_hand(p.cards, g.board)
-        scored.append((score, p, name, five))
-        print(f"DEBUG: Player {p.name} has cards {p.cards}, board is {g.board}, best hand: {name}, score: {score}")
-    scored.sort(reverse=True, key=lambda t: t[0])
-    top = scored[0][0]
-    winning_players = [s[1] for s in scored if s[0] == top]
-    winners = [p.name for p in winning_players]
-    pot_before_payout = g.pot
-    payouts = {}
-    if winning_players and pot_before_payout:
-        share = pot_before_payout // len(winning_players)
-        remainder = pot_before_payout % len(winning_players)
-        for index, winner in enumerate(winning_players):
-            payout = share + (1 if index < remainder else 0)
-            winner.chips += payout
-            payouts[winner.name] = payout
-    print(f"DEBUG: Top score is {top}, winners are {winners}, payouts are {payouts}")
-    print(f"DEBUG: All player names in game: {[p.name for p in g.players.values()]}")
-    return {
-        "winners": winners,
-        "payouts": payouts,
-        "pot": pot_before_payout,
-        "board": g.board,
-        "hand_name": HAND_NAME[top[0]],  # This is the winning hand name
-        "show": [
-            {"name": s[1].name, "cards": s[1].cards, "best5": s[3], "score": str(s[0]), "hand_name": s[2]} for s in scored
+def deliver(g: Game, events: List[engine.Event]):
+    """Carry out the engine's events for ``g``: emits, broadcasts, equity, bots and the hand log."""
+    mark_dirty(g)  # the engine may have changed the deck or hands without a broadcast
+    changed = False
+    for event in events:
+        if event.to is not None and event.to in g.players and g.players[event.to].bot:
+            continue  # nobody to send a bot's cards or errors to
+        if event.name == "error":
+            emit("error", event.data)
+        elif event.name == "state":
+            broadcast_state(g)
+            changed = True
+        elif event.name == "street":
+            schedule_equity(g)
+        elif event.name == "hand_logged":
+            if HAND_LOG is not None:
+                HAND_LOG.append(event.data)
+        else:
+            if event.name == "showdown":
+                log.debug("Sending showdown results: %s", event.data)
+            OUTBOX.emit(g.game_id, event.name, event.data, event.to)
+    if changed:
+        schedule_bots(g)
+
+def schedule_equity(g: Game):
+    """Start computing win/tie odds for the current street in the equity pool."""
+    if not g.equity_budget_ms or not g.host_sid:
+        return
+    contenders = [p for p in g.players.values() if p.in_hand and len(p.cards) == 2]
+    if len(contenders) < 2:
+        return
+    holes = [p.cards for p in contenders]
+    if g.stage == "preflop" and PREFLOP_TABLE is not None and PREFLOP_TABLE.covers(len(contenders)):
+        emit_preflop_equity(g, contenders, holes)
+        return
+    fut = EQUITY_POOL.submit(holes, g.board, g.equity_budget_ms)
+    if fut is None:
+        log.warning("Equity pool saturated, skipping odds for game %s", g.game_id)
+        return
+    sio.start_background_task(deliver_equity, g, fut, [p.name for p in contenders], g.hand_no, g.stage,
+                              time.perf_counter())
+
+def emit_preflop_equity(g: Game, contenders: List[Player], holes: List[List[int]]):
+    # Each hand's odds against len(contenders) - 1 random hands, straight from the table.
+    players = []
+    for p, (c1, c2) in zip(contenders, holes):
+        win, tie, eq = PREFLOP_TABLE.lookup(c1, c2, len(contenders))
+        players.append({"name": p.name, "win": win, "tie": tie, "equity": eq})
+    room_emit("equity", {
+        "gameId": g.game_id,
+        "stage": g.stage,
+        "exact": False,
+        "samples": 0,
+        "source": "preflop_table",
+        "players": players,
+    }, to=g.host_sid)
+
+def deliver_equity(g: Game, fut, names: List[str], hand_no: int, stage: str, started: float):
+    # Poll instead of blocking on the future so the eventlet loop keeps running.
+    while not fut.done():
+        sio.sleep(EQUITY_POLL_SECONDS)
+    METRICS.evaluator_seconds.observe(time.perf_counter() - started, "equity")
+    if fut.cancelled() or fut.exception() is not None:
+        log.error("Equity calculation failed for game %s: %s", g.game_id, fut.exception())
+        return
+    # Drop results for a street that is no longer on the table.
+    g = GAMES.get(g.game_id)
+    if g is None or g.hand_no != hand_no or g.stage != stage or not g.host_sid:
+        return
+    result = fut.result()
+    room_emit("equity", {
+        "gameId": g.game_id,
+        "stage": stage,
+        "exact": result["exact"],
+        "samples": result["samples"],
+        "source": "live",
+        "players": [
+            {"name": name, "win": win, "tie": tie, "equity": eq}
+            for name, win, tie, eq in zip(names, result["win"], result["tie"], result["equity"])
         ],
-    }
+    }, to=g.host_sid)
+
+def schedule_bots(g: Game):
+    """Ask for the action of every bot the current betting round is waiting on."""
+    if g.stage not in BETTING_STAGES:
+        return
+    live = sum(1 for p in g.players.values() if p.in_hand)
+    for p in g.players.values():
+        if p.bot and p.in_hand and not p.action_submitted:
+            # The key pins the situation; a raise or a new street asks again.
+            key = (g.game_id, p.sid, g.hand_no, g.stage, g.current_bet)
+            BOT_QUEUE.submit(key, p.cards, g.board, live - 1, engine.legal_actions(g, p),
+                             g.current_bet - p.round_bet, g.pot, time.time() + BOT_BUDGET_MS / 1000.0)
+
+def apply_bot_decision(key: tuple, result: Optional[dict], outcome: str, seconds: float):
+    BOT_DECISION_SECONDS.observe(seconds, outcome)
+    game_id, sid, hand_no, stage, current_bet = key
+    with GAMES.locked(game_id) as g:
+        if g is None:
+            return
+        p = g.players.get(sid)
+        if p is None or not p.in_hand or p.action_submitted:
+            return
+        if (g.hand_no, g.stage, g.current_bet) != (hand_no, stage, current_bet):
+            return schedule_bots(g)  # the table moved on while this bot was thinking
+        legal = engine.legal_actions(g, p)
+        action = result["action"] if result else fallback_action(legal)
+        if action not in legal:
+            action = fallback_action(legal)
+        deliver(g, engine.player_action(g, sid, action))
+
+BOT_QUEUE = BotQueue(BOT_POOL, apply_bot_decision, BOT_TIMEOUT_MS / 1000.0, poll=EQUITY_POLL_SECONDS,
+                     start_task=sio.start_background_task, sleep=sio.sleep)
 
 def serialize_game(g: Game):
     result = {
         "gameId": g.game_id,
         "stage": g.stage,
-        "board": g.board,
+        "board": cards_to_str(g.board),
         "pot": g.pot,
         "someoneRaised": g.someone_raised,
         "currentBet": g.current_bet,
@@ -610,16 +904,362 @@ def serialize_game(g: Game):
                 "totalBet": p.pot,
                 "pot": p.pot,
                 "callAmount": max(g.current_bet - p.round_bet, 0),
-                "needsToCall": p.in_hand and p.round_bet < g.current_bet and not p.action_submitted
+                "needsToCall": p.in_hand and p.round_bet < g.current_bet and not p.action_submitted,
+                "seat": p.seat,
+                "connected": p.connected,
+                "bot": p.bot,
             }
             for p in g.players.values()
         ],
         "count": len(g.players),
         "max": g.max_players,
     }
-    print(f"Serialized game - Pot: {g.pot}, Current bet: {g.current_bet}, Players: {[(p.name, p.chips, p.round_bet, p.pot) for p in g.players.values()]}")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Serialized game - Pot: %s, Current bet: %s, Players: %s", g.pot, g.current_bet,
+                  [(p.name, p.chips, p.round_bet, p.pot) for p in g.players.values()])
     return result
 
+def diff_state(prev: dict, state: dict) -> dict:
+    """Changed game fields and per-seat player fields between two snapshots."""
+    game = {k: v for k, v in state.items() if k != "players" and prev.get(k) != v}
+    before = {p["seat"]: p for p in prev["players"]}
+    players = {}
+    for p in state["players"]:
+        old = before.pop(p["seat"], None)
+        if old is None:
+            players[str(p["seat"])] = p
+        else:
+            changed = {k: v for k, v in p.items() if old.get(k) != v}
+            if changed:
+                players[str(p["seat"])] = changed
+    delta = {"game": game, "players": players}
+    if before:
+        delta["removed"] = list(before)
+    order = [p["seat"] for p in state["players"]]
+    if order != [p["seat"] for p in prev["players"]]:
+        delta["order"] = order
+    return delta
+
+def broadcast_state(g: Game, msg: Optional[str] = None):
+    """Queue a broadcast of ``g``; changes within one outbox tick go out as one."""
+    OUTBOX.state(g.game_id, msg)
+
+def publish_state(g: Game, msg: Optional[str] = None):
+    """Send the room what changed since the last broadcast, tagged with a new version.
+
+    Clients apply ``state_delta`` on top of the snapshot at ``base`` and call
+    ``request_state`` for a full snapshot when they notice a gap. ``msg`` rides
+    along as a one-off system notice instead of a separate emit.
+    """
+    state = serialize_game(g)
+    prev = g.last_state
+    if prev is not None:
+        delta = diff_state(prev, state)
+        if not (delta["game"] or delta["players"] or "removed" in delta or "order" in delta or msg):
+            return
+    g.version += 1
+    state["version"] = g.version
+    g.last_state = state
+    if prev is None:
+        emit_state("state", dict(state, msg=msg) if msg else state, g.game_id)
+    else:
+        delta["gameId"] = g.game_id
+        delta["base"] = g.version - 1
+        delta["version"] = g.version
+        if msg:
+            delta["msg"] = msg
+        emit_state("state_delta", delta, g.game_id)
+
+# --- Spectators ---
+# Spectators sit in "<gameId>/watch/<json|bin>/<n>" rooms of up to
+# SPECTATOR_ROOM_SIZE sockets (plus "<gameId>/watch" for comments and closing).
+# Every SPECTATOR_SECONDS a table that changed sends each of its rooms the
+# players' last snapshot, which never holds hole cards; the binary form is
+# packed once and the loop yields between rooms so seated players' events are
+# not held up. Rooms are per process and emitted without the message queue.
+SPECTATOR_SECONDS = float(os.environ.get("SPECTATOR_SECONDS", "1"))
+SPECTATOR_ROOM_SIZE = int(os.environ.get("SPECTATOR_ROOM_SIZE", "250"))
+SPECTATOR_ROOMS: Dict[str, Dict[str, Set[str]]] = {}  # game_id -> room -> spectator sids in it
+SPECTATED: Dict[str, int] = {}  # game_id -> version last sent to its spectators
+WATCHING: Dict[str, Tuple[str, str]] = {}  # sid -> (game_id, room)
+_spectator_room_ids = itertools.count()
+_spectator_feed = False
+METRICS.add(Gauge("holdem_spectators", "Spectator sockets on this process.", lambda: len(WATCHING)))
+
+def start_spectator_feed():
+    global _spectator_feed
+    if not _spectator_feed:
+        _spectator_feed = True
+        sio.start_background_task(spectator_feed)
+
+def spectator_feed():
+    while True:
+        sio.sleep(SPECTATOR_SECONDS)
+        for game_id in list(SPECTATOR_ROOMS):
+            g = GAMES.get(game_id)
+            if g is None:
+                SPECTATOR_ROOMS.pop(game_id, None)
+                continue
+            try:
+                push_spectators(g)
+            except Exception:
+                log.exception("spectator update failed for game %s", game_id)
+
+def push_spectators(g: Game, showdown: Optional[dict] = None):
+    """Send a table's spectators its snapshot if it moved (and ``showdown`` after it)."""
+    rooms = SPECTATOR_ROOMS.get(g.game_id)
+    state = g.last_state
+    if not rooms or state is None:
+        return
+    fresh = SPECTATED.get(g.game_id) != state["version"]
+    if not fresh and showdown is None:
+        return
+    SPECTATED[g.game_id] = state["version"]
+    packed = {}
+    for room in list(rooms):
+        binary = room.split("/")[2] == "bin"
+        for event, data in (("state", state if fresh else None), ("showdown", showdown)):
+            if data is None:
+                continue
+            if binary:
+                if event not in packed:
+                    packed[event] = wire.PACKERS[event](data)
+                event, data = event + "_bin", packed[event]
+            PayloadSizeJSON.take()
+            sio.emit(event, data, to=room, ignore_queue=True)
+            size = len(data) if binary else PayloadSizeJSON.take()
+            METRICS.emitted(g.game_id, "watch_" + event, size)
+        sio.sleep(0)  # let player handlers run between rooms
+
+def stop_watching(sid: str):
+    entry = WATCHING.pop(sid, None)
+    if entry is None:
+        return
+    game_id, room = entry
+    rooms = SPECTATOR_ROOMS.get(game_id, {})
+    if room in rooms:
+        rooms[room].discard(sid)
+        if not rooms[room]:
+            del rooms[room]
+    if not rooms:
+        SPECTATOR_ROOMS.pop(game_id, None)
+        SPECTATED.pop(game_id, None)
+    leave_room(room, sid=sid)
+    leave_room(game_id + "/watch", sid=sid)
+
+# --- Tournaments ---
+# Lobby and host screens follow "<tournamentId>/tournament"; the board goes out
+# at most once per director tick. Seated players also get their own rank after
+# every hand at their table.
+def tournament_room(tournament_id: str) -> str:
+    return tournament_id + "/tournament"
+
+def start_tournament_director():
+    global _tournament_director
+    if not _tournament_director:
+        _tournament_director = True
+        sio.start_background_task(tournament_director)
+
+def tournament_director():
+    while True:
+        sio.sleep(TOURNAMENT_TICK_SECONDS)
+        now = time.time()
+        for t in list(TOURNAMENTS.values()):
+            if t.stage == "running":
+                for game_id in list(t.tables):
+                    try:
+                        direct_table(t, game_id, now)
+                    except Exception:
+                        log.exception("tournament %s: table %s failed", t.tournament_id, game_id)
+            if t.tournament_id in TOURNAMENT_UPDATED:
+                TOURNAMENT_UPDATED.discard(t.tournament_id)
+                room_emit("tournament", t.board(), to=tournament_room(t.tournament_id))
+            sio.sleep(0)
+
+def direct_table(t: Tournament, game_id: str, now: float):
+    with GAMES.locked(game_id) as g:
+        step = t.due(g, now) if g is not None else None
+        if step is None:
+            return
+        g.last_active = now
+        if step == "deal":
+            OUTBOX.flush(game_id)
+            deliver(g, engine.host_deal_next(g, t.director))
+        elif step == "act":
+            for p in list(g.players.values()):
+                if p.in_hand and not p.action_submitted:
+                    deliver(g, engine.player_action(g, p.sid, fallback_action(engine.legal_actions(g, p))))
+        else:
+            finish_table_hand(t, g)
+
+def finish_table_hand(t: Tournament, g: Game):
+    """Take a table's busted players out, carry out the seat moves and deal on."""
+    OUTBOX.flush(g.game_id)
+    result = t.hand_finished(g)
+    for p, place in result.busted:
+        SESSIONS.pop(p.sid, None)
+        if not p.bot:
+            move_sockets(p, g.game_id, None)
+            room_emit("tournament_busted", {"tournamentId": t.tournament_id, "place": place}, to=p.sid)
+    for move in result.moves:
+        p = move.player
+        if not p.bot:
+            SESSIONS[p.sid] = (move.dst, p.seat)
+            move_sockets(p, move.src, move.dst)
+            room_emit("table_moved", {"tournamentId": t.tournament_id, "gameId": move.dst, "token": p.token},
+                      to=p.sid)
+    for game_id in result.closed:
+        evict_game(game_id, "tournament", lambda g: True)
+    if g.game_id not in result.closed:
+        out = [f"{p.name} is out in place {place}." for p, place in result.busted]
+        broadcast_state(g, msg="\n".join(out) or None)
+    for game_id in {move.dst for move in result.moves}:
+        broadcast_state(GAMES[game_id])
+    for game_id in result.ready:
+        table = GAMES[game_id]
+        OUTBOX.flush(game_id)
+        deliver(table, engine.host_start(table, t.director))
+    for p in list(g.players.values()) + [move.player for move in result.moves]:
+        if not p.bot and p.name in t.standings:
+            room_emit("tournament_rank", {"tournamentId": t.tournament_id, "rank": t.standings.rank(p.name),
+                                          "alive": len(t.standings), "chips": p.chips}, to=p.sid)
+    TOURNAMENT_UPDATED.add(t.tournament_id)
+    if t.stage == "finished":
+        close_tournament(t)
+
+def close_tournament(t: Tournament):
+    board = t.board()
+    board["places"] = sorted(({"name": name, "place": place} for name, place in t.places.items()),
+                             key=lambda e: e["place"])
+    room_emit("tournament_over", board, to=tournament_room(t.tournament_id))
+    for game_id in list(t.tables):
+        evict_game(game_id, "tournament", lambda g: True)
+    t.tables.clear()
+
+def move_sockets(p: Player, src: Optional[str], dst: Optional[str]):
+    """Move a seated player's socket from table ``src``'s rooms to ``dst``'s."""
+    if not p.connected:
+        return
+    suffix = "/bin" if p.sid in BINARY_SIDS else "/json"
+    if src is not None:
+        sio.server.leave_room(p.sid, src, namespace="/")
+        sio.server.leave_room(p.sid, src + suffix, namespace="/")
+    if dst is not None:
+        sio.server.enter_room(p.sid, dst, namespace="/")
+        sio.server.enter_room(p.sid, dst + suffix, namespace="/")
+
+# --- Housekeeping ---
+def start_housekeeping():
+    global _housekeeping
+    if not _housekeeping:
+        _housekeeping = True
+        sio.start_background_task(sweeper)
+        if SNAPSHOTS is not None:
+            sio.start_background_task(snapshotter)
+
+def sweeper():
+    while True:
+        sio.sleep(GAME_SWEEP_SECONDS)
+        try:
+            sweep_games()
+        except Exception:
+            log.exception("game sweep failed")
+
+def sweep_games(now: Optional[float] = None) -> int:
+    """Evict idle and empty games, then lobbies over MAX_GAMES; returns the count."""
+    now = time.time() if now is None else now
+    evicted = 0
+    # A running tournament's tables are its director's to close.
+    directed = lambda g: g.tournament_id in TOURNAMENTS and TOURNAMENTS[g.tournament_id].stage == "running"
+    is_idle = lambda g: now - g.last_active > GAME_IDLE_SECONDS and not directed(g)
+    # Bots alone do not keep a table open.
+    is_empty = lambda g: (all(p.bot for p in g.players.values()) and now - g.last_active > GAME_EMPTY_SECONDS
+                          and not directed(g))
+    for g in GAMES.values():
+        if is_idle(g):
+            evicted += evict_game(g.game_id, "idle", is_idle)
+        elif is_empty(g):
+            evicted += evict_game(g.game_id, "empty", is_empty)
+    if len(GAMES) > MAX_GAMES:
+        evicted += evict_lobbies(len(GAMES) - MAX_GAMES)
+    for tournament_id, t in list(TOURNAMENTS.items()):
+        if t.stage != "running" and now - t.last_active > GAME_IDLE_SECONDS:
+            del TOURNAMENTS[tournament_id]
+    return evicted
+
+def evict_lobbies(count: int) -> int:
+    """Evict up to ``count`` lobbies nobody is connected to, least recently active first.
+
+    Tables with a hand in play, or whose host socket is still connected here,
+    are never evicted for capacity.
+    """
+    abandoned = lambda g: (g.stage == "lobby" and g.host_sid not in SESSIONS
+                           and not any(p.connected and not p.bot for p in g.players.values()))
+    lobbies = sorted((g for g in GAMES.values() if abandoned(g)), key=lambda g: g.last_active)
+    evicted = 0
+    for g in lobbies:
+        if evicted >= count:
+            break
+        evicted += evict_game(g.game_id, "capacity", abandoned)
+    return evicted
+
+def evict_game(game_id: str, reason: str, evictable: Callable[[Game], bool]) -> int:
+    with GAMES.locked(game_id) as g:
+        # Re-check under the lock: a handler may have used the table since the scan.
+        if g is None or not evictable(g):
+            return 0
+        GAMES.pop(game_id)
+    for sid in list(g.players) + [g.host_sid]:
+        SESSIONS.pop(sid, None)
+    OUTBOX.drop(game_id)
+    closed = {"gameId": game_id, "reason": reason}
+    room_emit("game_closed", closed, to=game_id)
+    room_emit("game_closed", closed, to=game_id + "/watch")
+    for room in (game_id, game_id + "/watch") + tuple(game_id + suffix for suffix in STATE_ROOMS):
+        sio.close_room(room)
+    for room, sids in SPECTATOR_ROOMS.pop(game_id, {}).items():
+        sio.close_room(room)
+        for sid in sids:
+            WATCHING.pop(sid, None)
+    SPECTATED.pop(game_id, None)
+    METRICS.forget_room(game_id)
+    COMMENTS.forget(game_id)
+    GAMES_EVICTED.inc(reason)
+    log.info("evicted game %s (%s)", game_id, reason)
+    return 1
+
+def snapshotter():
+    while True:
+        sio.sleep(SNAPSHOT_SECONDS)
+        save_snapshots()
+
+def save_snapshots():
+    started = time.perf_counter()
+    try:
+        written = SNAPSHOTS.save(GAMES.values())
+    except Exception:
+        log.exception("game snapshot failed")
+        return
+    if written:
+        METRICS.snapshot_seconds.observe(time.perf_counter() - started)
+        log.debug("snapshot wrote %d games", written)
+
+def restore_games():
+    """Load snapshotted games and hold every seat for its player to reconnect."""
+    # Tournaments are not snapshotted, so their tables are left behind.
+    games = [g for g in SNAPSHOTS.load() if g.tournament_id is None]
+    for g in games:
+        GAMES[g.game_id] = g
+        for p in g.players.values():
+            sio.start_background_task(expire_seat, g.game_id, p.sid, p.token)
+    if games:
+        log.info("restored %d games from %s", len(games), SNAPSHOT_PATH)
+        start_housekeeping()
+
+if SNAPSHOTS is not None:
+    restore_games()
+    atexit.register(save_snapshots)
+
 if __name__ == "__main__":
     # Run with eventlet for WebSockets
     import eventlet
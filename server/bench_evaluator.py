@@ -0,0 +1,220 @@
+"""Correctness checks and benchmarks for the hand evaluator.
+
+Runs an exhaustive pass over all 2,598,960 five-card hands (category counts,
+number of distinct strengths and ordering against the classify_5 reference),
+7-card agreement with the combinations()-based reference, a set of edge cases,
+then throughput and the scoring latency of a hand through ``rules`` (streets
+plus showdown) for 2-15 players on seeded decks.
+Results are written as JSON so runs can be compared between releases::
+
+    python bench_evaluator.py --out bench.json
+    python bench_evaluator.py --out new.json --compare bench.json
+
+Exits non-zero if any correctness check fails.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import combinations
+
+import numpy as np
+
+from evaluator import (
+    CARD_TO_INT, HAND_NAME, HAND_ORDER, INT_TO_CARD, best_five, best_hand, best_hand_combinations,
+    classify_5, evaluate, evaluate_cards_batch, hand_category, is_straight,
+)
+from models import Game, Player
+import rules
+
+# Known frequencies of each category among all five-card hands.
+FIVE_CARD_COUNTS = {
+    "straight_flush": 40,
+    "four": 624,
+    "full_house": 3744,
+    "flush": 5108,
+    "straight": 10200,
+    "three": 54912,
+    "two_pair": 123552,
+    "pair": 1098240,
+    "high": 1302540,
+}
+DISTINCT_FIVE_CARD_HANDS = 7462
+
+def cards(text: str):
+    return [CARD_TO_INT[c] for c in text.split()]
+
+# (stronger, weaker) pairs that exercise the wheel and other boundaries.
+ORDERING_CASES = [
+    ("AS 2S 3S 4S 5S", "KD QD JD TD 8D"),  # steel wheel beats any flush
+    ("6H 2S 3S 4S 5S", "AS 2D 3C 4S 5H"),  # 6-high straight beats the wheel
+    ("AS 2D 3C 4S 5H", "AS AD KC QS JH"),  # wheel beats trips-less pair hands
+    ("AS KD QC JS TH", "KS QD JC TS 9H"),  # broadway beats king-high straight
+    ("7S 7D 7C 2S 2H", "6S 6D 6C AS AH"),  # full house ranks trips first
+    ("AS AD KC KS 2H", "AS AD QC QS KH"),  # two pair: second pair before kicker
+    ("9S 9D AC 5S 4H", "9H 9C KC QS JH"),  # pair kicker
+]
+
+def check(results: dict, name: str, ok: bool, detail=None):
+    results[name] = {"ok": bool(ok)} if detail is None else {"ok": bool(ok), "detail": detail}
+    return ok
+
+def correctness(seed: int, samples7: int) -> dict:
+    results = {}
+    started = time.perf_counter()
+    all5 = np.array(list(combinations(range(52), 5)), dtype=np.int8)
+    strengths = evaluate_cards_batch(all5)
+    by_category = np.bincount(strengths >> 20, minlength=9)
+    counts = {name: int(by_category[order]) for name, order in HAND_ORDER.items()}
+    check(results, "five_card_category_counts", counts == FIVE_CARD_COUNTS, counts)
+    distinct, first = np.unique(strengths, return_index=True)
+    check(results, "five_card_distinct_strengths", len(distinct) == DISTINCT_FIVE_CARD_HANDS, len(distinct))
+
+    # One representative per strength: the reference tuple order must match.
+    reference = [classify_5([INT_TO_CARD[c] for c in all5[i]]) for i in first]
+    ordered = all(a < b for a, b in zip(reference, reference[1:]))
+    check(results, "five_card_order_matches_classify_5", ordered)
+
+    rng = np.random.default_rng(seed)
+    sample = all5[rng.choice(len(all5), size=min(200000, len(all5)), replace=False)]
+    scalar = [evaluate(row.tolist()) for row in sample]
+    check(results, "scalar_matches_batch", scalar == evaluate_cards_batch(sample).tolist())
+
+    deck = [INT_TO_CARD[c] for c in range(52)]
+    prng = random.Random(seed)
+    mismatches = 0
+    for _ in range(samples7):
+        hand = prng.sample(deck, 7)
+        strength, five, name = best_hand(hand[:2], hand[2:])
+        ref_score, _, ref_name = best_hand_combinations(hand[:2], hand[2:])
+        if name != ref_name or classify_5(five) != ref_score:
+            mismatches += 1
+    check(results, "seven_card_matches_reference", mismatches == 0, {"samples": samples7, "mismatches": mismatches})
+
+    edge_ok = is_straight([14, 5, 4, 3, 2]) == 5 and is_straight([14, 13, 12, 11, 10]) == 14
+    edge_ok &= HAND_NAME[hand_category(evaluate(cards("AS 2S 3S 4S 5S")))] == "Straight Flush"
+    edge_ok &= HAND_NAME[hand_category(evaluate(cards("AS 2D 3C 4S 5H")))] == "Straight"
+    edge_ok &= best_five(cards("AS 2D 3C 4S 5H KD QD"), evaluate(cards("AS 2D 3C 4S 5H KD QD"))) == cards("5H 4S 3C 2D AS")
+    for strong, weak in ORDERING_CASES:
+        edge_ok &= evaluate(cards(strong)) > evaluate(cards(weak))
+        edge_ok &= classify_5(strong.split()) > classify_5(weak.split())
+    check(results, "edge_cases", edge_ok)
+
+    results["seconds"] = round(time.perf_counter() - started, 3)
+    return results
+
+def throughput(seed: int, n: int) -> dict:
+    rng = random.Random(seed)
+    hands = [rng.sample(range(52), 7) for _ in range(n)]
+    text = [[INT_TO_CARD[c] for c in h] for h in hands]
+    out = {}
+
+    def rate(name, fn, count):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        out[name] = {"hands": count, "seconds": round(elapsed, 4), "evals_per_sec": round(count / elapsed)}
+
+    rate("evaluate", lambda: [evaluate(h) for h in hands], n)
+    rate("best_hand", lambda: [best_hand(t[:2], t[2:]) for t in text], n)
+    ref_n = max(1, n // 20)
+    rate("best_hand_combinations", lambda: [best_hand_combinations(t[:2], t[2:]) for t in text[:ref_n]], ref_n)
+    big = np.array(hands * max(1, 1000000 // n), dtype=np.int8)
+    rate("evaluate_cards_batch", lambda: evaluate_cards_batch(big), len(big))
+    return out
+
+def _latency(timings: list) -> dict:
+    timings.sort()
+    return {
+        "p50_us": round(timings[len(timings) // 2] * 1e6, 1),
+        "p99_us": round(timings[int(len(timings) * 0.99) - 1] * 1e6, 1),
+        "mean_us": round(sum(timings) / len(timings) * 1e6, 1),
+    }
+
+def showdown_latency(seed: int, hands: int) -> dict:
+    """Time the hand scoring the server runs, through ``rules`` on seeded decks.
+
+    The top-level figures are a whole hand's scoring: the flop, turn and river
+    folded into every player's running strength (``deal_street``), then
+    ``rules.showdown`` on those strengths. ``fallback`` times ``showdown``
+    alone for a hand whose strengths were lost (restored mid-hand), where
+    each contender is scored with scalar ``evaluate``.
+    """
+    out = {}
+    rng = random.Random(seed)
+    for players in range(2, 16):
+        timings, fallback = [], []
+        for _ in range(hands):
+            deck = list(range(52))
+            rng.shuffle(deck)
+            g = Game(game_id="BENCH")
+            for seat in range(1, players + 1):
+                g.players[str(seat)] = Player(sid=str(seat), name=f"P{seat}", seat=seat)
+            rules.start_hand(g, deck)
+            started = time.perf_counter()
+            for _street in range(3):
+                rules.deal_street(g)
+            rules.showdown(g)
+            timings.append(time.perf_counter() - started)
+
+            for p in g.players.values():
+                p.strength = 0
+            started = time.perf_counter()
+            rules.showdown(g)
+            fallback.append(time.perf_counter() - started)
+        out[str(players)] = {**_latency(timings), "fallback": _latency(fallback)}
+    return out
+
+def compare(current: dict, baseline: dict):
+    print("evaluator throughput vs baseline:")
+    for name, now in current["throughput"].items():
+        before = baseline.get("throughput", {}).get(name)
+        if before:
+            print(f"  {name:24s} {now['evals_per_sec'] / before['evals_per_sec']:6.2f}x")
+    print("showdown p50 latency vs baseline:")
+    for players, now in current["showdown"].items():
+        before = baseline.get("showdown", {}).get(players)
+        if before:
+            print(f"  {players:>2s} players {before['p50_us'] / now['p50_us']:6.2f}x faster")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="previous JSON report to compare against")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--hands", type=int, default=50000, help="hands for scalar throughput")
+    parser.add_argument("--showdowns", type=int, default=500, help="showdowns per table size")
+    parser.add_argument("--samples7", type=int, default=20000, help="7-card reference comparisons")
+    parser.add_argument("--skip-correctness", action="store_true")
+    args = parser.parse_args()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seed": args.seed,
+    }
+    if not args.skip_correctness:
+        report["correctness"] = correctness(args.seed, args.samples7)
+    report["throughput"] = throughput(args.seed, args.hands)
+    report["showdown"] = showdown_latency(args.seed, args.showdowns)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    failed = [k for k, v in report.get("correctness", {}).items() if isinstance(v, dict) and not v["ok"]]
+    if failed:
+        print(f"correctness checks failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Server-side bot players.
+
+A bot is a ``Player`` with ``bot=True`` and no socket behind its sid. Whenever
+a betting round is waiting on a bot, the server hands the decision to a
+``BotQueue``: ``decide`` runs in a worker process, estimates the bot's equity
+against the other live hands as random holdings and turns it into a limit
+action (fold, check, call, bet4 or bet8) by pot odds.
+
+Every decision has a strict time budget. Its deadline is set when it is
+asked for, so time spent queued behind other bots counts: the worker samples
+until then (at least one batch), and the queue stops waiting after
+``timeout`` seconds and plays ``fallback_action`` instead. The event loop
+never computes: one background task polls the futures of every table.
+"""
+import logging
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from evaluator import evaluate_batch
+from preflop import PreflopTable
+
+log = logging.getLogger("holdem")
+
+MC_BATCH = 250
+MC_MAX_SAMPLES = 20000
+# Equity relative to a fair share of the pot (1 / players in the hand) at
+# which a bot makes the biggest legal bet, or the small one.
+RAISE_RATIO = 1.6
+BET_RATIO = 1.25
+
+_preflop: Optional[PreflopTable] = None
+_preflop_loaded = False
+
+def _preflop_table() -> Optional[PreflopTable]:
+    # Loaded once per worker process, on its first preflop decision.
+    global _preflop, _preflop_loaded
+    if not _preflop_loaded:
+        _preflop, _preflop_loaded = PreflopTable.load(), True
+    return _preflop
+
+def warm_up():
+    """Load what decisions need, so a fresh worker's first one is not late."""
+    _preflop_table()
+
+def hand_strength(hole: List[int], board: List[int], deadline: float,
+                  seed: Optional[int] = None) -> Tuple[float, int]:
+    """Chance that ``hole`` beats one random hand (ties count half) and the samples scored.
+
+    Runouts and the opponent's cards are sampled in batches until
+    ``deadline`` (``time.time()``).
+    """
+    dead = set(hole) | set(board)
+    live = np.array([c for c in range(52) if c not in dead], dtype=np.int8)
+    missing = 5 - len(board)
+    need = missing + 2
+    hero = np.array(hole, dtype=np.int8).reshape(1, 2)
+    board_arr = np.broadcast_to(np.array(board, dtype=np.int8), (MC_BATCH, len(board)))
+    rng = np.random.default_rng(seed)
+    score = 0.0
+    samples = 0
+    while samples < MC_MAX_SAMPLES:
+        # argsort, not argpartition: the runout and the opponent's hole are cut
+        # from ``picks`` by position, so the cards must come in random order.
+        picks = live[rng.random((MC_BATCH, len(live))).argsort(axis=1)[:, :need]]
+        boards = np.concatenate([board_arr, picks[:, :missing]], axis=1)
+        mine = evaluate_batch(hero, boards)
+        theirs = evaluate_batch(picks[:, missing:], boards)
+        score += float((mine > theirs).sum() + 0.5 * (mine == theirs).sum())
+        samples += MC_BATCH
+        if time.time() >= deadline:
+            break
+    return score / samples, samples
+
+def equity(hole: List[int], board: List[int], opponents: int, deadline: float,
+           seed: Optional[int] = None) -> Tuple[float, int]:
+    """Estimated share of the pot ``hole`` wins against ``opponents`` random hands.
+
+    Preflop answers come from the preflop table when one is built for the
+    table size. Otherwise the hand strength against one random hand is raised
+    to the number of opponents, so the cost of a decision does not grow with
+    the table.
+    """
+    if opponents <= 0:
+        return 1.0, 0
+    if not board:
+        table = _preflop_table()
+        if table is not None and table.covers(opponents + 1):
+            return table.lookup(hole[0], hole[1], opponents + 1)[2], 0
+    strength, samples = hand_strength(hole, board, deadline, seed)
+    return strength ** opponents, samples
+
+def choose(equity: float, opponents: int, legal: List[str], to_call: int, pot: int) -> str:
+    """Limit action for a hand worth ``equity`` of a pot shared ``opponents + 1`` ways."""
+    ratio = equity * (opponents + 1)
+    if ratio >= RAISE_RATIO:
+        for action in ("bet8", "bet4"):
+            if action in legal:
+                return action
+    if ratio >= BET_RATIO and "bet4" in legal:
+        return "bet4"
+    if "check" in legal:
+        return "check"
+    if "call" in legal and equity >= to_call / (pot + to_call):
+        return "call"
+    return "fold"
+
+def fallback_action(legal: List[str]) -> str:
+    """What a bot plays when its decision did not arrive in time."""
+    return "check" if "check" in legal else "fold"
+
+def decide(hole: List[int], board: List[int], opponents: int, legal: List[str], to_call: int, pot: int,
+           deadline: float, seed: Optional[int] = None) -> dict:
+    """One bot decision; runs in a worker process."""
+    share, samples = equity(hole, board, opponents, deadline, seed)
+    return {"action": choose(share, opponents, legal, to_call, pot), "equity": share, "samples": samples}
+
+class BotQueue:
+    """Bot decisions in flight, keyed by the table situation they answer.
+
+    ``apply(key, result, outcome, seconds)`` is called once per submitted key
+    with the ``decide`` result, or None when the decision timed out, failed or
+    found the pool saturated (``outcome`` says which).
+    """
+
+    def __init__(self, pool, apply: Callable[[Hashable, Optional[dict], str, float], None], timeout: float,
+                 poll: float = 0.02, start_task: Optional[Callable] = None,
+                 sleep: Callable[[float], None] = time.sleep, clock: Callable[[], float] = time.perf_counter):
+        self.pool = pool  # an equity.EquityPool
+        self.apply = apply
+        self.timeout = timeout
+        self.poll_interval = poll
+        self.start_task = start_task
+        self.sleep = sleep
+        self.clock = clock
+        self._pending: Dict[Hashable, tuple] = {}
+        self._poller = None
+        self._warm = False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def warm(self):
+        """Start a worker ahead of the first decision (the pool starts lazily)."""
+        if not self._warm:
+            self._warm = self.pool.run(warm_up) is not None
+
+    def submit(self, key: Hashable, *args):
+        """Ask for ``decide(*args)`` unless ``key`` is already being decided."""
+        if key in self._pending:
+            return
+        fut = self.pool.run(decide, *args)
+        if fut is None:
+            self._apply(key, None, "saturated", 0.0)
+            return
+        self._pending[key] = (fut, self.clock())
+        if self._poller is None and self.start_task is not None:
+            self._poller = self.start_task(self._poll_loop)
+
+    def poll(self):
+        """Apply every finished decision and give up on the overdue ones."""
+        now = self.clock()
+        for key, (fut, started) in list(self._pending.items()):
+            elapsed = now - started
+            if fut.done():
+                del self._pending[key]
+                if fut.cancelled() or fut.exception() is not None:
+                    log.error("bot decision failed: %s", None if fut.cancelled() else fut.exception())
+                    self._apply(key, None, "error", elapsed)
+                else:
+                    self._apply(key, fut.result(), "ok", elapsed)
+            elif elapsed > self.timeout:
+                del self._pending[key]
+                fut.cancel()
+                self._apply(key, None, "timeout", elapsed)
+
+    def _apply(self, key: Hashable, result: Optional[dict], outcome: str, seconds: float):
+        try:
+            self.apply(key, result, outcome, seconds)
+        except Exception:
+            log.exception("applying bot decision %s failed", key)
+
+    def _poll_loop(self):
+        while True:
+            self.sleep(self.poll_interval)
+            self.poll()
@@ -0,0 +1,184 @@
+"""Comment feed: recent comments served from memory, inserts written behind.
+
+Each game keeps a ring buffer of its newest ``per_game`` comments, filled from
+SQLite on first use, so ``GET /api/comments`` polls do not touch the database.
+Older history is paged with a ``before_id`` cursor and read from SQLite.
+
+Posted comments get their id and timestamp here and go into the buffer at
+once (the caller broadcasts them straight away); a background task inserts
+the queued rows every ``flush_interval`` seconds in one transaction. A batch
+that hits a constraint is inserted row by row and the rows SQLite refuses are
+logged and dropped; a locked database is retried up to ``max_retries``
+flushes before the batch is given up. Ids are
+allocated in-process, so only one process may write comments while the
+buffer is on; set ``COMMENT_CACHE_SIZE=0`` to write and read through SQLite
+directly when several workers share the database.
+"""
+import logging
+import sqlite3
+import time
+from collections import OrderedDict, deque
+from typing import Callable, List, Optional
+
+log = logging.getLogger("holdem")
+
+SQL_MAX_COMMENT_ID = "SELECT COALESCE(MAX(id), 0) FROM comments"
+SQL_SELECT_RECENT = (
+    "SELECT id, username, content, created_at FROM comments WHERE game_id=? ORDER BY id DESC LIMIT ?"
+)
+SQL_SELECT_BEFORE = (
+    "SELECT id, username, content, created_at FROM comments WHERE game_id=? AND id<? ORDER BY id DESC LIMIT ?"
+)
+SQL_INSERT_WITH_ID = "INSERT INTO comments (id, game_id, username, content, created_at) VALUES (?, ?, ?, ?, ?)"
+SQL_INSERT = "INSERT INTO comments (game_id, username, content, created_at) VALUES (?, ?, ?, ?)"
+
+def _row(r) -> dict:
+    return {"id": r["id"], "username": r["username"], "content": r["content"], "created_at": r["created_at"]}
+
+class CommentFeed:
+    def __init__(self, pool, per_game: int = 200, max_games: int = 1000, flush_interval: float = 0.25,
+                 max_retries: int = 20, start_task: Optional[Callable] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.pool = pool
+        self.per_game = per_game
+        self.max_games = max_games
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.start_task = start_task
+        self.sleep = sleep
+        self._buffers: "OrderedDict[str, deque]" = OrderedDict()  # game_id -> newest comments, oldest first
+        self._complete = set()  # games whose buffer was loaded with their whole history
+        self._pending: List[tuple] = []  # rows waiting for the next flush
+        self._next_id: Optional[int] = None
+        self._failed_flushes = 0  # in a row, for the rows at the front of _pending
+        self._flusher = None
+
+    @property
+    def cached(self) -> bool:
+        return self.per_game > 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    # --- reads ---
+    def _buffer(self, game_id: str) -> deque:
+        buf = self._buffers.get(game_id)
+        if buf is not None:
+            self._buffers.move_to_end(game_id)
+            return buf
+        with self.pool.connection() as conn:
+            rows = [_row(r) for r in conn.execute(SQL_SELECT_RECENT, (game_id, self.per_game))]
+        # Rows still waiting for a flush are newer than anything in SQLite.
+        rows.reverse()
+        rows.extend({"id": p[0], "username": p[2], "content": p[3], "created_at": p[4]}
+                    for p in self._pending if p[1] == game_id)
+        buf = deque(rows, maxlen=self.per_game)
+        if len(rows) < self.per_game:
+            self._complete.add(game_id)
+        self._buffers[game_id] = buf
+        while len(self._buffers) > self.max_games:
+            self._complete.discard(self._buffers.popitem(last=False)[0])
+        return buf
+
+    def forget(self, game_id: str):
+        """Drop a game's buffer; its queued rows are still written."""
+        self._buffers.pop(game_id, None)
+        self._complete.discard(game_id)
+
+    def page(self, game_id: str, before_id: Optional[int] = None, limit: int = 50) -> List[dict]:
+        """Newest-first comments of a game, optionally only those older than ``before_id``."""
+        if not self.cached:
+            return self._page_db(game_id, before_id, limit)
+        buf = self._buffer(game_id)
+        out = []
+        for c in reversed(buf):
+            if before_id is None or c["id"] < before_id:
+                out.append(c)
+                if len(out) == limit:
+                    return out
+        # Until it first fills up, a complete buffer has dropped nothing.
+        if game_id in self._complete and len(buf) < self.per_game:
+            return out
+        cursor = out[-1]["id"] if out else before_id
+        if cursor is None:
+            return out
+        return out + self._page_db(game_id, cursor, limit - len(out))
+
+    def _page_db(self, game_id: str, before_id: Optional[int], limit: int) -> List[dict]:
+        with self.pool.connection() as conn:
+            if before_id is None:
+                rows = conn.execute(SQL_SELECT_RECENT, (game_id, limit))
+            else:
+                rows = conn.execute(SQL_SELECT_BEFORE, (game_id, before_id, limit))
+            return [_row(r) for r in rows]
+
+    # --- writes ---
+    def post(self, game_id: str, username: str, content: str) -> dict:
+        created_at = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+        if not self.cached:
+            with self.pool.connection() as conn:
+                cur = conn.execute(SQL_INSERT, (game_id, username, content, created_at))
+            return {"id": cur.lastrowid, "username": username, "content": content, "created_at": created_at}
+        if self._next_id is None:
+            with self.pool.connection() as conn:
+                self._next_id = conn.execute(SQL_MAX_COMMENT_ID).fetchone()[0] + 1
+        buf = self._buffer(game_id)
+        comment = {"id": self._next_id, "username": username, "content": content, "created_at": created_at}
+        self._next_id += 1
+        buf.append(comment)
+        self._pending.append((comment["id"], game_id, username, content, created_at))
+        if self._flusher is None and self.start_task is not None:
+            self._flusher = self.start_task(self._flush_loop)
+        return comment
+
+    def flush(self) -> int:
+        """Insert every queued comment in one transaction; returns the rows written."""
+        batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        try:
+            with self.pool.connection() as conn:
+                conn.executemany(SQL_INSERT_WITH_ID, batch)
+        except sqlite3.IntegrityError:
+            log.warning("comment flush hit a constraint; inserting %d rows one by one", len(batch))
+            self._failed_flushes = 0
+            return self._insert_each(batch)
+        except sqlite3.OperationalError:
+            # Usually a locked or busy database, which clears up; the cap covers the kinds that do not.
+            self._failed_flushes += 1
+            if self._failed_flushes > self.max_retries:
+                log.exception("comment flush failed %d times; dropping %d rows", self._failed_flushes, len(batch))
+                self._failed_flushes = 0
+                return 0
+            log.warning("comment flush failed; retrying %d rows", len(batch), exc_info=True)
+            self._pending[:0] = batch
+            return 0
+        except Exception:
+            log.exception("comment flush failed; dropping %d rows", len(batch))
+            self._failed_flushes = 0
+            return 0
+        self._failed_flushes = 0
+        return len(batch)
+
+    def _insert_each(self, batch: List[tuple]) -> int:
+        written = 0
+        for row in batch:
+            try:
+                with self.pool.connection() as conn:
+                    conn.execute(SQL_INSERT_WITH_ID, row)
+                written += 1
+            except sqlite3.Error:
+                log.exception("dropping comment %d of game %s", row[0], row[1])
+        # An id collision means another process wrote comments: allocate past its ids from now on.
+        try:
+            with self.pool.connection() as conn:
+                self._next_id = max(self._next_id or 0, conn.execute(SQL_MAX_COMMENT_ID).fetchone()[0] + 1)
+        except sqlite3.Error:
+            log.exception("reading the highest comment id failed")
+        return written
+
+    def _flush_loop(self):
+        while True:
+            self.sleep(self.flush_interval)
+            self.flush()
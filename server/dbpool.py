@@ -0,0 +1,65 @@
+"""Small SQLite connection pool.
+
+Connections are opened once with WAL journaling and the pragmas below, then
+handed out and returned through a LIFO queue (green under eventlet). sqlite3
+keeps a per-connection cache of prepared statements keyed by SQL text, so
+reusing connections with constant query strings also reuses the compiled
+statements.
+"""
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",  # durable at checkpoints; safe with WAL
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",  # 8 MiB page cache per connection
+)
+
+class ConnectionPool:
+    def __init__(self, path: str, size: int = 8, cached_statements: int = 256):
+        self.path = path
+        self.size = size
+        self.cached_statements = cached_statements
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path, timeout=5.0, check_same_thread=False, cached_statements=self.cached_statements
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commit on success, roll back on error."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            if self._opened < self.size:
+                self._opened += 1
+                conn = self._open()
+            else:
+                conn = self._idle.get()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._opened = 0
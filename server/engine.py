@@ -0,0 +1,118 @@
+"""Socket-free game engine.
+
+Each entry point takes a ``Game`` and the sid that sent the request, applies
+the table rules (see rules.py) and returns the resulting ``Event`` list
+instead of emitting anything. The Socket.IO handlers in app.py look the game
+up, call the engine and deliver the events; simulate.py drives the same
+functions with scripted players and no network.
+
+Events, in the order they should be delivered:
+
+* ``error`` (to the sender): ``{"error": message}``
+* ``your_cards`` (to one player): hole cards as strings
+* ``state`` (room): the table changed and should be broadcast
+* ``round_settled`` (room): everyone still in the hand has acted
+* ``street`` (room): a betting round opened; ``{"stage": ...}``
+* ``your_hand`` (to one player): their best five cards on the board so far
+* ``showdown`` (room): winners, payouts and shown hands
+* ``hand_logged``: a finished hand-history record for the hand log
+
+The engine also maintains the hand-history record on ``Game.history``.
+"""
+from typing import Any, List, NamedTuple, Optional
+
+from evaluator import HAND_NAME, best_five, cards_to_str, hand_category
+from handlog import begin_hand, finish_hand, record_action, record_street
+from models import BIG_BET, SMALL_BET, Game, Player
+import rules
+
+class Event(NamedTuple):
+    name: str
+    to: Optional[str]  # a sid, or None for the game's room
+    data: Any = None
+
+def _error(sid: str, message: str) -> List[Event]:
+    return [Event("error", sid, {"error": message})]
+
+def _closed_hand(g: Game, result: Optional[dict]) -> List[Event]:
+    record = finish_hand(g, result)
+    return [] if record is None else [Event("hand_logged", None, record)]
+
+def _deal(g: Game) -> List[Event]:
+    events = _closed_hand(g, None)  # a hand that never reached its showdown
+    deck = rules.start_hand(g)
+    begin_hand(g, deck)
+    for p in g.players.values():
+        events.append(Event("your_cards", p.sid, {"cards": cards_to_str(p.cards)}))
+    events.append(Event("state", None))
+    events.append(Event("street", None, {"stage": g.stage}))
+    return events
+
+def host_start(g: Game, sid: str) -> List[Event]:
+    if sid != g.host_sid:
+        return _error(sid, "Only host can start")
+    return _deal(g)
+
+def host_reset_round(g: Game, sid: str) -> List[Event]:
+    if sid != g.host_sid:
+        return _error(sid, "Only host can reset")
+    return _deal(g)
+
+def player_action(g: Game, sid: str, action: str) -> List[Event]:
+    p = g.players.get(sid)
+    if p is None:
+        return _error(sid, "Not in this game")
+    if not p.in_hand or p.action_submitted:
+        return []
+    error = rules.apply_action(g, p, action)
+    if error:
+        return _error(sid, error)
+    record_action(g, p, action)
+    events = [Event("state", None)]
+    if g.everyone_acted():
+        events.append(Event("round_settled", None, {"ok": True}))
+    return events
+
+def host_deal_next(g: Game, sid: str) -> List[Event]:
+    if sid != g.host_sid:
+        return _error(sid, "Only host can deal")
+    # Ensure all active players acted
+    if not g.everyone_acted() and g.stage != "lobby":
+        return _error(sid, "Wait for all players")
+    if g.stage == "river":
+        result = rules.showdown(g)
+        return [Event("showdown", None, result), Event("state", None)] + _closed_hand(g, result)
+    cards = rules.deal_street(g)
+    if not cards:
+        return []
+    record_street(g, cards)
+    return [Event("state", None), Event("street", None, {"stage": g.stage})] + _your_hands(g)
+
+def _your_hands(g: Game) -> List[Event]:
+    # rules.deal_street already brought each strength up to date.
+    events = []
+    for p in g.players.values():
+        if p.in_hand and p.strength:
+            best5 = best_five(p.cards + g.board, p.strength)
+            events.append(Event("your_hand", p.sid, {
+                "stage": g.stage,
+                "hand_name": HAND_NAME[hand_category(p.strength)],
+                "best5": cards_to_str(best5),
+            }))
+    return events
+
+def legal_actions(g: Game, p: Player) -> List[str]:
+    """Actions ``apply_action`` accepts from ``p`` right now (empty once they have acted)."""
+    if not p.in_hand or p.action_submitted:
+        return []
+    actions = ["fold"]
+    if p.round_bet < g.current_bet:
+        if p.chips >= g.current_bet - p.round_bet:
+            actions.append("call")
+    else:
+        actions.append("check")
+    if g.current_bet == 0 and not g.raise_made and p.chips >= SMALL_BET - p.round_bet:
+        actions.append("bet4")
+    if not g.raise_made and g.current_bet < BIG_BET and p.chips >= BIG_BET - p.round_bet:
+        actions.append("bet8")
+    return actions
@@ -0,0 +1,142 @@
+"""Win/tie equity for the players still in a hand.
+
+``calculate`` enumerates every runout when the remaining board is small enough
+(``EXACT_RUNOUT_LIMIT`` runouts, which covers the turn and river and, at most
+tables, the flop) and otherwise falls back to Monte Carlo sampling until the
+time budget is spent. Both paths score runouts through
+``evaluator.evaluate_batch``.
+
+``EquityPool`` runs calculations in worker processes so the eventlet loop only
+ever polls a future. Call ``shutdown`` at exit: after ``eventlet.monkey_patch()``
+the executor's own exit hook waits on its workers forever, so the interpreter
+would hang once the pool has been used.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import combinations
+import multiprocessing
+from typing import List, Optional
+
+import numpy as np
+
+from evaluator import evaluate_batch
+
+EXACT_RUNOUT_LIMIT = int(os.environ.get("EQUITY_EXACT_RUNOUT_LIMIT", "5000"))
+MC_BATCH = 2000
+MC_MAX_SAMPLES = int(os.environ.get("EQUITY_MAX_SAMPLES", "200000"))
+
+def _live_cards(holes: List[List[int]], board: List[int]) -> np.ndarray:
+    dead = set(board)
+    for h in holes:
+        dead.update(h)
+    return np.array([c for c in range(52) if c not in dead], dtype=np.int8)
+
+def _tally(holes: np.ndarray, boards: np.ndarray, win: np.ndarray, tie: np.ndarray, share: np.ndarray):
+    """Accumulate wins, ties and split-pot shares of every player over ``boards``."""
+    strengths = np.stack([evaluate_batch(h.reshape(1, 2), boards) for h in holes])
+    best = strengths.max(axis=0)
+    winners = strengths == best
+    n_winners = winners.sum(axis=0)
+    solo = n_winners == 1
+    win += (winners & solo).sum(axis=1)
+    tie += (winners & ~solo).sum(axis=1)
+    share += (winners / n_winners).sum(axis=1)
+
+def calculate(holes: List[List[int]], board: List[int], budget_ms: int = 200,
+              seed: Optional[int] = None) -> dict:
+    """Equity of each hole-card pair in ``holes`` given the cards on ``board``.
+
+    Returns ``win``/``tie``/``equity`` fractions per player (same order as
+    ``holes``), the number of runouts scored and whether the answer is exact.
+    """
+    n = len(holes)
+    win = np.zeros(n, dtype=np.int64)
+    tie = np.zeros(n, dtype=np.int64)
+    share = np.zeros(n, dtype=np.float64)
+    if n == 0:
+        return {"win": [], "tie": [], "equity": [], "samples": 0, "exact": True}
+    hole_arr = np.array(holes, dtype=np.int8).reshape(n, 2)
+    board_arr = np.array(board, dtype=np.int8)
+    live = _live_cards(holes, board)
+    missing = 5 - len(board)
+
+    runouts = 1
+    for k in range(missing):
+        runouts = runouts * (len(live) - k) // (k + 1)
+
+    if runouts <= EXACT_RUNOUT_LIMIT:
+        if missing:
+            extra = np.array(list(combinations(live.tolist(), missing)), dtype=np.int8)
+            boards = np.concatenate([np.broadcast_to(board_arr, (len(extra), len(board))), extra], axis=1)
+        else:
+            boards = board_arr.reshape(1, 5)
+        _tally(hole_arr, boards, win, tie, share)
+        samples, exact = len(boards), True
+    else:
+        rng = np.random.default_rng(seed)
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        samples = 0
+        while samples < MC_MAX_SAMPLES:
+            picks = rng.random((MC_BATCH, len(live))).argpartition(missing, axis=1)[:, :missing]
+            boards = np.concatenate(
+                [np.broadcast_to(board_arr, (MC_BATCH, len(board))), live[picks]], axis=1
+            )
+            _tally(hole_arr, boards, win, tie, share)
+            samples += MC_BATCH
+            if time.perf_counter() >= deadline:
+                break
+        exact = False
+
+    return {
+        "win": (win / samples).tolist(),
+        "tie": (tie / samples).tolist(),
+        "equity": (share / samples).tolist(),
+        "samples": int(samples),
+        "exact": exact,
+    }
+
+class EquityPool:
+    """Lazily started process pool for equity calculations."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = None
+
+    def submit(self, holes: List[List[int]], board: List[int], budget_ms: int):
+        """Queue a calculation, or return None when the pool is saturated."""
+        return self.run(calculate, holes, board, budget_ms)
+
+    def run(self, fn, *args):
+        """Queue ``fn(*args)`` (a module-level function), or return None when the pool is saturated."""
+        if self.pending >= self.max_pending:
+            return None
+        if self._executor is None:
+            # spawn keeps monkey-patched eventlet state out of the workers
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        fut = self._executor.submit(fn, *args)
+        self.pending += 1
+        fut.add_done_callback(self._done)
+        return fut
+
+    def _done(self, fut):
+        self.pending -= 1
+        if not fut.cancelled() and isinstance(fut.exception(), BrokenProcessPool):
+            # A worker died; start a fresh pool on the next submit.
+            self._executor = None
+
+    def shutdown(self):
+        """Cancel queued work and stop the workers without waiting for them."""
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        workers = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in workers:
+            if process.is_alive():
+                process.terminate()
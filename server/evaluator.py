@@ -0,0 +1,372 @@
+"""Texas Hold'em hand evaluation.
+
+Cards are encoded as ``rank_index * 4 + suit_index`` (0-51) internally. A hand
+of 5, 6 or 7 cards is reduced to four per-suit rank bitmasks plus a base-5
+rank-count key, and both are resolved through tables built once at import:
+
+* ``FLUSH_TABLE`` maps a 13-bit suit mask to the best flush/straight flush.
+* ``RANK_TABLE`` maps a rank-count key to the best non-flush hand.
+
+With at most seven cards a flush can never coexist with quads or a full house,
+so whenever one suit holds five or more cards the flush table answer is final.
+
+Strengths are plain ints: ``category << 20`` followed by up to five 4-bit rank
+values (2-14), so a higher int is always a better hand.
+
+``evaluate_batch`` runs the same table lookups over NumPy arrays so that many
+hands (contenders at a showdown, simulated runouts, analytics jobs) are scored
+in one vectorized pass.
+"""
+from itertools import combinations, combinations_with_replacement
+from collections import Counter
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+RANKS = "23456789TJQKA"
+SUITS = "SHDC"  # Spades, Hearts, Diamonds, Clubs
+
+RANK_TO_VAL = {r: i for i, r in enumerate(RANKS, start=2)}
+
+HAND_ORDER = {
+    "high": 0,
+    "pair": 1,
+    "two_pair": 2,
+    "three": 3,
+    "straight": 4,
+    "flush": 5,
+    "full_house": 6,
+    "four": 7,
+    "straight_flush": 8,
+}
+
+HAND_NAME = {
+    HAND_ORDER["high"]: "High Card",
+    HAND_ORDER["pair"]: "One Pair",
+    HAND_ORDER["two_pair"]: "Two Pair",
+    HAND_ORDER["three"]: "Three of a Kind",
+    HAND_ORDER["straight"]: "Straight",
+    HAND_ORDER["flush"]: "Flush",
+    HAND_ORDER["full_house"]: "Full House",
+    HAND_ORDER["four"]: "Four of a Kind",
+    HAND_ORDER["straight_flush"]: "Straight Flush",
+}
+
+# --- Card encoding ---
+CARD_TO_INT = {r + s: ri * 4 + si for ri, r in enumerate(RANKS) for si, s in enumerate(SUITS)}
+INT_TO_CARD = [None] * 52
+for _c, _i in CARD_TO_INT.items():
+    INT_TO_CARD[_i] = _c
+
+def card_to_int(c: str) -> int:
+    return CARD_TO_INT[c]
+
+def int_to_card(i: int) -> str:
+    return INT_TO_CARD[i]
+
+def cards_to_str(cards: List[int]) -> List[str]:
+    """Card ints to their two-character names, for anything sent or logged."""
+    return [INT_TO_CARD[c] for c in cards]
+
+# --- Reference 5-card classifier (tuple scores) ---
+def card_to_tuple(c: str) -> Tuple[int, str]:
+    return (RANK_TO_VAL[c[0]], c[1])
+
+def is_straight(vals: List[int]) -> Optional[int]:
+    # vals sorted descending
+    uniq = sorted(set(vals), reverse=True)
+    # Wheel straight A-2-3-4-5
+    if {14,5,4,3,2}.issubset(set(vals)):
+        return 5
+    for i in range(len(uniq) - 4):
+        window = uniq[i:i+5]
+        if window[0] - window[4] == 4:
+            return window[0]
+    return None
+
+def classify_5(cards5: List[str]):
+    vals = sorted([card_to_tuple(c)[0] for c in cards5], reverse=True)
+    suits = [c[1] for c in cards5]
+    is_flush = len(set(suits)) == 1
+    top_straight = is_straight(vals)
+
+    # counts
+    ctr = Counter(vals)
+    counts = sorted(ctr.items(), key=lambda x: (-x[1], -x[0]))  # by count desc, then rank desc
+
+    if is_flush and top_straight:
+        return (HAND_ORDER["straight_flush"], top_straight, vals)
+    if counts[0][1] == 4:
+        # four of a kind
+        quad = counts[0][0]
+        kicker = max([v for v in vals if v != quad])
+        return (HAND_ORDER["four"], quad, [kicker])
+    if counts[0][1] == 3 and counts[1][1] == 2:
+        # full house
+        trips = counts[0][0]
+        pair = counts[1][0]
+        return (HAND_ORDER["full_house"], trips, [pair])
+    if is_flush:
+        return (HAND_ORDER["flush"], vals)
+    if top_straight:
+        return (HAND_ORDER["straight"], top_straight)
+    if counts[0][1] == 3:
+        trips = counts[0][0]
+        kickers = [v for v in vals if v != trips][:2]
+        return (HAND_ORDER["three"], trips, kickers)
+    if counts[0][1] == 2 and counts[1][1] == 2:
+        high_pair = max(counts[0][0], counts[1][0])
+        low_pair = min(counts[0][0], counts[1][0])
+        kicker = max([v for v in vals if v != high_pair and v != low_pair])
+        return (HAND_ORDER["two_pair"], high_pair, low_pair, kicker)
+    if counts[0][1] == 2:
+        pair = counts[0][0]
+        kickers = [v for v in vals if v != pair][:3]
+        return (HAND_ORDER["pair"], pair, kickers)
+    return (HAND_ORDER["high"], vals)
+
+# --- Lookup tables ---
+CATEGORY_SHIFT = 20
+
+def _pack(category: int, vals) -> int:
+    score = category
+    for i in range(5):
+        score = (score << 4) | (vals[i] if i < len(vals) else 0)
+    return score
+
+def hand_category(strength: int) -> int:
+    return strength >> CATEGORY_SHIFT
+
+def _straight_top(mask: int) -> int:
+    """Highest straight value (5-14) contained in a 13-bit rank mask, or 0."""
+    for top in range(12, 3, -1):
+        window = 0x1F << (top - 4)
+        if mask & window == window:
+            return top + 2
+    if mask & 0x100F == 0x100F:  # A-2-3-4-5
+        return 5
+    return 0
+
+def _top_bits(mask: int, n: int) -> List[int]:
+    vals = []
+    for r in range(12, -1, -1):
+        if mask >> r & 1:
+            vals.append(r + 2)
+            if len(vals) == n:
+                break
+    return vals
+
+STRAIGHT_TABLE = [_straight_top(m) for m in range(1 << 13)]
+
+def _flush_strength(mask: int) -> int:
+    top = STRAIGHT_TABLE[mask]
+    if top:
+        return _pack(HAND_ORDER["straight_flush"], [top])
+    return _pack(HAND_ORDER["flush"], _top_bits(mask, 5))
+
+FLUSH_TABLE = [_flush_strength(m) if bin(m).count("1") >= 5 else 0 for m in range(1 << 13)]
+
+RANK_KEY = [5 ** r for r in range(13)]
+
+def _rank_strength(counts: List[int]) -> int:
+    """Best non-flush hand for a rank-count vector indexed by rank (0=deuce)."""
+    mask = 0
+    by_count = ([], [], [], [], [])
+    for r in range(12, -1, -1):
+        n = counts[r]
+        if n:
+            mask |= 1 << r
+            by_count[n].append(r + 2)
+    quads, trips, pairs = by_count[4], by_count[3], by_count[2]
+    if quads:
+        q = quads[0]
+        return _pack(HAND_ORDER["four"], [q, max(v for v in _desc(counts) if v != q)])
+    if trips and (len(trips) > 1 or pairs):
+        t = trips[0]
+        p = max(trips[1:] + pairs)
+        return _pack(HAND_ORDER["full_house"], [t, p])
+    top = STRAIGHT_TABLE[mask]
+    if top:
+        return _pack(HAND_ORDER["straight"], [top])
+    if trips:
+        t = trips[0]
+        return _pack(HAND_ORDER["three"], [t] + [v for v in _desc(counts) if v != t][:2])
+    if len(pairs) >= 2:
+        hp, lp = pairs[0], pairs[1]
+        return _pack(HAND_ORDER["two_pair"], [hp, lp, max(v for v in _desc(counts) if v != hp and v != lp)])
+    if pairs:
+        p = pairs[0]
+        return _pack(HAND_ORDER["pair"], [p] + [v for v in _desc(counts) if v != p][:3])
+    return _pack(HAND_ORDER["high"], _desc(counts)[:5])
+
+def _desc(counts: List[int]) -> List[int]:
+    return [r + 2 for r in range(12, -1, -1) if counts[r]]
+
+def _build_rank_table():
+    table = {}
+    for n in (5, 6, 7):
+        for ranks in combinations_with_replacement(range(13), n):
+            counts = [0] * 13
+            for r in ranks:
+                counts[r] += 1
+            if max(counts) > 4:
+                continue
+            table[sum(RANK_KEY[r] for r in ranks)] = _rank_strength(counts)
+    return table
+
+RANK_TABLE = _build_rank_table()
+
+# --- Evaluation ---
+def evaluate(cards: List[int]) -> int:
+    """Strength of the best five-card hand within 5-7 encoded cards."""
+    s0 = s1 = s2 = s3 = 0
+    key = 0
+    for c in cards:
+        r = c >> 2
+        key += RANK_KEY[r]
+        s = c & 3
+        if s == 0:
+            s0 |= 1 << r
+        elif s == 1:
+            s1 |= 1 << r
+        elif s == 2:
+            s2 |= 1 << r
+        else:
+            s3 |= 1 << r
+    if len(cards) >= 5:
+        for m in (s0, s1, s2, s3):
+            f = FLUSH_TABLE[m]
+            if f:
+                return f
+    return RANK_TABLE[key]
+
+# --- Incremental evaluation ---
+# A card set summarised as [rank key, spade mask, heart mask, diamond mask,
+# club mask]. Parts of disjoint sets combine by adding the keys and OR-ing the
+# masks, so a street's cards are summarised once and folded into every
+# player's running parts instead of re-reading their whole hand.
+def card_parts(cards: List[int]) -> List[int]:
+    parts = [0, 0, 0, 0, 0]
+    for c in cards:
+        r = c >> 2
+        parts[0] += RANK_KEY[r]
+        parts[1 + (c & 3)] |= 1 << r
+    return parts
+
+def add_parts(a: List[int], b: List[int]) -> List[int]:
+    return [a[0] + b[0], a[1] | b[1], a[2] | b[2], a[3] | b[3], a[4] | b[4]]
+
+def evaluate_parts(parts: List[int]) -> int:
+    """Strength of the best five-card hand within the 5-7 cards ``parts`` summarises."""
+    f = FLUSH_TABLE[parts[1]] or FLUSH_TABLE[parts[2]] or FLUSH_TABLE[parts[3]] or FLUSH_TABLE[parts[4]]
+    return f or RANK_TABLE[parts[0]]
+
+def strength_ranks(strength: int) -> List[int]:
+    """Expand a strength into the rank value of each of its five cards."""
+    category = strength >> CATEGORY_SHIFT
+    v = [(strength >> (16 - 4 * i)) & 0xF for i in range(5)]
+    if category in (HAND_ORDER["straight"], HAND_ORDER["straight_flush"]):
+        top = v[0]
+        return [5, 4, 3, 2, 14] if top == 5 else list(range(top, top - 5, -1))
+    if category == HAND_ORDER["four"]:
+        return [v[0]] * 4 + [v[1]]
+    if category == HAND_ORDER["full_house"]:
+        return [v[0]] * 3 + [v[1]] * 2
+    if category == HAND_ORDER["three"]:
+        return [v[0]] * 3 + v[1:3]
+    if category == HAND_ORDER["two_pair"]:
+        return [v[0]] * 2 + [v[1]] * 2 + [v[2]]
+    if category == HAND_ORDER["pair"]:
+        return [v[0]] * 2 + v[1:4]
+    return v
+
+def best_five(cards: List[int], strength: int) -> List[int]:
+    """Pick the five cards out of ``cards`` that make up ``strength``."""
+    category = strength >> CATEGORY_SHIFT
+    pool = list(cards)
+    if category in (HAND_ORDER["flush"], HAND_ORDER["straight_flush"]):
+        suits = Counter(c & 3 for c in pool)
+        flush_suit = suits.most_common(1)[0][0]
+        pool = [c for c in pool if c & 3 == flush_suit]
+    five = []
+    for val in strength_ranks(strength):
+        for c in pool:
+            if (c >> 2) + 2 == val:
+                five.append(c)
+                pool.remove(c)
+                break
+    return five
+
+def best_hand(hole: List[str], board: List[str]):
+    """Best hand for hole + board cards: ``(strength, best5, hand_name)``."""
+    cards = [CARD_TO_INT[c] for c in hole + board]
+    strength = evaluate(cards)
+    five = [INT_TO_CARD[c] for c in best_five(cards, strength)]
+    return strength, five, HAND_NAME[strength >> CATEGORY_SHIFT]
+
+# --- Batch evaluation ---
+RANK_KEY_NP = np.array(RANK_KEY, dtype=np.int64)
+FLUSH_TABLE_NP = np.array(FLUSH_TABLE, dtype=np.int32)
+_rank_items = sorted(RANK_TABLE.items())
+RANK_KEYS_NP = np.array([k for k, _ in _rank_items], dtype=np.int64)
+RANK_VALUES_NP = np.array([v for _, v in _rank_items], dtype=np.int32)
+del _rank_items
+
+BATCH_CHUNK = 1 << 18
+
+def encode_cards(cards) -> np.ndarray:
+    """Convert a (nested) list of card strings to an int8 array of card ints."""
+    if isinstance(cards, str):
+        return np.array(CARD_TO_INT[cards], dtype=np.int8)
+    arr = np.asarray(cards)
+    if arr.dtype.kind in "US":
+        return np.vectorize(CARD_TO_INT.__getitem__, otypes=[np.int8])(arr) if arr.size else arr.astype(np.int8)
+    return arr.astype(np.int8)
+
+def evaluate_cards_batch(cards: np.ndarray) -> np.ndarray:
+    """Strengths for an ``(n, k)`` array of encoded hands, 5 <= k <= 7."""
+    cards = np.asarray(cards)
+    if cards.ndim != 2 or not 5 <= cards.shape[1] <= 7:
+        raise ValueError("expected an (n, 5..7) array of cards")
+    out = np.empty(cards.shape[0], dtype=np.int32)
+    for start in range(0, cards.shape[0], BATCH_CHUNK):
+        chunk = cards[start:start + BATCH_CHUNK].astype(np.int64)
+        ranks = chunk >> 2
+        suits = chunk & 3
+        bits = np.left_shift(1, ranks)
+        key = RANK_KEY_NP[ranks].sum(axis=1)
+        flush = np.zeros(chunk.shape[0], dtype=np.int32)
+        for s in range(4):
+            mask = np.where(suits == s, bits, 0).sum(axis=1)
+            np.maximum(flush, FLUSH_TABLE_NP[mask], out=flush)
+        rank_strength = RANK_VALUES_NP[np.searchsorted(RANK_KEYS_NP, key)]
+        out[start:start + BATCH_CHUNK] = np.where(flush > 0, flush, rank_strength)
+    return out
+
+def evaluate_batch(holes, boards) -> np.ndarray:
+    """Score many hole-card pairs against one board or many boards at once.
+
+    ``holes`` is ``(n, 2)``; ``boards`` is either a single board ``(k,)`` shared
+    by every hand or ``(m, k)`` with one board per hand. ``n`` and ``m`` must
+    match unless one of them is 1, in which case it is broadcast. Cards may be
+    given as strings or as encoded ints; the result is an int32 strength array.
+    """
+    holes = encode_cards(holes).reshape(-1, 2)
+    boards = encode_cards(boards)
+    if boards.ndim == 1:
+        boards = boards.reshape(1, -1)
+    n = max(holes.shape[0], boards.shape[0])
+    holes = np.broadcast_to(holes, (n, 2))
+    boards = np.broadcast_to(boards, (n, boards.shape[1]))
+    return evaluate_cards_batch(np.concatenate([holes, boards], axis=1))
+
+def best_hand_combinations(hole: List[str], board: List[str]):
+    """Reference implementation scoring every 5-card combination with classify_5."""
+    best = None
+    best5 = None
+    for combo in combinations(hole + board, 5):
+        score = classify_5(list(combo))
+        if (best is None) or (score > best):
+            best = score
+            best5 = list(combo)
+    return best, best5, HAND_NAME[best[0]]
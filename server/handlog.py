@@ -0,0 +1,263 @@
+"""Append-only hand history and a streaming replayer.
+
+Every hand becomes one compact JSON line::
+
+    {"v": 1, "game": "AB12CD", "hand": 3, "ts": 1700000000.0,
+     "deck": "7HQS...",                       # deck before dealing, dealt from the end
+     "seats": [[1, "Host-x", 100, false], [2, "ann", 96, true], ...],  # seat, name, chips, in hand
+     "log": [["a", 2, "bet4"], ["s", "flop", "2D9C4H"], ...],          # actions and streets
+     "result": {"winners": [...], "payouts": {...}, "pot": 8, "hand_name": "Flush"}}
+
+``result`` is null for a hand that was reset before its showdown. ``HandLog``
+buffers records in memory and a background task appends them to
+``hands-<start>-<pid>.jsonl`` segments in ``directory``, starting a new
+segment past ``max_bytes``. Handlers only queue; the file IO is handed to
+``execute`` (``eventlet.tpool.execute`` in production) so a slow disk never
+stalls the event loop. Reading never loads a whole file::
+
+    python handlog.py hands/            # replay every segment, print a JSON summary
+    python handlog.py hands/*.jsonl.gz --limit 100000
+    python handlog.py hands/ --workers 8     # one process per segment at a time
+
+Replaying deals each hand again from its deck, re-applies the actions through
+``rules`` and checks the streets and the showdown against the record. Hands
+whose chips do not add up (such as a pot nobody was left to win) are counted
+separately. The exit status is 1 only when a replay disagrees with its record.
+"""
+import argparse
+import glob
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from evaluator import CARD_TO_INT, cards_to_str
+from models import Game, Player
+import rules
+
+log = logging.getLogger("holdem")
+
+FORMAT_VERSION = 1
+
+def _cards(text: str) -> List[int]:
+    return [CARD_TO_INT[text[i:i + 2]] for i in range(0, len(text), 2)]
+
+def _text(cards: List[int]) -> str:
+    return "".join(cards_to_str(cards))
+
+# --- recording (called from the handlers, keeps the hand on ``Game.history``) ---
+def begin_hand(g: Game, deck: List[int]):
+    g.history = {
+        "v": FORMAT_VERSION,
+        "game": g.game_id,
+        "hand": g.hand_no,
+        "ts": round(time.time(), 3),
+        "deck": _text(deck),
+        "seats": [[p.seat, p.name, p.chips + p.pot, p.in_hand] for p in g.players.values()],
+        "log": [],
+    }
+
+def record_action(g: Game, p: Player, action: str):
+    if g.history is not None:
+        g.history["log"].append(["a", p.seat, action])
+
+def record_street(g: Game, cards: List[int]):
+    if g.history is not None:
+        g.history["log"].append(["s", g.stage, _text(cards)])
+
+def finish_hand(g: Game, result: Optional[dict]) -> Optional[dict]:
+    """Close the hand in progress and return its record (None if there was none)."""
+    record, g.history = g.history, None
+    if record is not None:
+        record["result"] = None if result is None else {
+            "winners": result["winners"],
+            "payouts": result.get("payouts", {}),
+            "pot": result.get("pot", g.pot),
+            "hand_name": result.get("hand_name"),
+        }
+    return record
+
+# --- writing ---
+class HandLog:
+    def __init__(self, directory: str, max_bytes: int = 64 << 20, flush_interval: float = 1.0,
+                 start_task: Optional[Callable] = None, sleep: Callable[[float], None] = time.sleep,
+                 execute: Optional[Callable] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.start_task = start_task
+        self.sleep = sleep
+        self.execute = execute or (lambda fn, *args: fn(*args))
+        self._pending: List[str] = []
+        self._file = None
+        self._flusher = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def append(self, record: dict):
+        self._pending.append(json.dumps(record, separators=(",", ":")))
+        if self._flusher is None and self.start_task is not None:
+            self._flusher = self.start_task(self._flush_loop)
+
+    def _segment(self):
+        if self._file is not None and self._file.tell() < self.max_bytes:
+            return self._file
+        if self._file is not None:
+            self._file.close()
+        name = time.strftime("hands-%Y%m%dT%H%M%S", time.gmtime()) + f"-{os.getpid()}.jsonl"
+        self._file = open(os.path.join(self.directory, name), "a", buffering=1 << 20, encoding="utf-8")
+        return self._file
+
+    def flush(self) -> int:
+        """Append buffered records to the current segment; returns how many were written."""
+        batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        try:
+            self.execute(self._write, "\n".join(batch) + "\n")
+        except OSError:
+            log.exception("hand log write failed; retrying %d records", len(batch))
+            self._pending[:0] = batch
+            return 0
+        return len(batch)
+
+    def _write(self, text: str):
+        # Runs in ``execute``, off the event loop (inline only from close).
+        f = self._segment()
+        f.write(text)
+        f.flush()
+
+    def _flush_loop(self):
+        while True:
+            self.sleep(self.flush_interval)
+            self.flush()
+
+    def close(self):
+        """Write what is left and close the segment; at exit, so inline."""
+        batch, self._pending = self._pending, []
+        if batch:
+            self._write("\n".join(batch) + "\n")
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+# --- reading ---
+def segment_paths(paths: Iterable[str]) -> List[str]:
+    """Expand directories into their segments, oldest first."""
+    out = []
+    for path in paths:
+        if os.path.isdir(path):
+            out.extend(sorted(glob.glob(os.path.join(path, "hands-*.jsonl*"))))
+        else:
+            out.append(path)
+    return out
+
+def read_records(paths: Iterable[str]) -> Iterator[dict]:
+    """Stream records line by line from plain or gzip-compressed segments."""
+    for path in segment_paths(paths):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def replay(record: dict) -> Tuple[List[str], int]:
+    """Re-run one hand through ``rules``.
+
+    Returns the differences from the record (empty if it matches) and the
+    chips gained by the table over the hand, which is 0 unless a pot went
+    unpaid.
+    """
+    g = Game(game_id=record["game"], hand_no=record["hand"] - 1)
+    for seat, name, chips, _ in record["seats"]:
+        g.players[str(seat)] = Player(sid=str(seat), name=name, chips=chips, seat=seat)
+    rules.start_hand(g, _cards(record["deck"]))
+    problems = []
+    dealt_in = [p.in_hand for p in g.players.values()]
+    if dealt_in != [s[3] for s in record["seats"]]:
+        problems.append("players dealt in differ")
+    total = sum(p.chips for p in g.players.values())
+    for entry in record["log"]:
+        if entry[0] == "a":
+            p = g.players.get(str(entry[1]))
+            if p is None:
+                problems.append(f"action from unknown seat {entry[1]}")
+                continue
+            error = rules.apply_action(g, p, entry[2])
+            if error:
+                problems.append(f"seat {entry[1]} {entry[2]}: {error}")
+        elif entry[0] == "s":
+            cards = rules.deal_street(g)
+            if g.stage != entry[1] or _text(cards) != entry[2]:
+                problems.append(f"{entry[1]} dealt {_text(cards)}, recorded {entry[2]}")
+    result = record.get("result")
+    if result is None:  # reset mid-hand: the bets are still in front of the players
+        return problems, sum(p.chips + p.pot for p in g.players.values()) - total
+    ours = rules.showdown(g)
+    if ours["winners"] != result["winners"] or ours.get("payouts", {}) != result["payouts"]:
+        problems.append(f"showdown {ours['winners']} {ours.get('payouts')}, recorded {result['winners']} {result['payouts']}")
+    return problems, sum(p.chips for p in g.players.values()) - total
+
+def check_records(records: Iterable[dict], limit: int = 0, show: int = 10) -> Tuple[dict, List[str]]:
+    """Replay a stream of records; returns summary counts and up to ``show`` messages."""
+    counts = {"hands": 0, "showdowns": 0, "failed": 0, "hands_not_conserving_chips": 0, "chips_delta": 0}
+    messages = []
+    for record in records:
+        counts["hands"] += 1
+        counts["showdowns"] += record.get("result") is not None
+        problems, delta = replay(record)
+        if problems:
+            counts["failed"] += 1
+            if len(messages) < show:
+                messages.append(f"{record['game']}#{record['hand']}: {'; '.join(problems)}")
+        if delta:
+            counts["hands_not_conserving_chips"] += 1
+            counts["chips_delta"] += delta
+            if len(messages) < show:
+                messages.append(f"{record['game']}#{record['hand']}: chips changed by {delta}")
+        if limit and counts["hands"] >= limit:
+            break
+    return counts, messages
+
+def _check_segment(args) -> Tuple[dict, List[str]]:
+    path, show = args
+    return check_records(read_records([path]), show=show)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay hand-history segments and check them against the rules.")
+    parser.add_argument("paths", nargs="+", help="segment files or directories of segments")
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many hands (single worker only)")
+    parser.add_argument("--show", type=int, default=10, help="print at most this many problem hands")
+    parser.add_argument("--workers", type=int, default=1, help="replay segments in this many processes")
+    args = parser.parse_args()
+    if args.limit and args.workers > 1:
+        parser.error("--limit needs --workers 1")
+
+    started = time.perf_counter()
+    if args.workers > 1:
+        from multiprocessing import Pool
+        counts, messages = {}, []
+        with Pool(args.workers) as pool:
+            jobs = [(path, args.show) for path in segment_paths(args.paths)]
+            for part, part_messages in pool.imap_unordered(_check_segment, jobs):
+                for key, value in part.items():
+                    counts[key] = counts.get(key, 0) + value
+                messages.extend(part_messages[:max(0, args.show - len(messages))])
+    else:
+        counts, messages = check_records(read_records(args.paths), args.limit, args.show)
+    for message in messages:
+        print(message, file=sys.stderr)
+    elapsed = time.perf_counter() - started
+    counts["seconds"] = round(elapsed, 3)
+    counts["hands_per_sec"] = round(counts.get("hands", 0) / elapsed) if elapsed else None
+    print(json.dumps(counts))
+    sys.exit(1 if counts.get("failed") else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""Headless Socket.IO load test against a locally running server.
+
+Starts ``--tables`` simulated tables, each with a host and ``--players`` bot
+players (1-15), and plays hands in a loop: the host creates and joins the
+game and starts hands, bots answer with legal random actions, and the host
+deals each street through to the showdown. Every emit is timed until the
+server's answer reaches the emitting socket (the room broadcast for actions,
+deals and the showdown, ``joined``/``game_created`` otherwise).
+
+Server CPU and broadcast counts come from ``/api/metrics`` before and after
+the run. The report is JSON so runs can be compared::
+
+    python app.py                                   # or gunicorn, in another shell
+    python loadtest.py --tables 50 --players 8 --duration 60 --out load.json
+    python loadtest.py --tables 50 --players 8 --out new.json --compare load.json
+    python loadtest.py --tables 50 --players 8 --wire msgpack   # compact binary state (wire.py)
+
+Needs the Socket.IO client extras, pinned because ``--wire msgpack`` relies
+on an engine.io client internal (see ``handle_frames_in_order``)::
+
+    pip install "python-socketio[client]==5.17.0" "python-engineio==4.14.0"
+"""
+import eventlet
+eventlet.monkey_patch()
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import urllib.request
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import socketio
+
+import wire
+
+BROADCAST_EVENTS = ("state", "state_delta")
+
+class TableError(Exception):
+    pass
+
+def apply_delta(state: Optional[dict], delta: dict) -> Optional[dict]:
+    """Python twin of client/src/state.js: patch a snapshot, None on a version gap."""
+    if state is None or state.get("version") != delta["base"]:
+        return None
+    by_seat = {p["seat"]: p for p in state["players"]}
+    for seat in delta.get("removed", []):
+        by_seat.pop(seat, None)
+    for seat, fields in delta["players"].items():
+        by_seat[int(seat)] = {**by_seat.get(int(seat), {}), **fields}
+    order = delta.get("order") or [p["seat"] for p in state["players"] if p["seat"] in by_seat]
+    return {**state, **delta["game"], "version": delta["version"], "players": [by_seat[s] for s in order]}
+
+def handle_frames_in_order(client: socketio.Client):
+    """Run a client's incoming engine.io frames inline, in arrival order.
+
+    Socket.IO always sends a ``bytes`` payload as a header frame followed by
+    attachment frames, and the engine.io client hands every frame to a thread
+    of its own. An attachment can then be decoded before its header, so
+    binary events come apart. The engine.io client has no option for this;
+    its ``_trigger_event`` is wrapped to drop ``run_async`` instead, which
+    ties the harness to the pinned client version.
+    """
+    trigger = getattr(client.eio, "_trigger_event", None)
+    if trigger is None:
+        raise RuntimeError("--wire msgpack needs python-engineio 4.14 (engine.io client internals changed)")
+
+    def in_order(event, *args, **kwargs):
+        kwargs.pop("run_async", None)
+        return trigger(event, *args, **kwargs)
+    client.eio._trigger_event = in_order
+
+class Bot:
+    """One socket. Incoming events are queued so the table driver can wait on them."""
+
+    def __init__(self, url: str, name: str, stats: "Stats", binary: bool = False):
+        self.name = name
+        self.stats = stats
+        self.inbox = eventlet.queue.LightQueue()
+        self.state: Optional[dict] = None
+        self.sio = socketio.Client(reconnection=False)
+        self.sio.on("*", self._on_event)
+        if binary:
+            handle_frames_in_order(self.sio)  # the event handler only queues, so inline is cheap
+        self.sio.connect(url, transports=["websocket"], auth={"wire": wire.NAME} if binary else None)
+
+    def _on_event(self, event, data=None):
+        self.stats.received += 1
+        if event.endswith("_bin"):
+            self.stats.binary_bytes += len(data)
+            event, data = event[:-4], wire.unpack(event[:-4], data)
+        if event == "state":
+            self.state = data
+        elif event == "state_delta":
+            self.state = apply_delta(self.state, data)
+            if self.state is None:
+                self.sio.emit("request_state", {"gameId": data["gameId"]})
+        self.inbox.put((event, data))
+
+    def call(self, event: str, data: dict, expect=BROADCAST_EVENTS, after: int = -1, timeout: float = 10.0):
+        """Emit and wait for the first reply in ``expect``; records the round trip.
+
+        Broadcasts only count once this socket's state is newer than version
+        ``after``, so a late broadcast of an earlier event is not taken as
+        the reply.
+        """
+        while not self.inbox.empty():
+            self.inbox.get_nowait()
+        started = time.perf_counter()
+        self.sio.emit(event, data)
+        deadline = started + timeout
+        while True:
+            try:
+                name, payload = self.inbox.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except eventlet.queue.Empty:
+                self.stats.timeouts += 1
+                raise TableError(f"{self.name}: no reply to {event}")
+            if name == "error":
+                self.stats.errors[event] = self.stats.errors.get(event, 0) + 1
+                return name, payload
+            if name in BROADCAST_EVENTS and (self.state is None or self.state["version"] <= after):
+                continue
+            if name in expect:
+                self.stats.observe(event, time.perf_counter() - started)
+                return name, payload
+
+    def close(self):
+        try:
+            self.sio.disconnect()
+        except Exception:
+            pass
+
+class Stats:
+    def __init__(self):
+        self.latency: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.timeouts = 0
+        self.received = 0
+        self.binary_bytes = 0
+        self.hands = 0
+        self.tables_started = 0
+
+    def observe(self, event: str, seconds: float):
+        self.latency.setdefault(event, []).append(seconds)
+
+    def summary(self) -> dict:
+        out = {}
+        for event, values in sorted(self.latency.items()):
+            values.sort()
+            pick = lambda q: round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 2)
+            out[event] = {
+                "count": len(values),
+                "p50_ms": pick(0.50),
+                "p90_ms": pick(0.90),
+                "p99_ms": pick(0.99),
+                "max_ms": round(values[-1] * 1000, 2),
+            }
+        return out
+
+def choose_action(rng: random.Random, state: dict, me: dict) -> str:
+    """A legal action for ``me`` given the host's view of the table."""
+    to_call = state["currentBet"] - me["roundBet"]
+    if to_call > 0:
+        if me["chips"] < to_call or rng.random() < 0.1:
+            return "fold"
+        if not state["raiseMade"] and state["currentBet"] < 8 and me["chips"] >= 8 - me["roundBet"] and rng.random() < 0.1:
+            return "bet8"
+        return "call"
+    roll = rng.random()
+    if roll < 0.2 and state["currentBet"] == 0 and not state["raiseMade"] and me["chips"] >= 4:
+        return "bet4"
+    if roll < 0.3 and not state["raiseMade"] and me["chips"] >= 8:
+        return "bet8"
+    return "check"
+
+def play_table(url: str, index: int, players: int, equity_ms: Optional[int], think: float,
+               stop_at: float, stats: Stats, seed: int, binary: bool = False):
+    rng = random.Random(seed + index)
+    bots: List[Bot] = []
+    try:
+        host = Bot(url, f"Host-{index}", stats, binary)
+        bots.append(host)
+        options = {} if equity_ms is None else {"equityBudgetMs": equity_ms}
+        _, created = host.call("host_create_game", options, expect=("game_created",))
+        game_id = created["gameId"]
+        host.call("join_game", {"gameId": game_id, "name": host.name}, expect=("joined",))
+        seats: Dict[str, Bot] = {}
+        for n in range(players):
+            bot = Bot(url, f"bot{index}-{n}", stats, binary)
+            bots.append(bot)
+            _, joined = bot.call("join_game", {"gameId": game_id, "name": bot.name}, expect=("joined",))
+            seats[bot.name] = bot
+        stats.tables_started += 1
+        eventlet.sleep(0.05)  # let the join broadcasts settle on the host
+        payload = {"gameId": game_id}
+        while time.monotonic() < stop_at:
+            host.call("host_start", payload, after=host.state["version"])
+            view = host  # whichever socket got the latest broadcast holds the freshest state
+            if sum(1 for p in view.state["players"] if p["inHand"]) < 2:
+                break  # everyone but one is out of chips
+            for street in range(4):
+                for _ in range(4 * players):  # bounded: a raise reopens action at most once
+                    state = view.state
+                    pending = [p for p in state["players"]
+                               if p["inHand"] and not p["acted"] and p["name"] in seats]
+                    if not pending:
+                        break
+                    me = pending[0]
+                    view = seats[me["name"]]
+                    eventlet.sleep(think * rng.random())
+                    action = choose_action(rng, state, me)
+                    reply, _ = view.call("player_action", dict(payload, action=action), after=state["version"])
+                    if reply == "error":
+                        view.call("player_action", dict(payload, action="fold"), after=state["version"])
+                # The showdown is followed by a broadcast of the settled table.
+                host.call("host_deal_next", payload, after=view.state["version"])
+                view = host
+            stats.hands += 1
+    except TableError as exc:
+        print(f"table {index}: {exc}", file=sys.stderr)
+    finally:
+        for bot in bots:
+            bot.close()
+
+def scrape(url: str) -> Dict[str, float]:
+    """Sum each metric family in /api/metrics over its labels."""
+    totals: Dict[str, float] = {}
+    with urllib.request.urlopen(url.rstrip("/") + "/api/metrics", timeout=10) as resp:
+        for line in resp.read().decode().splitlines():
+            if not line or line.startswith("#"):
+                continue
+            name, value = line.rsplit(" ", 1)
+            family = name.split("{", 1)[0]
+            if family == "holdem_emits_total" and 'event="state' not in name:
+                family = "holdem_other_emits_total"
+            totals[family] = totals.get(family, 0.0) + float(value)
+    return totals
+
+def compare(current: dict, baseline: dict):
+    print("latency p50/p99 vs baseline:")
+    for event, now in current["events"].items():
+        before = baseline.get("events", {}).get(event)
+        if before:
+            print(f"  {event:18s} p50 {now['p50_ms']:8.2f} ms ({before['p50_ms']:8.2f})"
+                  f"  p99 {now['p99_ms']:8.2f} ms ({before['p99_ms']:8.2f})")
+    for key in ("hands_per_sec", "broadcasts_per_sec", "server_cpu_utilization"):
+        print(f"  {key:24s} {current.get(key)} (baseline {baseline.get(key)})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--tables", type=int, default=10)
+    parser.add_argument("--players", type=int, default=6, help="bots per table, 1-15")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of play after the ramp")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which tables are started")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="max random pause before each action")
+    parser.add_argument("--equity-ms", type=int, default=None, help="equityBudgetMs for created games")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--wire", choices=["json", wire.NAME], default="json", help="state encoding to ask for")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="previous JSON report to compare against")
+    args = parser.parse_args()
+    if not 1 <= args.players <= 15:
+        parser.error("--players must be between 1 and 15")
+
+    stats = Stats()
+    before = scrape(args.url)
+    started = time.monotonic()
+    stop_at = started + args.ramp + args.duration
+    pool = eventlet.GreenPool(args.tables)
+    for i in range(args.tables):
+        pool.spawn(play_table, args.url, i, args.players, args.equity_ms, args.think_ms / 1000.0,
+                   stop_at, stats, args.seed, args.wire == wire.NAME)
+        eventlet.sleep(args.ramp / max(1, args.tables))
+    pool.waitall()
+    elapsed = time.monotonic() - started
+    after = scrape(args.url)
+    delta = lambda name: after.get(name, 0.0) - before.get(name, 0.0)
+
+    cpu = delta("process_cpu_seconds_total")
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+        "seconds": round(elapsed, 2),
+        "tables_started": stats.tables_started,
+        "hands": stats.hands,
+        "hands_per_sec": round(stats.hands / elapsed, 2),
+        "events": stats.summary(),
+        "errors": stats.errors,
+        "timeouts": stats.timeouts,
+        "broadcasts_per_sec": round(delta("holdem_emits_total") / elapsed, 1),
+        "other_emits_per_sec": round(delta("holdem_other_emits_total") / elapsed, 1),
+        "client_messages_per_sec": round(stats.received / elapsed, 1),
+        "client_binary_bytes_per_sec": round(stats.binary_bytes / elapsed, 1),
+        "server_cpu_seconds": round(cpu, 2),
+        "server_cpu_utilization": round(cpu / elapsed, 3),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    sys.exit(1 if stats.timeouts else 0)
+
+if __name__ == "__main__":
+    main()
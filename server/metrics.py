@@ -0,0 +1,165 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Collectors are plain dict-backed counters, gauges and fixed-bucket histograms
+keyed by label values; recording a sample is a dict lookup and a few adds, so
+it is cheap enough for every socket event. ``Metrics.render`` produces the
+``/api/metrics`` body.
+"""
+import bisect
+import functools
+import json
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+try:  # one slot per green thread, whether or not threading is monkey-patched
+    from eventlet.corolocal import local as _green_local
+except ImportError:
+    from threading import local as _green_local
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+def _labels(names: Tuple[str, ...], values: Tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '%s="%s"' % (n, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for n, v in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def samples(self):
+        for key, v in self.values.items():
+            yield self.name + _labels(self.labels, key), v
+
+class Gauge:
+    """Value read from a callback at scrape time."""
+
+    def __init__(self, name: str, help: str, fn: Callable[[], float], kind: str = "gauge"):
+        self.name, self.help, self.fn, self.kind = name, help, fn, kind
+
+    def samples(self):
+        yield self.name, self.fn()
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self.values: Dict[Tuple, list] = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *label_values):
+        row = self.values.get(label_values)
+        if row is None:
+            row = self.values[label_values] = [0] * (len(self.buckets) + 2)
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            row[i] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def samples(self):
+        for key, row in self.values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                yield self.name + "_bucket" + _labels(self.labels + ("le",), key + (bound,)), cumulative
+            yield self.name + "_bucket" + _labels(self.labels + ("le",), key + ("+Inf",)), row[-1]
+            yield self.name + "_sum" + _labels(self.labels, key), row[-2]
+            yield self.name + "_count" + _labels(self.labels, key), row[-1]
+
+class PayloadSizeJSON:
+    """json module stand-in for Socket.IO that records each encoded size.
+
+    python-socketio encodes a room broadcast once, in the emitting green
+    thread, and reuses the packet for every participant. The size is kept
+    per green thread, so ``take`` right after ``emit`` returns that emit's
+    size without serializing the payload a second time, even when other
+    green threads encode in between. With a message queue the encoding
+    happens in the queue listener instead and ``take`` returns None.
+    """
+    _local = _green_local()
+
+    @classmethod
+    def dumps(cls, obj, *args, **kwargs):
+        text = json.dumps(obj, *args, **kwargs)
+        cls._local.size = len(text)
+        return text
+
+    @classmethod
+    def take(cls) -> Optional[int]:
+        """The size this green thread last encoded, once; None if it encoded nothing since."""
+        size = getattr(cls._local, "size", None)
+        cls._local.size = None
+        return size
+
+    @staticmethod
+    def loads(*args, **kwargs):
+        return json.loads(*args, **kwargs)
+
+class Metrics:
+    def __init__(self):
+        self.collectors = []
+        self.handler_seconds = self.add(Histogram(
+            "holdem_socket_handler_seconds", "Socket.IO handler latency.", ["event"]))
+        self.handler_errors = self.add(Counter(
+            "holdem_socket_handler_errors_total", "Socket.IO handlers that raised.", ["event"]))
+        self.emits = self.add(Counter(
+            "holdem_emits_total", "Socket.IO emits by room and event.", ["room", "event"]))
+        self.emit_bytes = self.add(Counter(
+            "holdem_emit_payload_bytes_total", "Encoded payload bytes emitted by room.", ["room", "event"]))
+        self.evaluator_seconds = self.add(Histogram(
+            "holdem_evaluator_seconds", "Hand evaluation time.", ["op"]))
+        self.snapshot_seconds = self.add(Histogram(
+            "holdem_snapshot_seconds", "Time to write one batch of game snapshots."))
+        self.add(Gauge("process_cpu_seconds_total", "Process CPU time.", time.process_time, kind="counter"))
+
+    def add(self, collector):
+        self.collectors.append(collector)
+        return collector
+
+    def timed(self, event: str):
+        """Decorator recording latency and failures of a socket event handler."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args):
+                started = time.perf_counter()
+                try:
+                    return fn(*args)
+                except Exception:
+                    self.handler_errors.inc(event)
+                    raise
+                finally:
+                    self.handler_seconds.observe(time.perf_counter() - started, event)
+            return wrapper
+        return decorator
+
+    def emitted(self, room: str, event: str, size: Optional[int]):
+        """Count an emit and its payload bytes; bytes are skipped when ``size`` is unknown."""
+        self.emits.inc(room, event)
+        if size is not None:
+            self.emit_bytes.inc(room, event, amount=size)
+
+    def forget_room(self, room: str):
+        for collector in (self.emits, self.emit_bytes):
+            for key in [k for k in collector.values if k[0] == room]:
+                del collector.values[key]
+
+    def render(self) -> str:
+        lines = []
+        for c in self.collectors:
+            lines.append(f"# HELP {c.name} {c.help}")
+            lines.append(f"# TYPE {c.name} {c.kind}")
+            for name, value in c.samples():
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,107 @@
+"""Table state: ``Game`` and ``Player`` plus their plain-dict form.
+
+Cards are ints 0-51 (see evaluator) everywhere in here; they become strings
+only when sent to clients or written to the hand log. Both classes are
+slotted to keep the per-table footprint small.
+
+``game_to_dict``/``game_from_dict`` are what the game stores persist, so any
+field added here must be JSON-serializable.
+"""
+import os
+import random
+import time
+from dataclasses import dataclass, field, fields
+from typing import List, Dict, Optional
+
+from evaluator import CARD_TO_INT
+
+STARTING_CHIPS = 100
+SMALL_BET = 4
+BIG_BET = 8
+EQUITY_BUDGET_MS = int(os.environ.get("EQUITY_BUDGET_MS", "200"))
+DECK = list(range(52))
+
+@dataclass(slots=True)
+class Player:
+    sid: str
+    name: str
+    in_hand: bool = True
+    cards: List[int] = field(default_factory=list)
+    raises: int = 0  # number of betting actions this hand
+    action_submitted: bool = False
+    chips: int = STARTING_CHIPS
+    round_bet: int = 0
+    pot: int = 0  # total chips committed this hand
+    seat: int = 0  # stable per-game id used to address the player in state deltas
+    token: str = ""  # secret handed to the player's client to reclaim the seat after a reconnect
+    connected: bool = True  # False while the seat is held for a reconnect
+    bot: bool = False  # played by the server (see bots.py); the sid has no socket
+    parts: List[int] = field(default_factory=list)  # evaluator.card_parts of hole + board so far
+    strength: int = 0  # best hand on the board dealt so far; 0 before the flop
+
+@dataclass(slots=True)
+class Game:
+    game_id: str
+    host_sid: Optional[str] = None
+    players: Dict[str, Player] = field(default_factory=dict)  # sid -> Player
+    deck: List[int] = field(default_factory=list)
+    board: List[int] = field(default_factory=list)
+    stage: str = "lobby"  # lobby, preflop, flop, turn, river, showdown
+    pot: int = 0
+    round_actions: Dict[str, str] = field(default_factory=dict)  # sid -> action
+    someone_raised: bool = False
+    current_bet: int = 0  # highest bet in current round
+    raise_made: bool = False  # whether someone has already raised in this round
+    max_players: int = 15
+    hand_no: int = 0  # incremented every time a new hand is dealt
+    equity_budget_ms: int = EQUITY_BUDGET_MS  # 0 disables equity broadcasts
+    next_seat: int = 1
+    version: int = 0  # bumped on every broadcast state change
+    dirty: int = 0  # bumped on every change at all, broadcast or not (deck, hands, seats); see snapshots.py
+    last_state: Optional[dict] = field(default=None, repr=False)  # snapshot at `version`
+    last_active: float = field(default_factory=time.time)  # wall clock of the last handled event
+    history: Optional[dict] = field(default=None, repr=False)  # hand-history record of the hand in play
+    tournament_id: Optional[str] = None  # set on tables a tournament director runs (see tournament.py)
+
+    def reset_deck(self):
+        self.deck = DECK.copy()
+        random.shuffle(self.deck)
+
+    def deal_to_all(self):
+        for p in list(self.players.values()):
+            if p.in_hand:
+                p.cards = [self.deck.pop(), self.deck.pop()]
+
+    def active_sids(self) -> List[str]:
+        return [p.sid for p in self.players.values() if p.in_hand]
+
+    def everyone_acted(self) -> bool:
+        for sid in self.active_sids():
+            if not self.players[sid].action_submitted and not self.players[sid].name.startswith("Host-"):
+                return False
+        return True
+
+GAME_FIELDS = [f.name for f in fields(Game)]
+PLAYER_FIELDS = [f.name for f in fields(Player)]
+
+def game_to_dict(g: Game) -> dict:
+    # Shallow, unlike dataclasses.asdict whose deep copy dominated store and
+    # snapshot writes: the result shares lists with ``g``, so encode it at once.
+    d = {name: getattr(g, name) for name in GAME_FIELDS}
+    d["players"] = [{name: getattr(p, name) for name in PLAYER_FIELDS} for p in g.players.values()]
+    return d
+
+def _card_ints(cards: list) -> List[int]:
+    # Snapshots and shared stores written before cards were ints hold their names.
+    return [CARD_TO_INT[c] if isinstance(c, str) else c for c in cards]
+
+def game_from_dict(d: dict) -> Game:
+    d = dict(d)
+    players = {}
+    for p in d.pop("players"):
+        p = Player(**p)
+        p.cards = _card_ints(p.cards)
+        players[p.sid] = p
+    d["deck"] = _card_ints(d.get("deck", []))
+    d["board"] = _card_ints(d.get("board", []))
+    return Game(players=players, **d)
@@ -0,0 +1,78 @@
+"""Per-room outbound queue that coalesces state broadcasts.
+
+Handlers queue "the table changed" and discrete room events here instead of
+emitting them. Every ``tick`` seconds a background task hands each room's
+queue to ``send`` in order. A state change folds into the one queued right
+before it, so a burst of actions within a tick costs one serialization and
+one delta; a discrete event (showdown, round_settled, your_cards) keeps its
+place, and a state change after it starts a new broadcast so clients see
+them in the order they happened.
+
+With ``tick`` 0 nothing is queued: ``send`` runs in the caller at once.
+"""
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+log = logging.getLogger("holdem")
+
+STATE = "state"
+
+class Outbox:
+    def __init__(self, send: Callable[[str, List[list]], None], tick: float = 0.02,
+                 start_task: Optional[Callable] = None, sleep: Callable[[float], None] = time.sleep):
+        self.send = send  # send(room, items); items are [STATE, [msg, ...]] or [event, data, to]
+        self.tick = tick
+        self.start_task = start_task
+        self.sleep = sleep
+        self._rooms: Dict[str, List[list]] = {}
+        self._flusher = None
+        self.coalesced = 0  # state changes folded into an earlier queued broadcast
+
+    @property
+    def pending(self) -> int:
+        return len(self._rooms)
+
+    def _queue(self, room: str, item: list):
+        if self.tick <= 0:
+            self.send(room, [item])
+            return
+        self._rooms.setdefault(room, []).append(item)
+        if self._flusher is None and self.start_task is not None:
+            self._flusher = self.start_task(self._flush_loop)
+
+    def state(self, room: str, msg: Optional[str] = None):
+        """The room's table changed; ``msg`` is an optional system notice to ride along."""
+        items = self._rooms.get(room)
+        if items and items[-1][0] == STATE:
+            self.coalesced += 1
+            if msg:
+                items[-1][1].append(msg)
+            return
+        self._queue(room, [STATE, [msg] if msg else []])
+
+    def emit(self, room: str, event: str, data, to: Optional[str] = None):
+        """A discrete event for the room (or for ``to``), delivered after what is queued before it."""
+        self._queue(room, [event, data, to])
+
+    def flush(self, room: Optional[str] = None):
+        """Send one room's queue now, or every room's when ``room`` is None."""
+        if room is not None:
+            items = self._rooms.pop(room, None)
+            if items:
+                self.send(room, items)
+            return
+        rooms, self._rooms = self._rooms, {}
+        for room, items in rooms.items():
+            try:
+                self.send(room, items)
+            except Exception:
+                log.exception("outbox flush failed for room %s", room)
+
+    def drop(self, room: str):
+        self._rooms.pop(room, None)
+
+    def _flush_loop(self):
+        while True:
+            self.sleep(self.tick)
+            self.flush()
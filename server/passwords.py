@@ -0,0 +1,79 @@
+"""Password hashing off the event loop, and failed-login rate limiting.
+
+Werkzeug's scrypt/PBKDF2 hashes take tens of milliseconds of CPU. Under
+eventlet that would stall every table on the worker, so ``PasswordHasher``
+hands the work to ``execute`` (``eventlet.tpool.execute`` in production,
+whose native threads run hashlib with the GIL released) and refuses new
+work once ``max_pending`` hashes are already queued or running.
+
+``LoginLimiter`` keeps one token bucket per key (username, client address).
+Each failed login takes a token from its buckets, buckets refill at a fixed
+rate, and a key with an empty bucket is refused before any hashing is done.
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+class PasswordHasher:
+    def __init__(self, max_pending: int = 32, execute: Optional[Callable] = None):
+        self.max_pending = max_pending
+        self.execute = execute or (lambda fn, *args: fn(*args))
+        self.pending = 0
+
+    def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            return None
+        self.pending += 1
+        try:
+            return self.execute(fn, *args)
+        finally:
+            self.pending -= 1
+
+    def hash(self, password: str) -> Optional[str]:
+        """The password's hash, or None when too many hashes are in flight."""
+        return self._run(generate_password_hash, password)
+
+    def check(self, pw_hash: str, password: str) -> Optional[bool]:
+        """Whether ``password`` matches, or None when too many hashes are in flight."""
+        return self._run(check_password_hash, pw_hash, password)
+
+class LoginLimiter:
+    def __init__(self, burst: int = 5, per_second: float = 5 / 60, max_keys: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.burst = burst
+        self.per_second = per_second
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, at)
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, at = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - at) * self.per_second)
+
+    def retry_after(self, *keys: str) -> float:
+        """Seconds until every key may try again; 0 when none is limited."""
+        now = self.clock()
+        wait = 0.0
+        for key in keys:
+            tokens = self._tokens(key, now)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / self.per_second)
+        return wait
+
+    def failed(self, *keys: str):
+        now = self.clock()
+        for key in keys:
+            self._buckets[key] = (max(0.0, self._tokens(key, now) - 1), now)
+            self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)  # the least recently failing key
+
+    def succeeded(self, *keys: str):
+        for key in keys:
+            self._buckets.pop(key, None)
+
+    @property
+    def tracked(self) -> int:
+        return len(self._buckets)
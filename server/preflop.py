@@ -0,0 +1,146 @@
+"""Precomputed preflop equity for the 169 starting-hand classes.
+
+The table holds win/tie/equity of each class against ``players - 1`` random
+opponents for every table size that was built, as a float32 array of shape
+``(MAX_TABLE_PLAYERS + 1, 169, 3)`` saved in ``.npy`` format. The server maps
+it read-only with ``np.load(mmap_mode="r")``, so a lookup is a single index.
+Rows that were not built are NaN and callers fall back to live computation.
+
+Build it once with::
+
+    python preflop.py --players 2-15 --samples 20000
+"""
+import argparse
+import os
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from evaluator import RANKS, evaluate_batch, evaluate_cards_batch
+
+MAX_TABLE_PLAYERS = 15
+CLASSES = 169
+PREFLOP_TABLE_PATH = os.environ.get(
+    "PREFLOP_TABLE_PATH", os.path.join(os.path.dirname(__file__), "preflop_equity.npy")
+)
+
+def hand_class(c1: int, c2: int) -> int:
+    """Index 0-168 of a starting hand: pairs on the diagonal of a 13x13 grid,
+    suited hands above it and offsuit hands below it."""
+    r1, r2 = c1 >> 2, c2 >> 2
+    hi, lo = max(r1, r2), min(r1, r2)
+    if (c1 & 3) == (c2 & 3):
+        return hi * 13 + lo
+    return lo * 13 + hi
+
+def class_cards(index: int) -> Tuple[int, int]:
+    """A representative pair of encoded cards for a hand class."""
+    row, col = divmod(index, 13)
+    if row == col:
+        return row * 4, row * 4 + 1
+    if row > col:  # suited
+        return row * 4, col * 4
+    return col * 4, row * 4 + 1
+
+def class_name(index: int) -> str:
+    row, col = divmod(index, 13)
+    if row == col:
+        return RANKS[row] * 2
+    if row > col:
+        return RANKS[row] + RANKS[col] + "s"
+    return RANKS[col] + RANKS[row] + "o"
+
+def simulate_class(index: int, players: int, samples: int, rng: np.random.Generator,
+                   batch: int = 4000) -> Tuple[float, float, float]:
+    """Monte Carlo win/tie/equity of one class against ``players - 1`` random hands."""
+    hero = np.array(class_cards(index), dtype=np.int8)
+    live = np.array([c for c in range(52) if c not in hero], dtype=np.int8)
+    opponents = players - 1
+    need = 2 * opponents + 5
+    win = tie = 0
+    share = 0.0
+    done = 0
+    while done < samples:
+        n = min(batch, samples - done)
+        # A full argsort, not argpartition: the board and each hole are cut from
+        # ``draw`` by position, so the drawn cards must be in random order too.
+        draw = live[rng.random((n, len(live))).argsort(axis=1)[:, :need]]
+        boards = draw[:, :5]
+        hero_strength = evaluate_batch(hero.reshape(1, 2), boards)
+        best_opp = np.zeros(n, dtype=np.int32)
+        n_best = np.zeros(n, dtype=np.int32)
+        for j in range(opponents):
+            hole = draw[:, 5 + 2 * j:7 + 2 * j]
+            s = evaluate_cards_batch(np.concatenate([hole, boards], axis=1))
+            n_best = np.where(s > best_opp, 1, np.where(s == best_opp, n_best + 1, n_best))
+            best_opp = np.maximum(best_opp, s)
+        wins = hero_strength > best_opp
+        ties = hero_strength == best_opp
+        win += int(wins.sum())
+        tie += int(ties.sum())
+        share += float(wins.sum()) + float((ties / (n_best + 1)).sum())
+        done += n
+    return win / samples, tie / samples, share / samples
+
+def build_table(player_counts: List[int], samples: int, seed: int = 0, log=print) -> np.ndarray:
+    table = np.full((MAX_TABLE_PLAYERS + 1, CLASSES, 3), np.nan, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    for players in player_counts:
+        started = time.perf_counter()
+        for index in range(CLASSES):
+            table[players, index] = simulate_class(index, players, samples, rng)
+        log(f"{players} players: {CLASSES} classes in {time.perf_counter() - started:.1f}s")
+    return table
+
+class PreflopTable:
+    """Read-only, memory-mapped preflop equity table."""
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+
+    @classmethod
+    def load(cls, path: str = PREFLOP_TABLE_PATH) -> Optional["PreflopTable"]:
+        if not os.path.isfile(path):
+            return None
+        data = np.load(path, mmap_mode="r")
+        if data.shape != (MAX_TABLE_PLAYERS + 1, CLASSES, 3):
+            return None
+        return cls(data)
+
+    def covers(self, players: int) -> bool:
+        return 2 <= players <= MAX_TABLE_PLAYERS and not np.isnan(self.data[players, 0, 0])
+
+    def lookup(self, c1: int, c2: int, players: int) -> Optional[Tuple[float, float, float]]:
+        """(win, tie, equity) of a dealt hand at a table of ``players``, or None."""
+        if not self.covers(players):
+            return None
+        win, tie, eq = self.data[players, hand_class(c1, c2)].tolist()
+        return win, tie, eq
+
+def _player_range(spec: str) -> List[int]:
+    counts = set()
+    for part in spec.split(","):
+        lo, _, hi = part.partition("-")
+        counts.update(range(int(lo), int(hi or lo) + 1))
+    bad = [n for n in counts if not 2 <= n <= MAX_TABLE_PLAYERS]
+    if bad:
+        raise argparse.ArgumentTypeError(f"player counts must be within 2-{MAX_TABLE_PLAYERS}")
+    return sorted(counts)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the preflop equity table.")
+    parser.add_argument("--out", default=PREFLOP_TABLE_PATH)
+    parser.add_argument("--players", type=_player_range, default=_player_range(f"2-{MAX_TABLE_PLAYERS}"),
+                        help="table sizes to build, e.g. 2-15 or 2,6,9")
+    parser.add_argument("--samples", type=int, default=20000, help="Monte Carlo runouts per class")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    table = build_table(args.players, args.samples, args.seed)
+    tmp = args.out + ".tmp.npy"
+    np.save(tmp, table)
+    os.replace(tmp, args.out)
+    print(f"Wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
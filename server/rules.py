@@ -0,0 +1,193 @@
+"""Table rules: dealing, betting actions and the showdown.
+
+Shared by the socket handlers in app.py and the hand-history replayer in
+handlog.py. Functions mutate the ``Game`` they are given; betting problems are
+returned as the error message the handler sends back to the player.
+"""
+import logging
+from typing import List, Optional
+
+from evaluator import (HAND_NAME, add_parts, best_five, card_parts, cards_to_str, evaluate, evaluate_parts,
+                       hand_category)
+from models import BIG_BET, SMALL_BET, Game, Player
+
+log = logging.getLogger("holdem")
+
+def start_hand(g: Game, deck: Optional[List[int]] = None) -> List[int]:
+    """Shuffle (or use ``deck``), reset the table and deal; returns the deck order before dealing."""
+    if deck is None:
+        g.reset_deck()
+    else:
+        g.deck = list(deck)
+    dealt_from = list(g.deck)
+    g.hand_no += 1
+    g.board = []
+    g.pot = 0
+    g.stage = "preflop"
+    g.someone_raised = False
+    g.current_bet = 0
+    g.raise_made = False
+    for p in g.players.values():
+        p.in_hand = (not p.name.startswith("Host-")) and p.chips > 0
+        p.action_submitted = False
+        p.raises = 0
+        p.round_bet = 0
+        p.pot = 0
+        p.cards = []
+        p.strength = 0
+    g.deal_to_all()
+    for p in g.players.values():
+        p.parts = card_parts(p.cards)
+    return dealt_from
+
+def commit_chips(g: Game, p: Player, target_round_bet: int):
+    amount = target_round_bet - p.round_bet
+    if amount <= 0:
+        return 0, None
+    if p.chips < amount:
+        return 0, f"Not enough chips. You need {amount}, but only have {p.chips}."
+    p.chips -= amount
+    p.round_bet += amount
+    p.pot += amount
+    g.pot += amount
+    return amount, None
+
+
+def reset_betting_round(g: Game):
+    for p in g.players.values():
+        p.round_bet = 0
+        if p.in_hand:
+            p.action_submitted = False
+    g.someone_raised = False
+    g.current_bet = 0
+    g.raise_made = False
+
+
+def reset_players_who_owe_call(g: Game, bettor: Player):
+    for other_p in g.players.values():
+        if other_p.sid != bettor.sid and other_p.in_hand and other_p.round_bet < g.current_bet:
+            other_p.action_submitted = False
+
+def apply_action(g: Game, p: Player, action: str) -> Optional[str]:
+    """Apply check, bet4, bet8, call or fold for ``p``; returns an error message or None."""
+    needs_to_call = p.round_bet < g.current_bet
+
+    if action == "fold":
+        p.in_hand = False
+        p.action_submitted = True
+    elif action == "check":
+        if needs_to_call:
+            return "Must call or fold - cannot check"
+        p.action_submitted = True
+    elif action == "call":
+        if not needs_to_call:
+            return "No need to call - you can check"
+        _, error = commit_chips(g, p, g.current_bet)
+        if error:
+            return error
+        p.action_submitted = True
+    elif action == "bet4":
+        if g.current_bet > 0:
+            return "There is already a bet. Call, raise to 8, or fold."
+        if g.raise_made:
+            return "Someone already raised in this round. You can only call or fold."
+        _, error = commit_chips(g, p, SMALL_BET)
+        if error:
+            return error
+        p.raises += 1
+        p.action_submitted = True
+        g.someone_raised = True
+        g.current_bet = SMALL_BET
+        reset_players_who_owe_call(g, p)
+        log.debug("Player %s bet %s. Current bet: %s, stack: %s", p.name, SMALL_BET, g.current_bet, p.chips)
+    elif action == "bet8":
+        if g.raise_made:
+            return "Someone already raised in this round. You can only call or fold."
+        if g.current_bet >= BIG_BET:
+            return "Current bet is already 8. Call or fold."
+        _, error = commit_chips(g, p, BIG_BET)
+        if error:
+            return error
+        p.raises += 1
+        p.action_submitted = True
+        g.someone_raised = True
+        g.raise_made = True
+        g.current_bet = BIG_BET
+        reset_players_who_owe_call(g, p)
+        log.debug("Player %s raised to %s. Current bet: %s, stack: %s", p.name, BIG_BET, g.current_bet, p.chips)
+    else:
+        return "Invalid action"
+    return None
+
+def deal_street(g: Game) -> List[int]:
+    """Reveal the next street (flop, turn or river) and start its betting round; returns the new cards."""
+    if g.stage == "preflop":
+        # Standard Texas Hold'em reveals all three flop cards at once.
+        cards = [g.deck.pop(), g.deck.pop(), g.deck.pop()]
+        g.stage = "flop"
+    elif g.stage == "flop":
+        cards = [g.deck.pop()]  # turn
+        g.stage = "turn"
+    elif g.stage == "turn":
+        cards = [g.deck.pop()]  # river
+        g.stage = "river"
+    else:
+        return []
+    g.board.extend(cards)
+    update_strengths(g, cards)
+    # Reset per-round flags and street bets for next betting round.
+    reset_betting_round(g)
+    return cards
+
+def update_strengths(g: Game, cards: List[int]):
+    """Fold a street's new cards into each live player's running hand."""
+    street = card_parts(cards)
+    for p in g.players.values():
+        if p.in_hand and p.cards:
+            # A hand restored from before parts were kept starts over from its cards.
+            p.parts = add_parts(p.parts, street) if p.parts else card_parts(p.cards + g.board)
+            p.strength = evaluate_parts(p.parts)
+
+def showdown(g: Game):
+    """Score the players still in the hand and pay the pot to the best hand(s)."""
+    g.stage = "showdown"
+    # Determine active players (those who did not fold before showdown)
+    contenders = [p for p in g.players.values() if p.in_hand]
+    if not contenders:
+        return {"winners": [], "hand": None}
+    # Strengths were kept up to date street by street; only a hand that
+    # skipped that (restored mid-hand) needs a fresh lookup.
+    scored = []
+    for p in contenders:
+        cards = p.cards + g.board
+        score = p.strength or evaluate(cards)
+        five = cards_to_str(best_five(cards, score))
+        name = HAND_NAME[hand_category(score)]
+        scored.append((score, p, name, five))
+        log.debug("Player %s has cards %s, board is %s, best hand: %s, score: %s",
+                  p.name, cards_to_str(p.cards), cards_to_str(g.board), name, five)
+    scored.sort(reverse=True, key=lambda t: t[0])
+    top = scored[0][0]
+    winning_players = [s[1] for s in scored if s[0] == top]
+    winners = [p.name for p in winning_players]
+    pot_before_payout = g.pot
+    payouts = {}
+    if winning_players and pot_before_payout:
+        share = pot_before_payout // len(winning_players)
+        remainder = pot_before_payout % len(winning_players)
+        for index, winner in enumerate(winning_players):
+            payout = share + (1 if index < remainder else 0)
+            winner.chips += payout
+            payouts[winner.name] = payout
+    log.debug("Top score is %s, winners are %s, payouts are %s", top, winners, payouts)
+    return {
+        "winners": winners,
+        "payouts": payouts,
+        "pot": pot_before_payout,
+        "board": cards_to_str(g.board),
+        "hand_name": HAND_NAME[hand_category(top)],  # This is the winning hand name
+        "show": [
+            {"name": s[1].name, "cards": cards_to_str(s[1].cards), "best5": s[3], "score": str(s[0]), "hand_name": s[2]}
+            for s in scored
+        ],
+    }
@@ -0,0 +1,204 @@
+"""Headless hand simulator on top of the engine.
+
+Plays hands at one table of ``--players`` seats with no sockets, no
+serialization and no equity: the host starts each hand, every seat answers
+through a policy, and the host deals to the showdown. Seats that run out of
+chips are all topped back up once fewer than two can play. Work is split over
+``--workers`` processes, each with its own seed::
+
+    python simulate.py --hands 1000000 --players 6 --workers 8
+    python simulate.py --hands 200000 --policy random,call,raise --hand-log /tmp/sim-hands
+    python handlog.py /tmp/sim-hands      # replay what the simulator logged
+
+Policies (given per seat, cycled when there are fewer than seats):
+
+* ``random``: any legal action, uniformly
+* ``call``: check or call, never folds or bets
+* ``raise``: the biggest legal bet, otherwise call or check
+* ``tight``: bets pairs and suited or connected high cards, folds the rest to a bet
+
+After every action the pot must equal the chips committed, stacks must stay
+non-negative and an action the engine listed as legal must be accepted; a
+betting round must settle within three actions per seat. Those are failures
+and exit with status 1. Hands whose chips do not add up (such as a pot
+nobody was left to win) are counted separately, as in the replayer.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+import engine
+from evaluator import cards_to_str
+from handlog import HandLog
+from models import STARTING_CHIPS, Game, Player
+
+HOST = "host"
+
+Policy = Callable[[random.Random, Game, Player, List[str]], str]
+
+def random_policy(rng: random.Random, g: Game, p: Player, legal: List[str]) -> str:
+    return rng.choice(legal)
+
+def call_policy(rng: random.Random, g: Game, p: Player, legal: List[str]) -> str:
+    return "check" if "check" in legal else "call" if "call" in legal else "fold"
+
+def raise_policy(rng: random.Random, g: Game, p: Player, legal: List[str]) -> str:
+    for action in ("bet8", "bet4", "call", "check"):
+        if action in legal:
+            return action
+    return "fold"
+
+def tight_policy(rng: random.Random, g: Game, p: Player, legal: List[str]) -> str:
+    (a, b) = (p.cards[0] >> 2, p.cards[1] >> 2)  # ranks, 0 = deuce
+    strong = a == b or (min(a, b) >= 8 and (abs(a - b) == 1 or p.cards[0] & 3 == p.cards[1] & 3))
+    if strong:
+        return raise_policy(rng, g, p, legal)
+    return "check" if "check" in legal else "fold"
+
+POLICIES: Dict[str, Policy] = {
+    "random": random_policy,
+    "call": call_policy,
+    "raise": raise_policy,
+    "tight": tight_policy,
+}
+
+def new_table(players: int) -> Game:
+    g = Game(game_id="SIM", host_sid=HOST, equity_budget_ms=0)
+    for seat in range(1, players + 1):
+        sid = f"p{seat}"
+        g.players[sid] = Player(sid=sid, name=f"seat{seat}", seat=seat)
+    return g
+
+def _check(g: Game) -> str:
+    if g.pot != sum(p.pot for p in g.players.values()):
+        return f"pot {g.pot} != committed {sum(p.pot for p in g.players.values())}"
+    for p in g.players.values():
+        if p.chips < 0:
+            return f"{p.name} has {p.chips} chips"
+    return ""
+
+def play_hand(g: Game, rng: random.Random, policies: List[Policy]) -> Tuple[List[str], dict]:
+    """Play one hand to its showdown; returns failures and the hand-history record."""
+    failures = []
+    events = engine.host_start(g, HOST)
+    seats = list(g.players.values())
+    for _ in range(4):  # preflop, flop, turn, river
+        for _ in range(3):  # a bet reopens action, a raise at most once more
+            moved = False
+            for p, policy in zip(seats, policies):
+                legal = engine.legal_actions(g, p)
+                if not legal:
+                    continue
+                action = policy(rng, g, p, legal)
+                for event in engine.player_action(g, p.sid, action):
+                    if event.name == "error":
+                        failures.append(f"{p.name} {action} rejected: {event.data['error']}")
+                        engine.player_action(g, p.sid, "fold")
+                moved = True
+                problem = _check(g)
+                if problem:
+                    failures.append(problem)
+            if not moved:
+                break
+        if not g.everyone_acted():
+            failures.append(f"{g.stage} betting did not settle")
+            break
+        events = engine.host_deal_next(g, HOST)
+    record = next((e.data for e in events if e.name == "hand_logged"), None)
+    return failures, record
+
+def run(job: Tuple[int, int, int, List[str], str]) -> Tuple[dict, List[str]]:
+    """Simulate ``hands`` hands with one seed; returns counts and failure messages."""
+    seed, hands, players, policy_names, hand_log_dir = job
+    random.seed(seed)  # the deck shuffle
+    rng = random.Random(seed)
+    policies = [POLICIES[policy_names[i % len(policy_names)]] for i in range(players)]
+    hand_log = HandLog(hand_log_dir) if hand_log_dir else None
+    g = new_table(players)
+    counts = {"hands": 0, "showdowns": 0, "failed": 0, "hands_not_conserving_chips": 0,
+              "chips_delta": 0, "rebuys": 0}
+    messages = []
+    for _ in range(hands):
+        if sum(1 for p in g.players.values() if p.chips > 0) < 2:
+            for p in g.players.values():
+                p.chips = STARTING_CHIPS
+            counts["rebuys"] += 1
+        total = sum(p.chips for p in g.players.values())
+        failures, record = play_hand(g, rng, policies)
+        counts["hands"] += 1
+        counts["showdowns"] += g.stage == "showdown"
+        delta = sum(p.chips for p in g.players.values()) - total
+        if failures:
+            counts["failed"] += 1
+            if len(messages) < 10:
+                messages.append(f"seed {seed} hand {g.hand_no} {cards_to_str(g.board)}: {'; '.join(failures)}")
+        if delta:
+            counts["hands_not_conserving_chips"] += 1
+            counts["chips_delta"] += delta
+        if hand_log is not None and record is not None:
+            hand_log.append(record)
+            if hand_log.pending >= 10000:
+                hand_log.flush()
+    if hand_log is not None:
+        hand_log.close()
+    return counts, messages
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hands", type=int, default=100000)
+    parser.add_argument("--players", type=int, default=6, help="seats at the table, 2-15")
+    parser.add_argument("--policy", default="random", help=f"comma-separated, from {','.join(POLICIES)}")
+    parser.add_argument("--workers", type=int, default=1, help="processes to split the hands over")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--hand-log", default="", help="also write every hand to this hand-log directory")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    if not 2 <= args.players <= 15:
+        parser.error("--players must be between 2 and 15")
+    policy_names = args.policy.split(",")
+    unknown = [name for name in policy_names if name not in POLICIES]
+    if unknown:
+        parser.error(f"unknown policy {unknown[0]}")
+
+    workers = max(1, args.workers)
+    jobs = [(args.seed + i, args.hands // workers + (i < args.hands % workers), args.players,
+             policy_names, args.hand_log) for i in range(workers)]
+    started = time.perf_counter()
+    if workers > 1:
+        from multiprocessing import Pool
+        with Pool(workers) as pool:
+            parts = pool.map(run, jobs)
+    else:
+        parts = [run(jobs[0])]
+    elapsed = time.perf_counter() - started
+    counts: Dict[str, int] = {}
+    messages: List[str] = []
+    for part, part_messages in parts:
+        for key, value in part.items():
+            counts[key] = counts.get(key, 0) + value
+        messages.extend(part_messages)
+    for message in messages[:10]:
+        print(message, file=sys.stderr)
+
+    report = {
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "out"},
+        **counts,
+        "seconds": round(elapsed, 3),
+        "hands_per_sec": round(counts["hands"] / elapsed) if elapsed else None,
+        "hands_per_min": round(counts["hands"] * 60 / elapsed) if elapsed else None,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    sys.exit(1 if counts["failed"] else 0)
+
+if __name__ == "__main__":
+    main()
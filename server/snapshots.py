@@ -0,0 +1,73 @@
+"""Crash recovery for in-memory games.
+
+``SnapshotStore.save`` writes every game whose ``dirty`` counter moved since the
+last save (plus deletions) to a local SQLite file in one transaction, as
+zlib-compressed compact JSON without the cached ``last_state``. It does not
+go by ``version``, which misses changes players never see, such as a fresh
+deck or a reclaimed seat. ``load``
+reads them all back at startup; players come back disconnected so their
+clients can reclaim the seats with their tokens. Bots stay connected.
+"""
+import json
+import time
+import zlib
+from typing import Dict, Iterable, List
+
+from dbpool import ConnectionPool
+from models import Game, game_from_dict, game_to_dict
+
+SQL_UPSERT_SNAPSHOT = (
+    "INSERT INTO snapshots (game_id, version, data, saved_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(game_id) DO UPDATE SET version=excluded.version, data=excluded.data, saved_at=excluded.saved_at"
+)
+SQL_DELETE_SNAPSHOT = "DELETE FROM snapshots WHERE game_id=?"
+SQL_SELECT_SNAPSHOTS = "SELECT game_id, version, data FROM snapshots"
+
+def encode_game(g: Game) -> bytes:
+    d = game_to_dict(g)
+    d.pop("last_state")  # rebuilt by the first broadcast after a restore
+    return zlib.compress(json.dumps(d, separators=(",", ":")).encode(), 1)
+
+def decode_game(data: bytes) -> Game:
+    return game_from_dict(json.loads(zlib.decompress(data)))
+
+class SnapshotStore:
+    def __init__(self, path: str):
+        self.pool = ConnectionPool(path, size=1)
+        self._saved: Dict[str, int] = {}  # game_id -> dirty counter last written
+        with self.pool.connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " game_id TEXT PRIMARY KEY, version INTEGER NOT NULL, data BLOB NOT NULL, saved_at REAL NOT NULL)"
+            )
+
+    def save(self, games: Iterable[Game]) -> int:
+        """Write games changed since the last save and drop vanished ones; returns rows touched."""
+        now = time.time()
+        rows, seen = [], set()
+        for g in games:
+            seen.add(g.game_id)
+            if self._saved.get(g.game_id) != g.dirty:
+                rows.append((g.game_id, g.version, encode_game(g), now, g.dirty))
+        gone = [(game_id,) for game_id in self._saved if game_id not in seen]
+        if not rows and not gone:
+            return 0
+        with self.pool.connection() as conn:
+            conn.executemany(SQL_UPSERT_SNAPSHOT, [row[:4] for row in rows])
+            conn.executemany(SQL_DELETE_SNAPSHOT, gone)
+        for game_id, _, _, _, dirty in rows:
+            self._saved[game_id] = dirty
+        for (game_id,) in gone:
+            del self._saved[game_id]
+        return len(rows) + len(gone)
+
+    def load(self) -> List[Game]:
+        games = []
+        with self.pool.connection() as conn:
+            for game_id, _, data in conn.execute(SQL_SELECT_SNAPSHOTS):
+                g = decode_game(data)
+                for p in g.players.values():
+                    p.connected = p.bot
+                games.append(g)
+                self._saved[game_id] = g.dirty
+        return games
@@ -0,0 +1,122 @@
+"""In-memory manifest of the built client, served with precompressed variants.
+
+``StaticManifest`` walks ``client/dist`` once at startup. Each file gets its
+content type, a strong ETag from its content hash and its ``.br``/``.gz``
+siblings, so a request costs a dict lookup and no ``stat``. Small files are
+kept in memory and larger ones (the GIFs) are streamed from disk. Vite's
+fingerprinted ``assets/*-<hash>.*`` files are cached as immutable; everything
+else is revalidated against its ETag.
+
+The compressed siblings are written at build time (see the Dockerfile)::
+
+    python static.py ../client/dist     # .gz always, .br if the brotli package is installed
+"""
+import argparse
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+HASHED_ASSET = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/manifest+json")
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))  # in order of preference
+IMMUTABLE = "public, max-age=31536000, immutable"
+MEMORY_LIMIT = 256 << 10  # files up to this size are served from memory
+
+class Variant(NamedTuple):
+    path: str
+    size: int
+    etag: str
+    data: Optional[bytes]  # None: stream from ``path``
+
+class Asset(NamedTuple):
+    content_type: str
+    cache_control: str
+    variants: Dict[str, Variant]  # content-coding ("identity", "gzip", "br") -> variant
+
+def _content_type(name: str) -> str:
+    guessed = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if guessed.startswith("text/") or guessed in ("application/javascript", "application/json"):
+        guessed += "; charset=utf-8"
+    return guessed
+
+def _variant(path: str, tag: str) -> Variant:
+    with open(path, "rb") as f:
+        data = f.read()
+    etag = '"%s%s"' % (hashlib.blake2b(data, digest_size=12).hexdigest(), tag)
+    return Variant(path, len(data), etag, data if len(data) <= MEMORY_LIMIT else None)
+
+class StaticManifest:
+    def __init__(self, root: str, max_age: int = 3600):
+        self.root = root
+        self.assets: Dict[str, Asset] = {}
+        if not os.path.isdir(root):
+            return
+        for directory, _, files in os.walk(root):
+            for name in files:
+                if name.endswith((".gz", ".br")):
+                    continue
+                path = os.path.join(directory, name)
+                key = os.path.relpath(path, root).replace(os.sep, "/")
+                variants = {"identity": _variant(path, "")}
+                for coding, suffix in ENCODINGS:
+                    if os.path.isfile(path + suffix):
+                        variants[coding] = _variant(path + suffix, "-" + suffix[1:])
+                if HASHED_ASSET.match(key):
+                    cache_control = IMMUTABLE
+                elif key.endswith(".html"):
+                    cache_control = "no-cache"
+                else:
+                    cache_control = f"public, max-age={max_age}"
+                self.assets[key] = Asset(_content_type(name), cache_control, variants)
+
+    def get(self, path: str) -> Optional[Asset]:
+        return self.assets.get(path)
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+def choose(asset: Asset, accept_encoding) -> Tuple[str, Variant]:
+    """Pick the smallest variant the client accepts (``accept_encoding`` is werkzeug's Accept)."""
+    for coding, _ in ENCODINGS:
+        if coding in asset.variants and accept_encoding[coding]:
+            return coding, asset.variants[coding]
+    return "identity", asset.variants["identity"]
+
+def precompress(root: str, min_size: int = 1024) -> List[str]:
+    """Write ``.gz`` (and ``.br`` when brotli is installed) beside compressible files; returns what was written."""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    written = []
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if name.endswith((".gz", ".br")) or not _content_type(name).startswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+            outputs = [(".gz", gzip.compress(data, 9, mtime=0))]
+            if brotli is not None:
+                outputs.append((".br", brotli.compress(data, quality=11)))
+            for suffix, packed in outputs:
+                if len(packed) < len(data):
+                    with open(path + suffix, "wb") as f:
+                        f.write(packed)
+                    written.append(path + suffix)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Write precompressed variants of a built client.")
+    parser.add_argument("root", help="the client's dist directory")
+    args = parser.parse_args()
+    written = precompress(args.root)
+    print(f"wrote {len(written)} compressed files under {args.root}")
+
+if __name__ == "__main__":
+    main()
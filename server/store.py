@@ -0,0 +1,207 @@
+"""Game-state backends.
+
+Handlers talk to the store through a small mapping-style API (``get``, ``in``,
+``[]``, ``values``, ``pop``) and wrap every mutation in ``locked(game_id)``.
+
+* ``MemoryStore`` keeps games in this process; it is the default and what a
+  single worker uses.
+* ``SQLiteStore`` keeps games in a shared SQLite file so several workers on
+  one machine can serve the same tables. ``locked`` takes a per-game lease,
+  loads the latest copy of the game and writes it back on exit; inside the
+  block ``store[game_id]`` returns that copy, so handler bodies read the same
+  way for both backends.
+
+Pick one with ``GAME_STORE`` (``memory`` or ``sqlite:///path/to/games.db``).
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from models import Game, game_from_dict, game_to_dict
+
+class MemoryStore:
+    def __init__(self):
+        self._games: "OrderedDict[str, Game]" = OrderedDict()
+
+    @contextmanager
+    def locked(self, game_id: str) -> Iterator[Optional[Game]]:
+        # One eventlet worker runs handlers to completion between yields, so
+        # in-process games need no extra locking.
+        yield self._games.get(game_id)
+
+    def get(self, game_id: str, default=None) -> Optional[Game]:
+        return self._games.get(game_id, default)
+
+    def __contains__(self, game_id) -> bool:
+        return game_id in self._games
+
+    def __getitem__(self, game_id: str) -> Game:
+        return self._games[game_id]
+
+    def __setitem__(self, game_id: str, g: Game):
+        self._games[game_id] = g
+
+    def pop(self, game_id: str, default=None) -> Optional[Game]:
+        return self._games.pop(game_id, default)
+
+    def values(self):
+        return list(self._games.values())
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def player_count(self) -> int:
+        return sum(len(g.players) for g in self._games.values())
+
+class SQLiteStore:
+    """Games shared between processes through one SQLite file.
+
+    A game is owned by whichever process holds its lease row; leases expire
+    after ``lease_seconds`` so a crashed worker cannot wedge a table. Each
+    process caches the last copy it read together with its revision and only
+    deserializes again when another process has written a newer one.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 10.0, wait_seconds: float = 5.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.wait_seconds = wait_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._conn = sqlite3.connect(path, timeout=wait_seconds, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS games ("
+            " game_id TEXT PRIMARY KEY, rev INTEGER NOT NULL, players INTEGER NOT NULL,"
+            " data TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases (game_id TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._cache: Dict[str, tuple] = {}  # game_id -> (rev, data, Game)
+        self._held: Dict[str, Game] = {}  # games loaded under a lease by this process
+        self._local_locks: Dict[str, threading.RLock] = {}
+
+    # --- leases ---
+    def _acquire_lease(self, game_id: str):
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            now = time.time()
+            cur = self._conn.execute(
+                "INSERT INTO leases (game_id, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(game_id) DO UPDATE SET owner=excluded.owner, expires_at=excluded.expires_at "
+                "WHERE leases.expires_at < ? OR leases.owner = excluded.owner",
+                (game_id, self.owner, now + self.lease_seconds, now),
+            )
+            if cur.rowcount == 1:
+                return
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"could not lock game {game_id}")
+            time.sleep(0.005)
+
+    def _release_lease(self, game_id: str):
+        self._conn.execute("DELETE FROM leases WHERE game_id=? AND owner=?", (game_id, self.owner))
+
+    @contextmanager
+    def locked(self, game_id: str) -> Iterator[Optional[Game]]:
+        local = self._local_locks.setdefault(game_id, threading.RLock())
+        with local:
+            if game_id in self._held:  # re-entered by the same handler
+                yield self._held[game_id]
+                return
+            self._acquire_lease(game_id)
+            try:
+                g = self._load(game_id)
+                if g is not None:
+                    self._held[game_id] = g
+                try:
+                    yield g
+                finally:
+                    g = self._held.pop(game_id, None)
+                    if g is not None:
+                        self._write(g)
+            finally:
+                self._release_lease(game_id)
+
+    # --- persistence ---
+    def _load(self, game_id: str) -> Optional[Game]:
+        row = self._conn.execute("SELECT rev FROM games WHERE game_id=?", (game_id,)).fetchone()
+        if row is None:
+            self._cache.pop(game_id, None)
+            return None
+        cached = self._cache.get(game_id)
+        if cached and cached[0] == row[0]:
+            return cached[2]
+        rev, data = self._conn.execute("SELECT rev, data FROM games WHERE game_id=?", (game_id,)).fetchone()
+        g = game_from_dict(json.loads(data))
+        self._cache[game_id] = (rev, data, g)
+        return g
+
+    def _write(self, g: Game):
+        data = json.dumps(game_to_dict(g), separators=(",", ":"))
+        cached = self._cache.get(g.game_id)
+        if cached and cached[1] == data:
+            return
+        rev = (cached[0] if cached else 0) + 1
+        self._conn.execute(
+            "INSERT INTO games (game_id, rev, players, data, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(game_id) DO UPDATE SET rev=excluded.rev, players=excluded.players, "
+            "data=excluded.data, updated_at=excluded.updated_at",
+            (g.game_id, rev, len(g.players), data, time.time()),
+        )
+        self._cache[g.game_id] = (rev, data, g)
+
+    # --- mapping API ---
+    def get(self, game_id: str, default=None) -> Optional[Game]:
+        if game_id in self._held:
+            return self._held[game_id]
+        g = self._load(game_id)
+        return default if g is None else g
+
+    def __contains__(self, game_id) -> bool:
+        if game_id in self._held:
+            return True
+        return self._conn.execute("SELECT 1 FROM games WHERE game_id=?", (game_id,)).fetchone() is not None
+
+    def __getitem__(self, game_id: str) -> Game:
+        g = self.get(game_id)
+        if g is None:
+            raise KeyError(game_id)
+        return g
+
+    def __setitem__(self, game_id: str, g: Game):
+        if game_id in self._held:
+            self._held[game_id] = g
+        else:
+            self._write(g)
+
+    def pop(self, game_id: str, default=None) -> Optional[Game]:
+        g = self._held.pop(game_id, None) or self._load(game_id)
+        self._conn.execute("DELETE FROM games WHERE game_id=?", (game_id,))
+        self._cache.pop(game_id, None)
+        self._local_locks.pop(game_id, None)
+        return default if g is None else g
+
+    def values(self):
+        ids = [r[0] for r in self._conn.execute("SELECT game_id FROM games")]
+        return [g for g in (self.get(i) for i in ids) if g is not None]
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def player_count(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(players), 0) FROM games").fetchone()[0]
+
+def open_store(url: str):
+    """Build the store named by a GAME_STORE url."""
+    if not url or url == "memory":
+        return MemoryStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    raise ValueError(f"unsupported GAME_STORE {url!r}")
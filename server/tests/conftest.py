@@ -0,0 +1,9 @@
+import os
+import sys
+
+# The server modules import each other as top-level modules (run from server/).
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tests that import app must not restore snapshots or write hand history.
+os.environ.setdefault("SNAPSHOT_PATH", "")
+os.environ.setdefault("HAND_LOG_DIR", "")
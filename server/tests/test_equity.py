@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+SERVER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The pool as app.py runs it: monkey-patched, used once, shut down at exit.
+SCRIPT = textwrap.dedent("""
+    import eventlet
+    eventlet.monkey_patch()
+    import atexit
+    import sys
+    sys.path.insert(0, {server!r})
+    from equity import EquityPool
+
+    def main():
+        pool = EquityPool(1, max_pending=4)
+        atexit.register(pool.shutdown)
+        fut = pool.submit([[0, 1], [50, 51]], [], 20)
+        while not fut.done():
+            eventlet.sleep(0.01)
+        print(len(fut.result()["equity"]))
+
+    if __name__ == "__main__":
+        main()
+""")
+
+def test_monkey_patched_process_using_the_pool_exits(tmp_path):
+    script = tmp_path / "uses_pool.py"
+    script.write_text(SCRIPT.format(server=SERVER))
+    done = subprocess.run([sys.executable, str(script)], capture_output=True, text=True, timeout=60)
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.strip() == "2"
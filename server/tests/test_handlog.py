@@ -0,0 +1,51 @@
+import builtins
+import json
+import os
+import threading
+
+from eventlet import tpool
+
+from handlog import HandLog, read_records
+
+def test_append_does_no_file_io(tmp_path, monkeypatch):
+    hand_log = HandLog(str(tmp_path), execute=lambda fn, *args: fn(*args))
+
+    def no_io(*args, **kwargs):
+        raise AssertionError("file IO on the handler path")
+    monkeypatch.setattr(builtins, "open", no_io)
+    monkeypatch.setattr(os, "write", no_io)
+    for hand in range(3):
+        hand_log.append({"game": "AB12CD", "hand": hand})
+    assert hand_log.pending == 3
+
+def test_flush_writes_in_execute(tmp_path):
+    calls = []
+
+    def execute(fn, *args):
+        calls.append(fn)
+        return fn(*args)
+    hand_log = HandLog(str(tmp_path), execute=execute)
+    hand_log.append({"game": "AB12CD", "hand": 1})
+    hand_log.append({"game": "AB12CD", "hand": 2})
+    assert calls == []
+    assert hand_log.flush() == 2
+    assert calls == [hand_log._write]
+    hand_log.close()
+    assert [r["hand"] for r in read_records([str(tmp_path)])] == [1, 2]
+
+def test_flush_writes_off_the_calling_thread(tmp_path, monkeypatch):
+    hand_log = HandLog(str(tmp_path), execute=tpool.execute)
+    writers = []
+    real_open = builtins.open
+
+    def tracking_open(*args, **kwargs):
+        writers.append(threading.get_ident())
+        return real_open(*args, **kwargs)
+    monkeypatch.setattr(builtins, "open", tracking_open)
+    hand_log.append({"game": "AB12CD", "hand": 1})
+    assert hand_log.flush() == 1
+    monkeypatch.undo()
+    hand_log.close()
+    assert writers and threading.get_ident() not in writers
+    with open(next(tmp_path.iterdir()), encoding="utf-8") as f:
+        assert json.loads(f.readline())["hand"] == 1
@@ -0,0 +1,22 @@
+import pytest
+
+import app
+from passwords import LoginLimiter
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app, "LOGIN_LIMITER", LoginLimiter(burst=3, per_second=1 / 60))
+    return app.app.test_client()
+
+def login(client, username, addr="10.0.0.1", forwarded=None):
+    headers = {"X-Forwarded-For": forwarded} if forwarded else {}
+    return client.post("/api/login", json={"username": username, "password": "wrong"},
+                       headers=headers, environ_base={"REMOTE_ADDR": addr})
+
+def test_forged_forwarded_for_does_not_reset_the_address_limit(client):
+    codes = [login(client, f"nobody{i}", forwarded=f"203.0.113.{i}").status_code for i in range(4)]
+    assert codes == [401, 401, 401, 429]
+
+def test_account_is_limited_across_addresses(client):
+    codes = [login(client, "ann", addr=f"10.0.1.{i}").status_code for i in range(4)]
+    assert codes == [401, 401, 401, 429]
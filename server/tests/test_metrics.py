@@ -0,0 +1,26 @@
+import eventlet
+
+from metrics import Metrics, PayloadSizeJSON
+
+def test_payload_size_is_per_green_thread():
+    sizes = {}
+
+    def emit(name, payload):
+        PayloadSizeJSON.take()
+        PayloadSizeJSON.dumps(["state", payload])
+        eventlet.sleep(0)  # another green thread encodes before this one reads
+        sizes[name] = PayloadSizeJSON.take()
+
+    pool = eventlet.GreenPool()
+    pool.spawn(emit, "small", {"a": 1})
+    pool.spawn(emit, "big", {"a": "x" * 100})
+    pool.waitall()
+    assert sizes == {"small": len('["state", {"a": 1}]'), "big": len('["state", {"a": "' + "x" * 100 + '"}]')}
+    assert PayloadSizeJSON.take() is None
+
+def test_unknown_size_counts_the_emit_only():
+    metrics = Metrics()
+    metrics.emitted("AB12CD", "state", None)
+    metrics.emitted("AB12CD", "state", 40)
+    assert metrics.emits.values[("AB12CD", "state")] == 2
+    assert metrics.emit_bytes.values[("AB12CD", "state")] == 40
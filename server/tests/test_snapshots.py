@@ -0,0 +1,20 @@
+from models import Game, Player
+from snapshots import SnapshotStore
+
+def test_unbroadcast_changes_are_snapshotted(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.db"))
+    g = Game(game_id="AB12CD")
+    g.players["s1"] = Player(sid="s1", name="ann", seat=1)
+    g.reset_deck()
+    assert store.save([g]) == 1
+    assert store.save([g]) == 0
+
+    # A redeal keeps the public state (and so ``version``) the same.
+    g.reset_deck()
+    g.hand_no += 1
+    g.dirty += 1
+    assert store.save([g]) == 1
+    (restored,) = SnapshotStore(str(tmp_path / "snapshots.db")).load()
+    assert restored.deck == g.deck
+    assert restored.hand_no == g.hand_no
+    assert restored.version == g.version
@@ -0,0 +1,24 @@
+import app
+
+def test_evicting_a_game_forgets_its_spectators():
+    host = app.sio.test_client(app.app)
+    host.emit("host_create_game", {})
+    game_id = next(m["args"][0]["gameId"] for m in host.get_received() if m["name"] == "game_created")
+    viewer = app.sio.test_client(app.app)
+    viewer.emit("watch_game", {"gameId": game_id})
+    viewer_sid = next(sid for sid, (gid, _) in app.WATCHING.items() if gid == game_id)
+    assert game_id in app.SPECTATOR_ROOMS
+
+    assert app.evict_game(game_id, "idle", lambda g: True) == 1
+    assert viewer_sid not in app.WATCHING
+    assert game_id not in app.SPECTATOR_ROOMS
+    assert any(m["name"] == "game_closed" for m in viewer.get_received())
+
+    # Watching another table afterwards starts clean.
+    host.emit("host_create_game", {})
+    other = next(m["args"][0]["gameId"] for m in host.get_received() if m["name"] == "game_created")
+    viewer.emit("watch_game", {"gameId": other})
+    assert [gid for gid, _ in app.WATCHING.values()].count(other) == 1
+    viewer.disconnect()
+    host.disconnect()
+    assert not any(gid == other for gid, _ in app.WATCHING.values())
@@ -0,0 +1,322 @@
+"""Multi-table tournaments.
+
+A ``Tournament`` registers players, seats them over as few ``Game`` tables of
+``table_size`` as they fit, and between hands at a table takes out the busted
+players, breaks the table when the field fits on one table fewer, or moves
+players off it to the shortest table when it is two or more seats longer.
+Like engine.py it has no Socket.IO in it: app.py plays the hands with the
+engine, asks ``due`` what each table needs next and carries out the seat
+moves ``hand_finished`` returns.
+
+Nothing here scans the whole field. Players are found by seat token, tables
+by how many players they have (one bucket per size), and chip standings sit
+in a Fenwick tree, so a finished hand costs work for its own table only and
+a leaderboard change is O(log n).
+"""
+import random
+import time
+import uuid
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from models import STARTING_CHIPS, Game, Player
+
+BETTING_STAGES = ("preflop", "flop", "turn", "river")
+
+class Standings:
+    """Chip counts of the players still in, ranked.
+
+    A Fenwick tree over chip counts holds how many players have each count,
+    so updating a stack, a player's rank and the k-th biggest stack each cost
+    O(log total chips). Chips only ever leave a tournament (an unpaid pot),
+    so the total at the start bounds every stack.
+    """
+
+    def __init__(self, total_chips: int):
+        self.total = total_chips
+        self._tree = [0] * (total_chips + 2)
+        self._chips: Dict[str, int] = {}
+        self._names: Dict[int, Dict[str, None]] = {}  # chips -> names, in arrival order
+
+    def __len__(self) -> int:
+        return len(self._chips)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._chips
+
+    def _add(self, chips: int, delta: int):
+        i = chips + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _at_most(self, chips: int) -> int:
+        i, n = chips + 1, 0
+        while i > 0:
+            n += self._tree[i]
+            i -= i & -i
+        return n
+
+    def _nth_smallest(self, n: int) -> int:
+        # Chip count of the n-th smallest stack (1-based): a binary descent of the tree.
+        pos, step = 0, 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] < n:
+                pos = nxt
+                n -= self._tree[nxt]
+            step >>= 1
+        return pos  # tree index pos + 1 holds chips == pos
+
+    def set(self, name: str, chips: int):
+        if not 0 <= chips <= self.total:
+            raise ValueError(f"{name} has {chips} chips, outside 0-{self.total}")
+        old = self._chips.get(name)
+        if old == chips:
+            return
+        if old is not None:
+            self._unlink(name, old)
+        self._chips[name] = chips
+        self._names.setdefault(chips, {})[name] = None
+        self._add(chips, 1)
+
+    def remove(self, name: str):
+        old = self._chips.pop(name, None)
+        if old is not None:
+            self._unlink(name, old)
+
+    def _unlink(self, name: str, chips: int):
+        names = self._names[chips]
+        del names[name]
+        if not names:
+            del self._names[chips]
+        self._add(chips, -1)
+
+    def chips(self, name: str) -> Optional[int]:
+        return self._chips.get(name)
+
+    def rank(self, name: str) -> int:
+        """1 for the chip leader; players on equal stacks share a rank."""
+        return len(self._chips) - self._at_most(self._chips[name]) + 1
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """The ``k`` biggest stacks, biggest first."""
+        out: List[Tuple[str, int]] = []
+        remaining = len(self._chips)
+        while remaining and len(out) < k:
+            chips = self._nth_smallest(remaining)
+            names = self._names[chips]
+            out.extend((name, chips) for name in names)
+            remaining -= len(names)
+        return out[:k]
+
+class Move(NamedTuple):
+    player: Player
+    src: str  # game ids
+    dst: str
+
+class HandResult(NamedTuple):
+    busted: List[Tuple[Player, int]]  # with their finishing place
+    moves: List[Move]
+    closed: List[str]  # tables broken up, now empty
+    ready: List[str]  # tables that can deal their next hand
+
+class Tournament:
+    def __init__(self, tournament_id: str, host_sid: str, new_game_id: Callable[[], str],
+                 table_size: int = 9, starting_chips: int = STARTING_CHIPS, hand_pause: float = 5.0,
+                 street_pause: float = 1.0, action_seconds: float = 30.0):
+        self.tournament_id = tournament_id
+        self.host_sid = host_sid
+        self.new_game_id = new_game_id
+        self.table_size = table_size
+        self.starting_chips = starting_chips
+        self.hand_pause = hand_pause  # seconds the showdown stays up before the next hand
+        self.street_pause = street_pause  # after the last action of a betting round
+        self.action_seconds = action_seconds  # then whoever has not acted checks or folds
+        self.director = f"director:{tournament_id}"  # host sid of every table; no socket
+        self.stage = "registering"  # registering, running, finished
+        self.registered: Dict[str, Player] = {}  # token -> player, until the start
+        self.names: Set[str] = set()
+        self.tables: Dict[str, Game] = {}
+        self.table_of: Dict[str, str] = {}  # token -> game id
+        self.places: Dict[str, int] = {}  # name -> finishing place
+        self.standings = Standings(0)
+        self.waiting: Set[str] = set()  # tables short of players for a hand
+        self._sizes: Dict[str, int] = {}
+        self._by_size: Dict[int, Set[str]] = {}
+        self._clock: Dict[str, tuple] = {}  # game id -> (situation, first seen)
+        self._bots = 0
+        self.last_active = time.time()  # of the last registration, start or finished hand
+
+    @property
+    def alive(self) -> int:
+        return len(self.standings) if self.stage != "registering" else len(self.registered)
+
+    def register(self, sid: str, name: str, bot: bool = False) -> Tuple[Optional[Player], Optional[str]]:
+        """Enter a player; returns their seat (with its token) or an error message."""
+        if self.stage != "registering":
+            return None, "Tournament already started"
+        if bot:
+            self._bots += 1
+            sid, name = f"bot:{self._bots}", f"Bot {self._bots}"
+        if name in self.names:
+            return None, "Name already taken"
+        p = Player(sid=sid, name=name, chips=self.starting_chips, token=uuid.uuid4().hex, bot=bot)
+        self.registered[p.token] = p
+        self.names.add(name)
+        self.last_active = time.time()
+        return p, None
+
+    def start(self, rng: Optional[random.Random] = None) -> Tuple[List[Game], Optional[str]]:
+        """Seat everyone at random over the fewest tables, sizes within one of each other."""
+        if self.stage != "registering":
+            return [], "Tournament already started"
+        if len(self.registered) < 2:
+            return [], "Need at least 2 players"
+        players = list(self.registered.values())
+        (rng or random).shuffle(players)
+        count = -(-len(players) // self.table_size)
+        tables = []
+        for _ in range(count):
+            g = Game(game_id=self.new_game_id(), host_sid=self.director, max_players=self.table_size,
+                     equity_budget_ms=0, tournament_id=self.tournament_id)
+            self.tables[g.game_id] = g
+            self._resize(g.game_id, 0)
+            tables.append(g)
+        self.standings = Standings(len(players) * self.starting_chips)
+        for i, p in enumerate(players):
+            self._seat(p, tables[i % count])
+            self.standings.set(p.name, p.chips)
+        self.registered = {}
+        self.stage = "running"
+        self.last_active = time.time()
+        return tables, None
+
+    def _seat(self, p: Player, g: Game):
+        p.seat = g.next_seat
+        g.next_seat += 1
+        p.in_hand = g.stage == "lobby"
+        p.cards, p.parts, p.strength = [], [], 0
+        p.action_submitted, p.round_bet, p.pot = False, 0, 0
+        g.players[p.sid] = p
+        self.table_of[p.token] = g.game_id
+        self._resize(g.game_id, len(g.players))
+
+    def _resize(self, game_id: str, size: Optional[int]):
+        old = self._sizes.pop(game_id, None)
+        if old is not None:
+            self._by_size[old].discard(game_id)
+        if size is not None:
+            self._sizes[game_id] = size
+            self._by_size.setdefault(size, set()).add(game_id)
+
+    def _shortest(self, exclude: str) -> Optional[str]:
+        for size in range(self.table_size):
+            for game_id in self._by_size.get(size, ()):
+                if game_id != exclude:
+                    return game_id
+        return None
+
+    def _move(self, p: Player, src: Game, dst: Game) -> Move:
+        del src.players[p.sid]
+        self._resize(src.game_id, len(src.players))
+        self._seat(p, dst)
+        return Move(p, src.game_id, dst.game_id)
+
+    def hand_finished(self, g: Game) -> HandResult:
+        """Settle a table whose hand is over: standings, busts, then breaking or balancing."""
+        busted, moves, closed, ready = [], [], [], []
+        self.last_active = time.time()
+        for p in list(g.players.values()):
+            if p.chips > 0:
+                self.standings.set(p.name, p.chips)
+                continue
+            del g.players[p.sid]
+            self.table_of.pop(p.token, None)
+            self.standings.remove(p.name)
+            busted.append(p)
+        self._resize(g.game_id, len(g.players))
+        place = len(self.standings) + 1  # players busting on the same hand share a place
+        busted = [(p, place) for p in busted]
+        for p, place in busted:
+            self.places[p.name] = place
+        if len(self.standings) <= 1:
+            self.finish()
+            return HandResult(busted, moves, closed, ready)
+
+        dests = set()
+        if len(self.tables) > -(-len(self.standings) // self.table_size):
+            # The field fits on one table fewer: break this one up.
+            for p in list(g.players.values()):
+                dst = self.tables[self._shortest(g.game_id)]
+                moves.append(self._move(p, g, dst))
+                dests.add(dst.game_id)
+            del self.tables[g.game_id]
+            self._resize(g.game_id, None)
+            self._clock.pop(g.game_id, None)
+            self.waiting.discard(g.game_id)
+            closed.append(g.game_id)
+        else:
+            while True:
+                dst_id = self._shortest(g.game_id)
+                if dst_id is None or len(g.players) - self._sizes[dst_id] < 2:
+                    break
+                p = next(reversed(g.players.values()))  # the latest arrival moves on first
+                moves.append(self._move(p, g, self.tables[dst_id]))
+                dests.add(dst_id)
+            dests.add(g.game_id)
+        for game_id in dests:
+            if len(self.tables[game_id].players) < 2:
+                self.waiting.add(game_id)
+            elif game_id == g.game_id or game_id in self.waiting:
+                self.waiting.discard(game_id)
+                ready.append(game_id)
+        return HandResult(busted, moves, closed, ready)
+
+    def finish(self) -> List[str]:
+        """End the tournament now and place whoever is left by chips; returns the open tables.
+
+        The game has no blinds or antes, so the field only shrinks as fast as
+        the players bust each other; the host decides when it is over.
+        """
+        for name, _ in self.standings.top(len(self.standings)):
+            self.places[name] = self.standings.rank(name)
+        self.stage = "finished"
+        return list(self.tables)
+
+    def due(self, g: Game, now: Optional[float] = None) -> Optional[str]:
+        """What table ``g`` needs from the director now.
+
+        ``"deal"`` the next street, ``"act"`` for whoever has not acted in
+        ``action_seconds``, ``"finish"`` the hand once its showdown has been up
+        for ``hand_pause``, or None to keep waiting.
+        """
+        if self.stage != "running" or g.game_id in self.waiting:
+            return None
+        now = time.time() if now is None else now
+        settled = g.stage not in BETTING_STAGES or g.everyone_acted()
+        situation = (g.hand_no, g.stage, g.current_bet, settled)
+        seen = self._clock.get(g.game_id)
+        if seen is None or seen[0] != situation:
+            self._clock[g.game_id] = (situation, now)
+            return None
+        waited = now - seen[1]
+        if g.stage == "showdown":
+            return "finish" if waited >= self.hand_pause else None
+        if g.stage not in BETTING_STAGES:
+            return None
+        if settled:
+            return "deal" if waited >= self.street_pause else None
+        return "act" if waited >= self.action_seconds else None
+
+    def board(self, top: int = 10) -> dict:
+        """Tournament-wide summary for the lobby and host screens."""
+        return {
+            "tournamentId": self.tournament_id,
+            "stage": self.stage,
+            "registered": len(self.registered) if self.stage == "registering" else len(self.places) + len(self.standings),
+            "alive": self.alive,
+            "tableSize": self.table_size,
+            "tables": [{"gameId": game_id, "players": size} for game_id, size in self._sizes.items()],
+            "leaders": [{"name": name, "chips": chips} for name, chips in self.standings.top(top)],
+            "winner": next((name for name, place in self.places.items() if place == 1), None),
+        }
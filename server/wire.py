@@ -0,0 +1,98 @@
+"""Compact MessagePack encoding of the state, state-delta and showdown events.
+
+Clients that connect with ``auth: {wire: "msgpack"}`` receive ``state_bin``,
+``state_delta_bin`` and ``showdown_bin`` as one binary attachment instead of
+the JSON events; everything else stays JSON. Field names are replaced by their
+index in the tables below and cards by their 0-51 int, so a 15-seat snapshot
+carries no repeated keys. Keys missing from a table pass through as strings,
+which keeps old clients decoding new fields. client/src/wire.js is the decoder
+and must list the same tables in the same order: only ever append to them.
+
+    state        [game, players]            game: {index: value}, players: [[value, ...], ...]
+    state_delta  [game, players, removed, order]   players: {seat: {index: value}}
+    showdown     {index: value}             "show" entries are lists in SHOW_KEYS order
+"""
+from typing import Dict, Sequence
+
+import msgpack
+
+from evaluator import CARD_TO_INT, cards_to_str
+
+NAME = "msgpack"
+
+GAME_KEYS = ("gameId", "stage", "board", "pot", "someoneRaised", "currentBet", "raiseMade",
+             "count", "max", "version", "base", "msg")
+PLAYER_KEYS = ("name", "inHand", "raises", "acted", "chips", "roundBet", "totalBet", "pot",
+               "callAmount", "needsToCall", "seat", "connected", "bot")
+SHOWDOWN_KEYS = ("winners", "payouts", "pot", "board", "hand_name", "show", "hand")
+SHOW_KEYS = ("name", "cards", "best5", "score", "hand_name")
+CARD_KEYS = ("board", "cards", "best5")
+
+def _index(keys: Sequence[str]) -> Dict[str, int]:
+    return {k: i for i, k in enumerate(keys)}
+
+_GAME, _PLAYER, _SHOWDOWN = _index(GAME_KEYS), _index(PLAYER_KEYS), _index(SHOWDOWN_KEYS)
+
+def _value(key: str, value):
+    if key in CARD_KEYS and value:
+        return [CARD_TO_INT[c] for c in value]
+    return value
+
+def _fields(d: dict, table: Dict[str, int], skip=()) -> dict:
+    return {table.get(k, k): _value(k, v) for k, v in d.items() if k not in skip}
+
+def pack_state(state: dict) -> bytes:
+    players = [[_value(k, p.get(k)) for k in PLAYER_KEYS] for p in state["players"]]
+    return msgpack.packb([_fields(state, _GAME, ("players",)), players])
+
+def pack_delta(delta: dict) -> bytes:
+    game = _fields(delta["game"], _GAME)
+    for k in ("gameId", "base", "version", "msg"):
+        if k in delta:
+            game[_GAME[k]] = delta[k]
+    players = {int(seat): _fields(p, _PLAYER) for seat, p in delta["players"].items()}
+    return msgpack.packb([game, players, delta.get("removed"), delta.get("order")])
+
+def pack_showdown(result: dict) -> bytes:
+    out = _fields(result, _SHOWDOWN, ("show",))
+    if "show" in result:
+        out[_SHOWDOWN["show"]] = [
+            [_value(k, int(s[k]) if k == "score" else s[k]) for k in SHOW_KEYS] for s in result["show"]
+        ]
+    return msgpack.packb(out)
+
+PACKERS = {"state": pack_state, "state_delta": pack_delta, "showdown": pack_showdown}
+
+# --- decoding, for tools that speak the compact protocol (loadtest.py) ---
+def _named(d: dict, keys: Sequence[str]) -> dict:
+    out = {}
+    for k, v in d.items():
+        name = keys[k] if isinstance(k, int) and k < len(keys) else str(k)
+        out[name] = cards_to_str(v) if name in CARD_KEYS and v else v
+    return out
+
+def unpack(event: str, data: bytes):
+    """Turn a ``*_bin`` payload back into the JSON event's dict."""
+    msg = msgpack.unpackb(data, strict_map_key=False)
+    if event == "state":
+        game, players = msg
+        state = _named(game, GAME_KEYS)
+        state["players"] = [_named(dict(enumerate(p)), PLAYER_KEYS) for p in players]
+        return state
+    if event == "state_delta":
+        game, players, removed, order = msg
+        head = _named(game, GAME_KEYS)
+        delta: Dict[str, object] = {k: head.pop(k) for k in ("gameId", "base", "version", "msg") if k in head}
+        delta["game"] = head
+        delta["players"] = {str(seat): _named(p, PLAYER_KEYS) for seat, p in players.items()}
+        if removed is not None:
+            delta["removed"] = removed
+        if order is not None:
+            delta["order"] = order
+        return delta
+    result = _named(msg, SHOWDOWN_KEYS)
+    if "show" in result:
+        result["show"] = [_named(dict(enumerate(s)), SHOW_KEYS) for s in result["show"]]
+        for s in result["show"]:
+            s["score"] = str(s["score"])
+    return result